@@ -43,17 +43,28 @@ def _init_logger(log_level=logging.INFO, log_format=None):
     LOG.debug("logging initialized")
 
 
-def _get_options_from_ini(ini_path, target):
-    """Return a dictionary of config options or None if we can't load any."""
+def _get_options_from_ini(ini_path, target, listings=None, recursive=True):
+    """Return a dictionary of config options or None if we can't load any.
+
+    When listings is given, the directories read while looking for .bandit
+    files are recorded in it for file discovery to reuse. When recursive is
+    False, .bandit files are only looked for in the target directories
+    themselves rather than in the whole tree below them.
+    """
     ini_file = None
 
     if ini_path:
         ini_file = ini_path
     else:
         bandit_files = []
+        walk = os.walk if listings is None else listings.walk
 
         for t in target:
-            for root, _, filenames in os.walk(t):
+            if not recursive:
+                if os.path.isfile(os.path.join(t, '.bandit')):
+                    bandit_files.append(os.path.join(t, '.bandit'))
+                continue
+            for root, _, filenames in walk(t):
                 for filename in fnmatch.filter(filenames, '.bandit'):
                     bandit_files.append(os.path.join(root, filename))
 
@@ -130,6 +141,8 @@ def main():
                                                   hasattr(x.plugin,
                                                           '_accepts_baseline'),
                                                   extension_mgr.formatters)]
+    codeless_formatters = [f.name for f in extension_mgr.formatters
+                           if hasattr(f.plugin, '_omits_code')]
 
     # now do normal startup
     parser = argparse.ArgumentParser(
@@ -242,6 +255,78 @@ def main():
     parser.add_argument('--exit-zero', action='store_true', dest='exit_zero',
                         default=False, help='exit with 0, '
                                             'even with results found')
+    parser.add_argument(
+        '-j', '--jobs', dest='jobs', action='store', default=None, type=int,
+        help='number of worker processes to scan files with '
+             '(0 for one per CPU, default: 1)'
+    )
+    parser.add_argument(
+        '--cache-dir', dest='cache_dir', action='store', default=None,
+        help='directory to cache per-file results in, files whose contents '
+             'were scanned before with the same tests and config are not '
+             'scanned again'
+    )
+    parser.add_argument(
+        '--no-cache', dest='no_cache', action='store_true',
+        help='do not use the result cache, even if a cache directory is set'
+    )
+    parser.add_argument(
+        '--pipeline', dest='pipeline', action='store_true',
+        help='start scanning files while the targets are still being '
+             'walked, instead of finding all files first (files in scope '
+             'are counted rather than listed, and a .bandit file below '
+             'the targets is an error)'
+    )
+    parser.add_argument(
+        '--archive-depth', dest='archive_depth', action='store',
+        default=None, type=int,
+        help='levels of nested archives to read when a target is a '
+             '.tar.gz, .zip or .whl archive (default: %i)' %
+             constants.archive_max_depth
+    )
+    parser.add_argument(
+        '--archive-max-size', dest='archive_max_size', action='store',
+        default=None, type=int,
+        help='maximum number of bytes to decompress from an archive '
+             '(default: %i)' % constants.archive_max_size
+    )
+    parser.add_argument(
+        '--ast-max-depth', dest='ast_max_depth', action='store',
+        default=None, type=int,
+        help='levels of the syntax tree of a file to scan, deeper code is '
+             'reported as partially scanned (default: %i)' %
+             constants.ast_max_depth
+    )
+    parser.add_argument(
+        '--ast-max-nodes', dest='ast_max_nodes', action='store',
+        default=None, type=int,
+        help='maximum number of syntax tree nodes of a file to scan, the '
+             'rest is reported as partially scanned (default: %i)' %
+             constants.ast_max_nodes
+    )
+    parser.add_argument(
+        '--dump-ast', dest='ast_dump', action='store', metavar='AST_FILE',
+        type=argparse.FileType('w'), default=None,
+        help='write the syntax tree nodes of each scanned file to a file as '
+             'they are visited, as debug mode would log them'
+    )
+    parser.add_argument(
+        '--dump-ast-compact', dest='ast_dump_compact', action='store_true',
+        help='write one short line per node with --dump-ast'
+    )
+    parser.add_argument(
+        '--profile-plugins', dest='profile_plugins', action='store_true',
+        help='record how many times each test ran on each type of node, the '
+             'time it took and the issues it reported, and add them to the '
+             'report metrics'
+    )
+    parser.add_argument(
+        '--timings', dest='timings', action='store', nargs='?', type=int,
+        const=constants.timings_slowest_files, default=None, metavar='N',
+        help='record the time spent finding, reading, parsing and checking '
+             'files and the N slowest files (default: %i), and add them to '
+             'the report metrics' % constants.timings_slowest_files
+    )
     python_ver = sys.version.replace('\n', '')
     parser.add_argument(
         '--version', action='version',
@@ -253,6 +338,9 @@ def main():
     parser.set_defaults(verbose=False)
     parser.set_defaults(quiet=False)
     parser.set_defaults(ignore_nosec=False)
+    parser.set_defaults(no_cache=False)
+    parser.set_defaults(pipeline=False)
+    parser.set_defaults(ast_dump_compact=False)
 
     plugin_info = ["%s\t%s" % (a[0], a[1].name) for a in
                    extension_mgr.plugins_by_id.items()]
@@ -304,8 +392,17 @@ def main():
         LOG.error(e)
         sys.exit(2)
 
-    # Handle .bandit files in projects to pass cmdline args from file
-    ini_options = _get_options_from_ini(args.ini_path, args.targets)
+    # Handle .bandit files in projects to pass cmdline args from file, the
+    # walk looking for them is recorded for file discovery. A pipelined scan
+    # only looks in the targets themselves, so that it starts on the first
+    # file found rather than after a walk of the whole tree, and has nothing
+    # to record.
+    listings = None
+    if not args.pipeline:
+        listings = b_manager.DirectoryListings()
+    ini_options = _get_options_from_ini(args.ini_path, args.targets,
+                                        listings,
+                                        recursive=not args.pipeline)
     if ini_options:
         # prefer command line, then ini file
         args.excluded_paths = _log_option_source(
@@ -404,6 +501,49 @@ def main():
             ini_options.get('baseline'),
             'path of a baseline report')
 
+        # 0 is a valid number of worker processes, one per CPU
+        ini_jobs = ini_options.get('jobs')
+        if args.jobs is not None:
+            LOG.info("Using command line arg for %s",
+                     'number of worker processes')
+        elif ini_jobs:
+            LOG.info("Using ini file for %s", 'number of worker processes')
+            args.jobs = int(ini_jobs)
+
+        args.cache_dir = _log_option_source(
+            args.cache_dir,
+            ini_options.get('cache-dir'),
+            'result cache directory')
+
+        args.pipeline = _log_option_source(
+            args.pipeline,
+            ini_options.get('pipeline'),
+            'pipelined file discovery')
+
+        ini_archive_depth = ini_options.get('archive-depth')
+        args.archive_depth = _log_option_source(
+            args.archive_depth,
+            int(ini_archive_depth) if ini_archive_depth else None,
+            'levels of nested archives to read')
+
+        ini_archive_max_size = ini_options.get('archive-max-size')
+        args.archive_max_size = _log_option_source(
+            args.archive_max_size,
+            int(ini_archive_max_size) if ini_archive_max_size else None,
+            'maximum bytes to decompress from an archive')
+
+        ini_ast_max_depth = ini_options.get('ast-max-depth')
+        args.ast_max_depth = _log_option_source(
+            args.ast_max_depth,
+            int(ini_ast_max_depth) if ini_ast_max_depth else None,
+            'levels of the syntax tree to scan')
+
+        ini_ast_max_nodes = ini_options.get('ast-max-nodes')
+        args.ast_max_nodes = _log_option_source(
+            args.ast_max_nodes,
+            int(ini_ast_max_nodes) if ini_ast_max_nodes else None,
+            'maximum syntax tree nodes to scan')
+
     if not args.targets:
         LOG.error("No targets found in CLI or ini files, exiting.")
         sys.exit(2)
@@ -430,7 +570,22 @@ def main():
     b_mgr = b_manager.BanditManager(b_conf, args.agg_type, args.debug,
                                     profile=profile, verbose=args.verbose,
                                     quiet=args.quiet,
-                                    ignore_nosec=args.ignore_nosec)
+                                    ignore_nosec=args.ignore_nosec,
+                                    jobs=1 if args.jobs is None
+                                    else args.jobs,
+                                    cache_dir=None if args.no_cache
+                                    else args.cache_dir,
+                                    archive_depth=args.archive_depth,
+                                    archive_max_size=args.archive_max_size,
+                                    ast_max_depth=args.ast_max_depth,
+                                    ast_max_nodes=args.ast_max_nodes,
+                                    ast_dump=args.ast_dump,
+                                    ast_dump_compact=args.ast_dump_compact,
+                                    profile_plugins=args.profile_plugins,
+                                    timings=args.timings,
+                                    code_lines=None if args.output_format
+                                    in codeless_formatters
+                                    else args.context_lines)
 
     if args.baseline is not None:
         try:
@@ -453,21 +608,39 @@ def main():
         LOG.info("running on Python %d.%d.%d", sys.version_info.major,
                  sys.version_info.minor, sys.version_info.micro)
 
-    # initiate file discovery step within Bandit Manager
-    b_mgr.discover_files(args.targets, args.recursive, args.excluded_paths)
+    # initiate file discovery step within Bandit Manager, a pipelined
+    # discovery only walks the targets once the tests are running, so it
+    # can only tell then whether there is a .bandit file further down
+    files = None
+    if args.pipeline:
+        files = b_mgr.iter_files(args.targets, args.recursive,
+                                 args.excluded_paths, listings,
+                                 nested_ini=bool(args.ini_path))
+    else:
+        b_mgr.discover_files(args.targets, args.recursive,
+                             args.excluded_paths, listings)
 
     if not b_mgr.b_ts.tests:
         LOG.error('No tests would be run, please check the profile.')
         sys.exit(2)
 
+    sev_level = constants.RANKING[args.severity - 1]
+    conf_level = constants.RANKING[args.confidence - 1]
+    # formatters that can write the results of each file as it is done
+    b_mgr.stream_results(args.output_file, args.output_format, sev_level,
+                         conf_level)
+
     # initiate execution of tests within Bandit Manager
-    b_mgr.run_tests()
-    LOG.debug(b_mgr.b_ma)
+    try:
+        b_mgr.run_tests(files)
+    except utils.ConfigError as e:
+        LOG.error('%s - scan without --pipeline or choose one with --ini', e)
+        sys.exit(2)
+    if args.ast_dump is not None:
+        args.ast_dump.close()
     LOG.debug(b_mgr.metrics)
 
     # trigger output of results by Bandit Manager
-    sev_level = constants.RANKING[args.severity - 1]
-    conf_level = constants.RANKING[args.confidence - 1]
     b_mgr.output_results(args.context_lines,
                          sev_level,
                          conf_level,
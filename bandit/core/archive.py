@@ -0,0 +1,224 @@
+# -*- coding:utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+
+import bz2
+import gzip
+import io
+import logging
+import lzma
+import tarfile
+import zipfile
+import zlib
+
+from bandit.core import constants
+
+
+LOG = logging.getLogger(__name__)
+
+# separates the name of an archive from the path of a member within it
+SEPARATOR = '!'
+
+TAR_SUFFIXES = ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz',
+                '.txz')
+ZIP_SUFFIXES = ('.zip', '.whl', '.egg')
+
+READ_ERRORS = (tarfile.TarError, zipfile.BadZipfile, zlib.error,
+               lzma.LZMAError, EOFError, IOError, OSError, ValueError)
+
+
+def is_archive(fname):
+    '''Check whether a file name looks like a tar or zip based archive
+
+    :param fname: The file name
+    :return: True if the file should be read as an archive
+    '''
+    return fname.lower().endswith(TAR_SUFFIXES + ZIP_SUFFIXES)
+
+
+class SizeLimitExceeded(Exception):
+    pass
+
+
+class ArchiveReader(object):
+    """Reads the members of sdist and wheel archives into memory.
+
+    Members are never written to disk. Archives found inside an archive are
+    read in turn, up to max_depth levels of nesting, and the total number of
+    bytes decompressed from one top level archive is capped at max_size.
+    That counts every byte of a compressed tar archive, including those of
+    the members which are not scanned, and the members read from other
+    archives.
+    """
+
+    def __init__(self, max_depth=None, max_size=None):
+        '''Set up a reader with the given limits
+
+        :param max_depth: Levels of nested archives to read, 1 to only read
+            the members of the archive itself
+        :param max_size: Maximum number of bytes to decompress
+        '''
+        if max_depth is None:
+            max_depth = constants.archive_max_depth
+        if max_size is None:
+            max_size = constants.archive_max_size
+        self.max_depth = max_depth
+        self.max_size = max_size
+        self.size = 0
+
+    def read(self, fname, fileobj, include):
+        '''Read the members of an archive
+
+        Yields a (name, data, reason) tuple for every member to scan, where
+        name is the archive name and member path joined with SEPARATOR. If
+        a member or the archive itself could not be read, data is None and
+        reason says why.
+
+        :param fname: The name of the archive
+        :param fileobj: The archive, opened in binary mode
+        :param include: Function telling whether a member path should be
+            scanned
+        :return: Generator of (name, data, reason) tuples
+        '''
+        self.size = 0
+        return self._read(fname, fileobj, include, 1)
+
+    def _read(self, fname, fileobj, include, depth):
+        try:
+            if fname.lower().endswith(ZIP_SUFFIXES):
+                members = self._zip_members(fileobj)
+            else:
+                members = self._tar_members(fileobj)
+
+            for path, size, read, counted in members:
+                name = fname + SEPARATOR + path
+                nested = is_archive(path)
+                if not nested and not include(path):
+                    continue
+                if nested and depth >= self.max_depth:
+                    LOG.debug("Skipping nested archive %s", name)
+                    yield (name, None,
+                           'nested archive deeper than %i levels' %
+                           self.max_depth)
+                    continue
+
+                data = self._read_member(size, read, counted)
+                if nested:
+                    for member in self._read(name, io.BytesIO(data), include,
+                                             depth + 1):
+                        yield member
+                else:
+                    yield name, data, None
+        except SizeLimitExceeded:
+            # stop reading the top level archive altogether
+            if depth > 1:
+                raise
+            yield (fname, None, 'archive larger than %i bytes when '
+                   'decompressed' % self.max_size)
+        except READ_ERRORS as e:
+            LOG.debug("Unable to read archive %s: %s", fname, e)
+            yield fname, None, 'error while reading archive'
+
+    def _read_member(self, size, read, counted):
+        remaining = self.max_size - self.size
+        if size > remaining:
+            raise SizeLimitExceeded()
+        # the size in the header can't be trusted, never read past the limit
+        data = read(remaining + 1)
+        if not counted:
+            self._count(len(data))
+        return data
+
+    def _count(self, size):
+        '''Count decompressed bytes towards the limit
+
+        :param size: The number of bytes decompressed
+        :raises SizeLimitExceeded: Once more than max_size bytes were
+            decompressed
+        '''
+        if self.size + size > self.max_size:
+            raise SizeLimitExceeded()
+        self.size += size
+
+    def _tar_members(self, fileobj):
+        # the decompressed stream is read here rather than by tarfile, so
+        # that the members skipped over count towards the limit too
+        stream = _decompress(fileobj)
+        counted = stream is not None
+        try:
+            if counted:
+                fileobj = _CountedStream(stream, self)
+            with tarfile.open(fileobj=fileobj, mode='r:') as tar:
+                for info in tar:
+                    if info.isfile():
+                        member = tar.extractfile(info)
+                        yield info.name, info.size, member.read, counted
+        finally:
+            if counted:
+                stream.close()
+
+    @staticmethod
+    def _zip_members(fileobj):
+        with zipfile.ZipFile(fileobj) as zf:
+            for info in zf.infolist():
+                if not info.filename.endswith('/'):
+                    try:
+                        member = zf.open(info)
+                    except (RuntimeError, NotImplementedError) as e:
+                        # encrypted or compressed with an unsupported method
+                        raise zipfile.BadZipfile(str(e))
+                    yield info.filename, info.file_size, member.read, False
+
+
+def _decompress(fileobj):
+    '''Open the decompressed stream of a compressed tar archive
+
+    :param fileobj: The archive, opened in binary mode
+    :return: The decompressed stream, or None if the archive is not
+        compressed
+    '''
+    magic = fileobj.read(6)
+    fileobj.seek(0)
+    if magic.startswith(b'\x1f\x8b'):
+        return gzip.GzipFile(fileobj=fileobj, mode='rb')
+    if magic.startswith(b'BZh'):
+        return bz2.BZ2File(fileobj)
+    if magic.startswith(b'\xfd7zXZ\x00'):
+        return lzma.LZMAFile(fileobj)
+    return None
+
+
+class _CountedStream(object):
+    '''Decompressed stream counting the bytes pulled through it
+
+    Every byte decompressed, whether read or seeked over, is counted by the
+    ArchiveReader before it is decompressed where possible, so that reading
+    stops once the limit is reached.
+    '''
+
+    def __init__(self, stream, reader):
+        self._stream = stream
+        self._reader = reader
+        self._pos = 0
+
+    def read(self, size=-1):
+        remaining = self._reader.max_size - self._reader.size
+        if size is None or size < 0 or size > remaining:
+            size = remaining + 1
+        data = self._stream.read(size)
+        self._pos += len(data)
+        self._reader._count(len(data))
+        return data
+
+    def seek(self, pos, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            pos += self._pos
+        elif whence != io.SEEK_SET:
+            raise io.UnsupportedOperation('can only seek from the start')
+        # seeking backwards decompresses the stream again from its start
+        self._reader._count(pos if pos < self._pos else pos - self._pos)
+        self._pos = self._stream.seek(pos)
+        return self._pos
+
+    def tell(self):
+        return self._pos
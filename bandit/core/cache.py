@@ -0,0 +1,248 @@
+# -*- coding:utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+
+import hashlib
+import json
+import logging
+import os
+import sys
+import tempfile
+
+import bandit
+from bandit.core import issue
+from bandit.core import utils
+
+
+LOG = logging.getLogger(__name__)
+
+
+class ResultCache(object):
+    """On-disk cache of per-file scan results.
+
+    Entries are keyed by a hash of the file contents together with a
+    fingerprint of everything else that can change the results of a scan:
+    the active tests, their configuration and the source of the modules that
+    define them, the bandit config, the bandit and Python versions and
+    whether #nosec is honoured. Each entry is a small JSON file stored under
+    cache_dir. Reading an entry refreshes its modification time, which
+    prune() uses to evict the least recently used entries once the cache
+    grows past max_size bytes. The total size of the entries is kept in a
+    file next to them, so that the entries are only walked once the cache
+    has grown too big.
+    """
+
+    def __init__(self, cache_dir, testset, config, ignore_nosec=False,
+                 max_size=None):
+        '''Set up a cache for a run with the given test set and config
+
+        :param cache_dir: Directory to store the cache entries in
+        :param testset: The active test set
+        :param config: The bandit config
+        :param ignore_nosec: Whether #nosec comments are ignored
+        :param max_size: Maximum size in bytes of the cache, or None
+        '''
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        # bytes of the entries written since the last prune
+        self.stored = 0
+        self.fingerprint = _get_fingerprint(testset, config, ignore_nosec)
+
+    def get_key(self, data):
+        '''Get the cache key for the contents of a file
+
+        :param data: The file contents, as bytes
+        :return: The key as a hex string
+        '''
+        digest = hashlib.sha256(self.fingerprint)
+        digest.update(data)
+        return digest.hexdigest()
+
+    def _get_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def get(self, key):
+        '''Get a cache entry, counting the lookup as a hit or a miss
+
+        :param key: The cache key
+        :return: The entry dict, or None if there is no usable entry
+        '''
+        path = self._get_path(key)
+        try:
+            with open(path, 'r') as f:
+                entry = json.load(f)
+            os.utime(path, None)
+        except (IOError, OSError, ValueError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return entry
+
+    def store(self, key, results, score, file_metrics, skipped=None):
+        '''Store the outcome of scanning a file
+
+        Failing to write the entry is logged and otherwise ignored.
+
+        :param key: The cache key
+        :param results: List of issues found in the file
+        :param score: The score of the file, or None if it was skipped
+        :param file_metrics: The metrics dict of the file
+        :param skipped: Reason the file was skipped, or None
+        '''
+        entry = {
+            'results': [_issue_to_list(i) for i in results],
+            'score': score,
+            'metrics': file_metrics,
+            'skipped': skipped,
+        }
+        path = self._get_path(key)
+        try:
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            data = json.dumps(entry, separators=(',', ':'))
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, 'w') as f:
+                f.write(data)
+            os.rename(tmp_path, path)
+            self.stored += len(data)
+        except (IOError, OSError) as e:
+            LOG.debug("Unable to write cache entry %s: %s", path, e)
+
+    def prune(self):
+        '''Evict the least recently used entries to honour max_size
+
+        The entries are only walked when the recorded size of the cache,
+        plus what was stored since, is over max_size or unknown. Runs
+        sharing the cache directory at the same time can make the recorded
+        size drift, it is set right again each time the entries are walked.
+        '''
+        if not self.max_size or not os.path.isdir(self.cache_dir):
+            return
+
+        total = self._read_size()
+        if total is not None:
+            total += self.stored
+            if total <= self.max_size:
+                if self.stored:
+                    self._write_size(total)
+                self.stored = 0
+                return
+
+        self._write_size(self._evict())
+        self.stored = 0
+
+    def _size_path(self):
+        return os.path.join(self.cache_dir, 'size')
+
+    def _read_size(self):
+        try:
+            with open(self._size_path(), 'r') as f:
+                return int(f.read())
+        except (IOError, OSError, ValueError):
+            return None
+
+    def _write_size(self, total):
+        try:
+            with open(self._size_path(), 'w') as f:
+                f.write(str(total))
+        except (IOError, OSError) as e:
+            LOG.debug("Unable to write the size of the cache: %s", e)
+
+    def _evict(self):
+        '''Walk the entries and remove the least recently used ones
+
+        :return: The total size of the entries left
+        '''
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.cache_dir):
+            if root == self.cache_dir:
+                # the entries are in subdirectories, not the size file
+                continue
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        return total
+
+    @staticmethod
+    def issues_from_entry(entry, fname):
+        '''Rebuild the issues of a cache entry for a file
+
+        :param entry: The cache entry
+        :param fname: The name of the file the issues are for
+        :return: List of issues
+        '''
+        results = []
+        for (severity, confidence, text, ident, lineno, test, test_id,
+             linerange) in entry['results']:
+            new_issue = issue.Issue(severity, confidence, text, ident,
+                                    lineno, test_id)
+            new_issue.test = sys.intern(test)
+            new_issue.linerange = linerange
+            new_issue.fname = fname
+            results.append(new_issue)
+        return results
+
+
+def _issue_to_list(i):
+    return [i.severity, i.confidence, i.text, i.ident, i.lineno, i.test,
+            i.test_id, list(i.linerange)]
+
+
+def _get_fingerprint(testset, config, ignore_nosec):
+    '''Hash everything besides the file contents that affects results'''
+    digest = hashlib.sha256()
+
+    def add(value):
+        digest.update(json.dumps(value, sort_keys=True,
+                                 default=_json_default).encode('utf-8'))
+
+    add([bandit.__version__, sys.version, bool(ignore_nosec)])
+    add(config._config)
+
+    sources = {}
+    for checktype in sorted(testset.tests):
+        for test in testset.tests[checktype]:
+            add([checktype, test.__module__, test.__name__,
+                 getattr(test, '_test_id', None),
+                 getattr(test, '_config', None)])
+            path = utils.get_path_for_function(test)
+            if path and path not in sources:
+                sources[path] = _hash_file(path)
+    add(sorted(sources.values()))
+    return digest.hexdigest().encode('ascii')
+
+
+def _json_default(value):
+    # sets iterate in a different order from one process to the next
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=repr)
+    return repr(value)
+
+
+def _hash_file(path):
+    if path.endswith(('.pyc', '.pyo')):
+        path = path[:-1]
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except (IOError, OSError):
+        return path
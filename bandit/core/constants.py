@@ -10,6 +10,34 @@ plugin_name_pattern = '*.py'
 # default progress increment
 progress_increment = 50
 
+# default maximum size in bytes of the on-disk result cache
+cache_max_size = 256 * 1024 * 1024
+
+# default levels of nested archives to read and maximum number of bytes to
+# decompress from a single archive
+archive_max_depth = 3
+archive_max_size = 512 * 1024 * 1024
+
+# maximum number of files queued between discovery and scanning when they
+# are pipelined
+pipeline_queue_size = 1000
+
+# maximum number of distinct file contents remembered in a run to find files
+# with identical contents, a file identical to one past it is scanned again
+scan_index_max_size = 100000
+
+# default maximum depth of the AST of a file and number of its nodes to visit,
+# the rest of a file is left unscanned past either of them
+ast_max_depth = 10000
+ast_max_nodes = 5000000
+
+# maximum number of directory listings recorded by the lookup of .bandit
+# files for file discovery to reuse, the rest are read again by discovery
+directory_listings_max = 100000
+
+# default number of the slowest files to report when timing a scan
+timings_slowest_files = 10
+
 RANKING = ['UNDEFINED', 'LOW', 'MEDIUM', 'HIGH']
 RANKING_VALUES = {'UNDEFINED': 1, 'LOW': 3, 'MEDIUM': 5, 'HIGH': 10}
 CRITERIA = [('SEVERITY', 'UNDEFINED'), ('CONFIDENCE', 'UNDEFINED')]
@@ -18,6 +46,9 @@ CRITERIA = [('SEVERITY', 'UNDEFINED'), ('CONFIDENCE', 'UNDEFINED')]
 for rank in RANKING:
     globals()[rank] = rank
 
+# position of each ranking in RANKING, to compare rankings as integers
+RANKING_INDEX = dict((rank, index) for index, rank in enumerate(RANKING))
+
 CONFIDENCE_DEFAULT = 'UNDEFINED'
 
 # A list of values Python considers to be False.
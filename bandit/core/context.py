@@ -5,16 +5,103 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import ast
+import functools
 
 import six
+from six.moves import collections_abc
 
 from bandit.core import utils
 
 
+def cached_property(func):
+    '''Decorator for a Context property that is only computed once
+
+    A single Context is shared by all the tests run against a node, so values
+    derived from the node are worked out on first use and then reused.
+    '''
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(self):
+        try:
+            return self._cache[name]
+        except KeyError:
+            value = self._cache[name] = func(self)
+            return value
+    return property(wrapper)
+
+
+class ImportSet(collections_abc.MutableSet):
+    '''Set of the module names imported by a file
+
+    Besides exact lookups, which any set provides, this answers whether a
+    module name is part of any of the imported names. For each name that
+    gets asked about it remembers a positive answer, or how many of the
+    imports were already checked, so asking again only looks at the imports
+    added since. Every mutator of the set goes through add and discard.
+    '''
+
+    def __init__(self, names=()):
+        self._names = set()
+        # imported names in the order they were added
+        self._order = []
+        self._like = {}
+        for name in names:
+            self.add(name)
+
+    def __contains__(self, name):
+        return name in self._names
+
+    def __iter__(self):
+        return iter(self._order)
+
+    def __len__(self):
+        return len(self._names)
+
+    def __repr__(self):
+        return '%s(%r)' % (type(self).__name__, self._order)
+
+    def add(self, name):
+        if name not in self._names:
+            self._names.add(name)
+            self._order.append(name)
+
+    def discard(self, name):
+        if name in self._names:
+            self._names.remove(name)
+            self._order.remove(name)
+            self._like.clear()
+
+    def update(self, *others):
+        for other in others:
+            for name in other:
+                self.add(name)
+
+    def is_imported_like(self, module):
+        '''Check if module is part of any of the imported names
+
+        :param module: The module name to look for
+        :return: True if the module is found, False otherwise
+        '''
+        checked = self._like.get(module, 0)
+        if checked is True:
+            return True
+        for name in self._order[checked:]:
+            if module in name:
+                self._like[module] = True
+                return True
+        self._like[module] = len(self._order)
+        return False
+
+
 class Context(object):
     def __init__(self, context_object=None):
         '''Initialize the class with a context, empty dict otherwise
 
+        The context is shared by every test run against the same node, and
+        derived values are cached, so tests must not modify it or the values
+        they get from it.
+
         :param context_object: The context object to create class from
         :return: -
         '''
@@ -22,6 +109,8 @@ class Context(object):
             self._context = context_object
         else:
             self._context = dict()
+        self._cache = {}
+        self._literal_values = {}
 
     def __repr__(self):
         '''Generate representation of object for printing / interactive use
@@ -40,7 +129,7 @@ class Context(object):
         '''
         return "<Context %s>" % self._context
 
-    @property
+    @cached_property
     def call_args(self):
         '''Get a list of function args
 
@@ -55,7 +144,7 @@ class Context(object):
                     args.append(self._get_literal_value(arg))
         return args
 
-    @property
+    @cached_property
     def call_args_count(self):
         '''Get the number of args a function call has
 
@@ -82,7 +171,7 @@ class Context(object):
         '''
         return self._context.get('qualname')
 
-    @property
+    @cached_property
     def call_keywords(self):
         '''Get a dictionary of keyword parameters
 
@@ -108,6 +197,32 @@ class Context(object):
         '''
         return self._context.get('node')
 
+    @property
+    def parent(self):
+        '''Get the parent of the AST node associated with the context
+
+        :return: The parent node, None for a node at the top of the tree
+        '''
+        return self._context.get('parent')
+
+    @property
+    def sibling(self):
+        '''Get the next sibling of the AST node associated with the context
+
+        :return: The node following it in the list of nodes holding it, else
+            None
+        '''
+        return self._context.get('sibling')
+
+    @property
+    def relations(self):
+        '''Get the parent and sibling relations of the whole tree
+
+        :return: A NodeRelations of the tree of the file, to pass to helpers
+            such as utils.concat_string
+        '''
+        return self._context.get('relations')
+
     @property
     def string_val(self):
         '''Get the value of a standalone unicode or string object
@@ -124,7 +239,7 @@ class Context(object):
         '''
         return self._context.get('bytes')
 
-    @property
+    @cached_property
     def string_val_as_escaped_bytes(self):
         '''Get escaped value of the object.
 
@@ -155,7 +270,7 @@ class Context(object):
         '''
         return self._context.get('statement')
 
-    @property
+    @cached_property
     def function_def_defaults_qual(self):
         '''Get a list of fully qualified default values in a function def
 
@@ -174,9 +289,21 @@ class Context(object):
     def _get_literal_value(self, literal):
         '''Utility function to turn AST literals into native Python types
 
+        Values are cached per literal node for the lifetime of the context.
+
         :param literal: The AST literal to convert
         :return: The value of the AST literal
         '''
+        cached = self._literal_values.get(id(literal))
+        # keep a reference to the literal so its id can't be reused
+        if cached is not None and cached[0] is literal:
+            return cached[1]
+
+        literal_value = self._convert_literal(literal)
+        self._literal_values[id(literal)] = (literal, literal_value)
+        return literal_value
+
+    def _convert_literal(self, literal):
         if isinstance(literal, ast.Num):
             literal_value = literal.n
 
@@ -186,19 +313,19 @@ class Context(object):
         elif isinstance(literal, ast.List):
             return_list = list()
             for li in literal.elts:
-                return_list.append(self._get_literal_value(li))
+                return_list.append(self._convert_literal(li))
             literal_value = return_list
 
         elif isinstance(literal, ast.Tuple):
             return_tuple = tuple()
             for ti in literal.elts:
-                return_tuple = return_tuple + (self._get_literal_value(ti),)
+                return_tuple = return_tuple + (self._convert_literal(ti),)
             literal_value = return_tuple
 
         elif isinstance(literal, ast.Set):
             return_set = set()
             for si in literal.elts:
-                return_set.add(self._get_literal_value(si))
+                return_set.add(self._convert_literal(si))
             literal_value = return_set
 
         elif isinstance(literal, ast.Dict):
@@ -309,8 +436,11 @@ class Context(object):
         :param module: The module name to look for
         :return: True if the module is found, False otherwise
         '''
-        if 'imports' in self._context:
-            for imp in self._context['imports']:
+        imports = self._context.get('imports')
+        if isinstance(imports, ImportSet):
+            return imports.is_imported_like(module)
+        if imports is not None:
+            for imp in imports:
                 if module in imp:
                     return True
         return False
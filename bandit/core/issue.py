@@ -8,26 +8,38 @@ from __future__ import division
 from __future__ import unicode_literals
 
 import linecache
+import sys
 
 from six import moves
 
 from bandit.core import constants
 
 
+def _intern(value):
+    # the same few strings are repeated across millions of issues
+    return sys.intern(value) if type(value) is str else value
+
+
 class Issue(object):
+    # scans can produce a great many issues, so they have no __dict__
+    __slots__ = ('severity', 'confidence', 'text', 'ident', 'fname', 'test',
+                 'test_id', 'lineno', '_linerange', '_snippet', 'code')
+
     def __init__(self, severity, confidence=constants.CONFIDENCE_DEFAULT,
                  text="", ident=None, lineno=None, test_id=""):
-        self.severity = severity
-        self.confidence = confidence
+        self.severity = _intern(severity)
+        self.confidence = _intern(confidence)
         if isinstance(text, bytes):
             text = text.decode('utf-8')
         self.text = text
         self.ident = ident
         self.fname = ""
         self.test = ""
-        self.test_id = test_id
+        self.test_id = _intern(test_id)
         self.lineno = lineno
-        self.linerange = []
+        self._linerange = range(0)
+        # the lines of code around the issue, see keep_code
+        self._snippet = None
 
     def __str__(self):
         return ("Issue: '%s' from %s:%s: Severity: %s Confidence: "
@@ -38,17 +50,46 @@ class Issue(object):
     def __eq__(self, other):
         # if the issue text, severity, confidence, and filename match, it's
         # the same issue from our perspective
-        match_types = ['text', 'severity', 'confidence', 'fname', 'test',
-                       'test_id']
-        return all(getattr(self, field) == getattr(other, field)
-                   for field in match_types)
+        return self.match_key() == other.match_key()
 
     def __ne__(self, other):
         return not self.__eq__(other)
 
     def __hash__(self):
+        # equal issues stay distinct in sets and dicts, such as the issues
+        # and their candidates in a baseline report, use match_key() to
+        # group them
         return id(self)
 
+    @property
+    def linerange(self):
+        '''The line numbers the issue spans, as a list'''
+        if type(self._linerange) is range:
+            return list(self._linerange)
+        return self._linerange
+
+    @linerange.setter
+    def linerange(self, lines):
+        # a list of consecutive lines is kept as a range, which only holds
+        # its bounds
+        if (isinstance(lines, list) and lines and
+                all(type(line) is int for line in lines) and
+                lines == list(range(lines[0], lines[-1] + 1))):
+            lines = range(lines[0], lines[-1] + 1)
+        self._linerange = lines
+
+    def match_key(self):
+        '''Get the values compared to tell whether two issues are the same
+
+        Issues are equal when their match keys are, which allows matching
+        them against a baseline through a dict rather than pair by pair.
+
+        :return: A tuple of the text, severity, confidence, file name, test
+            name and test ID of the issue
+        '''
+        return (self.text, self.severity, self.confidence, self.fname,
+                self.test, self.test_id)
+
     def filter(self, severity, confidence):
         '''Utility to filter on confidence and severity
 
@@ -66,9 +107,39 @@ class Issue(object):
         :return: True/False depending on whether issue meets threshold
 
         '''
-        rank = constants.RANKING
-        return (rank.index(self.severity) >= rank.index(severity) and
-                rank.index(self.confidence) >= rank.index(confidence))
+        rank = constants.RANKING_INDEX
+        return (rank[self.severity] >= rank[severity] and
+                rank[self.confidence] >= rank[confidence])
+
+    def _code_span(self, max_lines):
+        # the first line of code shown for the issue and the one past the
+        # last, the span of a greater max_lines includes that of a lesser one
+        lmin = max(1, self.lineno - max_lines // 2)
+        return lmin, lmin + len(self._linerange) + max_lines - 1
+
+    def keep_code(self, data, offsets, encoding, max_lines=3):
+        '''Keep the lines of code shown for the issue, cut from the file
+
+        get_code then uses them rather than reading the file again, which
+        may not be on disk, for any max_lines up to the one given.
+
+        :param data: The file contents, as bytes
+        :param offsets: Where the lines of data start, see
+            utils.line_offsets
+        :param encoding: The encoding of the file contents
+        :param max_lines: Max lines of context to keep
+        :return: -
+        '''
+        max_lines = max(max_lines, 1)
+        lmin, lmax = self._code_span(max_lines)
+        end = len(offsets)
+        text = data[offsets[min(lmin, end) - 1]:offsets[min(lmax, end) - 1]]
+        text = text.decode(encoding, 'replace')
+        # the line ends are those linecache gives
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+        if text and not text.endswith('\n'):
+            text += '\n'
+        self._snippet = (max_lines, text)
 
     def get_code(self, max_lines=3, tabbed=False):
         '''Gets lines of code from a file the generated this issue.
@@ -79,12 +150,21 @@ class Issue(object):
         '''
         lines = []
         max_lines = max(max_lines, 1)
-        lmin = max(1, self.lineno - max_lines // 2)
-        lmax = lmin + len(self.linerange) + max_lines - 1
+        lmin, lmax = self._code_span(max_lines)
 
         tmplt = "%i\t%s" if tabbed else "%i %s"
+        snippet = None
+        if self._snippet is not None and max_lines <= self._snippet[0]:
+            first = self._code_span(self._snippet[0])[0]
+            snippet = [text + '\n'
+                       for text in self._snippet[1].split('\n')[:-1]]
         for line in moves.xrange(lmin, lmax):
-            text = linecache.getline(self.fname, line)
+            if snippet is None:
+                text = linecache.getline(self.fname, line)
+            elif line - first < len(snippet):
+                text = snippet[line - first]
+            else:
+                text = ''
 
             if isinstance(text, bytes):
                 text = text.decode('utf-8')
@@ -113,12 +193,12 @@ class Issue(object):
 
     def from_dict(self, data, with_code=True):
         self.code = data["code"]
-        self.fname = data["filename"]
-        self.severity = data["issue_severity"]
-        self.confidence = data["issue_confidence"]
+        self.fname = _intern(data["filename"])
+        self.severity = _intern(data["issue_severity"])
+        self.confidence = _intern(data["issue_confidence"])
         self.text = data["issue_text"]
-        self.test = data["test_name"]
-        self.test_id = data["test_id"]
+        self.test = _intern(data["test_name"])
+        self.test_id = _intern(data["test_id"])
         self.lineno = data["line_number"]
         self.linerange = data["line_range"]
 
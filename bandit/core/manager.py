@@ -4,17 +4,28 @@
 #
 # SPDX-License-Identifier: Apache-2.0
 
+import array
 import collections
+import copy
 import fnmatch
+import hashlib
+import heapq
+import io
 import json
 import logging
+import multiprocessing
 import os
+import re
+import signal
 import sys
-import tokenize
+import threading
+import timeit
 import traceback
 
-import six
+from six.moves import queue
 
+from bandit.core import archive as b_archive
+from bandit.core import cache as b_cache
 from bandit.core import constants as b_constants
 from bandit.core import extension_loader
 from bandit.core import issue
@@ -22,6 +33,7 @@ from bandit.core import meta_ast as b_meta_ast
 from bandit.core import metrics
 from bandit.core import node_visitor as b_node_visitor
 from bandit.core import test_set as b_test_set
+from bandit.core import utils as b_utils
 
 
 LOG = logging.getLogger(__name__)
@@ -32,7 +44,11 @@ class BanditManager(object):
     scope = []
 
     def __init__(self, config, agg_type, debug=False, verbose=False,
-                 quiet=False, profile=None, ignore_nosec=False):
+                 quiet=False, profile=None, ignore_nosec=False, jobs=1,
+                 cache_dir=None, archive_depth=None, archive_max_size=None,
+                 ast_max_depth=None, ast_max_nodes=None, ast_dump=None,
+                 ast_dump_compact=False, profile_plugins=False,
+                 timings=None, code_lines=3):
         '''Get logger, config, AST handler, and result store ready
 
         :param config: config options object
@@ -43,6 +59,28 @@ class BanditManager(object):
         :param quiet: Whether to only show output in the case of an error
         :param profile_name: Optional name of profile to use (from cmd line)
         :param ignore_nosec: Whether to ignore #nosec or not
+        :param jobs: Number of worker processes to scan files with, 0 to use
+            one per CPU
+        :param cache_dir: Directory of the on-disk result cache, or None to
+            scan every file
+        :param archive_depth: Levels of nested archives to read when
+            scanning an archive, None for the default
+        :param archive_max_size: Maximum number of bytes to decompress from
+            an archive, None for the default
+        :param ast_max_depth: Levels of the AST of a file to visit, None for
+            the default
+        :param ast_max_nodes: Maximum number of AST nodes of a file to visit,
+            None for the default
+        :param ast_dump: Optional text stream to write the AST nodes of each
+            file to as they are visited
+        :param ast_dump_compact: Whether to write one short line per node to
+            ast_dump
+        :param profile_plugins: Whether to record the time spent in each
+            test, see metrics.PluginProfile
+        :param timings: Number of the slowest files to keep when timing each
+            phase of the scan, see metrics.Timings, None not to time it
+        :param code_lines: Max lines of code to keep with each issue for
+            the report, see Issue.keep_code, None to keep none
         :return:
         '''
         self.debug = debug
@@ -51,21 +89,82 @@ class BanditManager(object):
         if not profile:
             profile = {}
         self.ignore_nosec = ignore_nosec
+        self.profile = profile
+        self.jobs = jobs or multiprocessing.cpu_count()
         self.b_conf = config
         self.files_list = []
         self.excluded_files = []
-        self.b_ma = b_meta_ast.BanditMetaAst()
+        self.b_ma = b_meta_ast.BanditMetaAst(ast_dump, ast_dump_compact)
         self.skipped = []
         self.results = []
         self.baseline = []
+        # filtered views of the results, see filter_results
+        self._result_views = None
+        # formatters writing results as files are scanned, and how many
+        # results and skipped files they were given, see stream_results
+        self.result_streams = []
+        self._streamed = (0, 0)
         self.agg_type = agg_type
-        self.metrics = metrics.Metrics()
+        self.profile_plugins = profile_plugins
+        self.timings = timings
+        self.code_lines = code_lines
+        self.metrics = metrics.Metrics(profile_plugins, timings)
         self.b_ts = b_test_set.BanditTestSet(config, profile)
+        self.cache_dir = cache_dir
+        self.cache = None
+        if cache_dir:
+            self.cache = b_cache.ResultCache(
+                cache_dir, self.b_ts, config, ignore_nosec=ignore_nosec,
+                max_size=b_constants.cache_max_size)
+        self.archive_depth = archive_depth
+        self.archive_max_size = archive_max_size
+        self.ast_max_depth = ast_max_depth
+        self.ast_max_nodes = ast_max_nodes
 
         # set the increment of after how many files to show progress
         self.progress = b_constants.progress_increment
         self.scores = []
 
+        # where the outcome of the scan of each distinct file content is, by
+        # digest, and the number of files whose outcome was copied from an
+        # identical one
+        self.scans_by_digest = _ScanIndex()
+        self.duplicates = 0
+
+        # package name of each directory seen, see
+        # utils.get_module_qualname_from_path
+        self.package_names = {}
+
+    @property
+    def excluded_files(self):
+        '''Get the files excluded from the scan
+
+        Discovery doesn't enter the directories whose files would all be
+        excluded. The files below them are only listed the first time the
+        excluded files are asked for, so a run which doesn't report them
+        never reads those directories.
+
+        :return: The sorted list of excluded files
+        '''
+        if self._excluded_dirs and isinstance(self._excluded_files,
+                                              _ItemCount):
+            for path in self._excluded_dirs:
+                self._excluded_files.extend(_iter_dir_files(path))
+            self._excluded_dirs = []
+        elif self._excluded_dirs:
+            excluded_files = set(self._excluded_files)
+            for path in self._excluded_dirs:
+                excluded_files.update(_iter_dir_files(path))
+            self._excluded_files = sorted(excluded_files)
+            self._excluded_dirs = []
+        return self._excluded_files
+
+    @excluded_files.setter
+    def excluded_files(self, excluded_files):
+        self._excluded_files = excluded_files
+        # directories whose files are excluded, not listed yet
+        self._excluded_dirs = []
+
     def get_skipped(self):
         ret = []
         # "skip" is a tuple of name and reason, decode just the name
@@ -105,20 +204,18 @@ class BanditManager(object):
         file. We can't reliably return just the new results, as line numbers
         will likely have changed.
 
+        The view for each pair of filters is worked out once and returned
+        again until the results or the baseline change, so it must not be
+        modified.
+
         :param sev_filter: severity level filter to apply
         :param conf_filter: confidence level filter to apply
         '''
-
-        results = [i for i in self.results if
-                   i.filter(sev_filter, conf_filter)]
-
-        if not self.baseline:
-            return results
-
-        unmatched = _compare_baseline_results(self.baseline, results)
-        # if it's a baseline we'll return a dictionary of issues and a list of
-        # candidate issues
-        return _find_candidate_matches(unmatched, results)
+        views = self._result_views
+        if views is None or not views.is_of(self.results, self.baseline):
+            views = self._result_views = _ResultViews(self.results,
+                                                      self.baseline)
+        return views.get(sev_filter, conf_filter)
 
     def results_count(self, sev_filter=b_constants.LOW,
                       conf_filter=b_constants.LOW):
@@ -144,6 +241,7 @@ class BanditManager(object):
                          {test_id}[bandit]: {severity}: {msg})
         :return: -
         '''
+        start = timeit.default_timer()
         try:
             formatters_mgr = extension_loader.MANAGER.formatters_mgr
             if output_format not in formatters_mgr:
@@ -161,29 +259,69 @@ class BanditManager(object):
         except Exception as e:
             raise RuntimeError("Unable to output report using '%s' formatter: "
                                "%s" % (output_format, str(e)))
+        if self.metrics.timings is not None:
+            # too late to be in the report itself
+            LOG.info("Report written in %.3f seconds",
+                     timeit.default_timer() - start)
+
+    def stream_results(self, output_file, output_format, sev_level,
+                       conf_level):
+        '''Start a formatter that writes results while files are scanned
+
+        Formatters declaring streams_results in test_properties are given
+        the results and skipped files of each file as soon as it is done.
+        There is nothing to stream with a baseline, which needs all of the
+        results to compare them.
 
-    def discover_files(self, targets, recursive=False, excluded_paths=''):
+        :param output_file: File to store results
+        :param output_format: output format plugin name
+        :param sev_level: Which severity levels to show (LOW, MEDIUM, HIGH)
+        :param conf_level: Which confidence levels to show (LOW, MEDIUM, HIGH)
+        :return: True if the formatter streams the results, else False
+        '''
+        formatters_mgr = extension_loader.MANAGER.formatters_mgr
+        if output_format not in formatters_mgr or self.baseline:
+            return False
+        stream = getattr(formatters_mgr[output_format].plugin,
+                         '_streams_results', None)
+        if stream is None:
+            return False
+        self.result_streams.append(stream(self, output_file, sev_level,
+                                          conf_level))
+        # the files skipped while discovering them
+        self._stream_file_results()
+        return True
+
+    def _stream_file_results(self):
+        '''Give the results of the files just done to the result streams'''
+        if not self.result_streams:
+            return
+        num_results, num_skipped = self._streamed
+        results = self.results[num_results:]
+        skipped = self.skipped[num_skipped:]
+        self._streamed = (len(self.results), len(self.skipped))
+        for stream in self.result_streams:
+            stream(results, skipped)
+
+    def discover_files(self, targets, recursive=False, excluded_paths='',
+                       listings=None):
         '''Add tests directly and from a directory to the test set
 
         :param targets: The command line list of files and directories
         :param recursive: True/False - whether to add all files from dirs
+        :param listings: Optional DirectoryListings recorded by an earlier
+            walk of the targets
         :return:
         '''
         # We'll mantain a list of files which are added, and ones which have
         # been explicitly excluded
         files_list = set()
         excluded_files = set()
+        excluded_dirs = []
+        start = timeit.default_timer()
 
-        excluded_path_globs = self.b_conf.get_option('exclude_dirs') or []
-        included_globs = self.b_conf.get_option('include') or ['*.py']
-
-        # if there are command line provided exclusions add them to the list
-        if excluded_paths:
-            for path in excluded_paths.split(','):
-                if os.path.isdir(path):
-                    path = os.path.join(path, '*')
-
-                excluded_path_globs.append(path)
+        included_globs, excluded_path_globs = self._get_discovery_globs(
+            excluded_paths)
 
         # build list of files we will analyze
         for fname in targets:
@@ -193,7 +331,9 @@ class BanditManager(object):
                     new_files, newly_excluded = _get_files_from_dir(
                         fname,
                         included_globs=included_globs,
-                        excluded_path_strings=excluded_path_globs
+                        excluded_path_strings=excluded_path_globs,
+                        listings=listings,
+                        excluded_dirs=excluded_dirs
                     )
                     files_list.update(new_files)
                     excluded_files.update(newly_excluded)
@@ -212,14 +352,104 @@ class BanditManager(object):
                 else:
                     excluded_files.add(fname)
 
+        if listings is not None:
+            listings.clear()
         self.files_list = sorted(files_list)
         self.excluded_files = sorted(excluded_files)
+        self._excluded_dirs = excluded_dirs
+        if self.metrics.timings is not None:
+            self.metrics.timings.add('discovery',
+                                     timeit.default_timer() - start)
+
+    def iter_files(self, targets, recursive=False, excluded_paths='',
+                   listings=None, nested_ini=True):
+        '''Find the files to scan like discover_files, yielding them early
+
+        Files are yielded as the walk finds them, in no particular order,
+        instead of being collected and sorted first. Excluded files are
+        added to excluded_files. Pass the generator to run_tests to scan
+        files while the walk is still going.
+
+        :param targets: The command line list of files and directories
+        :param recursive: True/False - whether to add all files from dirs
+        :param excluded_paths: Comma-separated paths to exclude
+        :param listings: Optional DirectoryListings recorded by an earlier
+            walk of the targets
+        :param nested_ini: False if a .bandit file found below a target
+            directory, rather than in it, is an error, because the options
+            were taken before the walk
+        :raises utils.ConfigError: For such a .bandit file
+        :return: Generator of file names
+        '''
+        included_globs, excluded_path_globs = self._get_discovery_globs(
+            excluded_paths)
+
+        # a single walk never finds a file twice, overlapping targets can:
+        # the paths found again are those below a target walked before
+        walked = []
+        for fname in targets:
+            if os.path.isdir(fname):
+                if not recursive:
+                    LOG.warning("Skipping directory (%s), use -r flag to "
+                                "scan contents", fname)
+                    continue
+                found = _iter_files_from_dir(fname, included_globs,
+                                             excluded_path_globs, listings)
+                top_ini = os.path.join(fname, '.bandit')
+            else:
+                found = [(fname, _is_file_included(fname, included_globs,
+                                                   excluded_path_globs,
+                                                   enforce_glob=False))]
+                top_ini = None
+
+            for path, included in found:
+                if walked and _is_below(path, walked):
+                    continue
+                if (not nested_ini and top_ini is not None and
+                        included is not None and path != top_ini and
+                        os.path.basename(path) == '.bandit'):
+                    raise b_utils.ConfigError(
+                        'project level .bandit file below the targets, '
+                        'its options would not be used', path)
+                if included:
+                    yield path
+                elif included is None:
+                    self._excluded_dirs.append(path)
+                else:
+                    self._excluded_files.append(path)
+            walked.append(fname)
+
+        if listings is not None:
+            listings.clear()
+
+    def _get_discovery_globs(self, excluded_paths):
+        excluded_path_globs = self.b_conf.get_option('exclude_dirs') or []
+        included_globs = self.b_conf.get_option('include') or ['*.py']
+
+        # if there are command line provided exclusions add them to the list
+        if excluded_paths:
+            for path in excluded_paths.split(','):
+                if os.path.isdir(path):
+                    path = os.path.join(path, '*')
+
+                excluded_path_globs.append(path)
+
+        return included_globs, excluded_path_globs
 
-    def run_tests(self):
+    def run_tests(self, files=None):
         '''Runs through all files in the scope
 
+        :param files: Optional iterable of files to scan instead of
+            files_list, such as the generator returned by iter_files. Files
+            are then scanned while the iterable is still being consumed, and
+            files_list is set to the files in scope at the end.
         :return: -
         '''
+        if files is not None:
+            self._run_tests_pipelined(files)
+            self._finish_tests()
+            return
+
         # display progress, if number of files warrants it
         if len(self.files_list) > self.progress:
             sys.stderr.write("%s [" % len(self.files_list))
@@ -228,24 +458,14 @@ class BanditManager(object):
         # and add it to the skipped list instead
         new_files_list = list(self.files_list)
 
-        for count, fname in enumerate(self.files_list):
-            LOG.debug("working on file : %s", fname)
-
-            if len(self.files_list) > self.progress:
-                # is it time to update the progress indicator?
-                if count % self.progress == 0:
-                    sys.stderr.write("%s.. " % count)
-                    sys.stderr.flush()
-            try:
-                if fname == '-':
-                    sys.stdin = os.fdopen(sys.stdin.fileno(), 'rb', 0)
-                    self._parse_file('<stdin>', sys.stdin, new_files_list)
-                else:
-                    with open(fname, 'rb') as fdata:
-                        self._parse_file(fname, fdata, new_files_list)
-            except IOError as e:
-                self.skipped.append((fname, e.strerror))
-                new_files_list.remove(fname)
+        if (self.jobs > 1 and len(self.files_list) > 1 and
+                '-' not in self.files_list):
+            self._run_tests_parallel(new_files_list)
+        else:
+            for count, fname in enumerate(self.files_list):
+                self._show_progress(count)
+                self._scan_file(fname, new_files_list)
+                self._stream_file_results()
 
         if len(self.files_list) > self.progress:
             sys.stderr.write("]\n")
@@ -253,41 +473,472 @@ class BanditManager(object):
 
         # reflect any files which may have been skipped
         self.files_list = new_files_list
+        self._finish_tests()
 
+    def _finish_tests(self):
         # do final aggregation of metrics
         self.metrics.aggregate()
 
+        if self.cache is not None:
+            self.metrics.set_total('cache_hits', self.cache.hits)
+            self.metrics.set_total('cache_misses', self.cache.misses)
+            self.cache.prune()
+
+        if self.duplicates:
+            # kept out of the metrics, which are part of the report schema
+            LOG.info("%i files were identical to another scanned file",
+                     self.duplicates)
+        # the positions it holds are only good until the store changes
+        self.scans_by_digest.clear()
+
+    def _run_tests_pipelined(self, files):
+        '''Scan files as they are produced by an iterable
+
+        The iterable is consumed by a background thread through a queue of
+        bounded size, so a slow walk and the scan overlap without the list
+        of files to scan building up in memory. The files in scope, the
+        excluded files and the scores of the files are only counted, see
+        _ItemCount, so that memory use grows with the results and metrics
+        reported rather than with the number of files. Once all files are
+        scanned the results and skipped files are put in the same order as
+        after a run over a sorted files_list, so reports are deterministic.
+
+        :param files: Iterable of file names
+        :return: -
+        '''
+        if self.metrics.timings is not None:
+            # the walk for files overlaps with the scan
+            files = self.metrics.timings.timed(files, 'discovery')
+        files = _iter_in_background(files, b_constants.pipeline_queue_size)
+        self.files_list = _ItemCount()
+        self.excluded_files = _ItemCount()
+        self.scores = _ItemCount()
+        start = (len(self.results), len(self.skipped))
+        targets = []
+        if self.jobs > 1:
+            self._run_pipeline_parallel(files, targets)
+        else:
+            for fname in files:
+                target = self._begin_target(fname)
+                self._scan_file(fname, target[1])
+                self._end_target(target, targets)
+                self._stream_file_results()
+
+        # reorder by target, the results and skipped files of each target
+        # are contiguous and in the order they were found in
+        results = self.results
+        skipped = self.skipped
+        self.results = results[:start[0]]
+        self.skipped = skipped[:start[1]]
+        for _, r, r_end, s, s_end in sorted(targets,
+                                            key=lambda target: target[0]):
+            self.results.extend(results[r:r_end])
+            self.skipped.extend(skipped[s:s_end])
+
+    def _begin_target(self, fname):
+        '''Note where the outcome of scanning a target starts
+
+        :param fname: The name of the file about to be scanned
+        :return: Tuple of the file name, the list of the files in scope for
+            it, which the scan updates, and the sizes of the results and
+            skipped files, to pass to _end_target
+        '''
+        return fname, [fname], len(self.results), len(self.skipped)
+
+    def _end_target(self, target, targets):
+        '''Count the files in scope of a target, and note its outcome
+
+        Only the targets with results or skipped files are noted, with the
+        bounds of those.
+
+        :param target: The tuple returned by _begin_target
+        :param targets: List of the targets noted so far
+        :return: -
+        '''
+        fname, scope, num_results, num_skipped = target
+        self.files_list.extend(scope)
+        if (len(self.results) > num_results or
+                len(self.skipped) > num_skipped):
+            targets.append((fname, num_results, len(self.results),
+                            num_skipped, len(self.skipped)))
+
+    def _run_pipeline_parallel(self, files, targets):
+        '''Scan files from an iterable with a pool of worker processes
+
+        Files are hashed as they come in and only the first file with a
+        given content is sent to the workers, for as many contents as
+        scans_by_digest keeps. At most pipeline_queue_size files are in
+        flight at any time.
+
+        :param files: Iterable of file names
+        :param targets: List of targets noted, see _end_target
+        :return: -
+        '''
+        slots = threading.BoundedSemaphore(b_constants.pipeline_queue_size)
+        pending = queue.Queue()
+        errors = []
+        seen = set()
+        max_seen = self.scans_by_digest.max_size
+
+        def unique_files():
+            # consumed by the task handler thread of the pool
+            try:
+                for fname in files:
+                    slots.acquire()
+                    digest = None
+                    if fname != '-':
+                        digest = _get_file_digest(fname)
+                    sent = fname != '-' and (digest is None or
+                                             digest not in seen)
+                    if sent and digest is not None and len(seen) < max_seen:
+                        seen.add(digest)
+                    pending.put((fname, digest, sent))
+                    if sent:
+                        yield fname
+            except Exception as e:
+                errors.append(e)
+            finally:
+                pending.put(None)
+
+        pool = multiprocessing.Pool(
+            processes=self.jobs, initializer=_init_worker,
+            initargs=(self.b_conf, self.agg_type, self.debug, self.profile,
+                      self.ignore_nosec, self.cache_dir, self.archive_depth,
+                      self.archive_max_size, self.ast_max_depth,
+                      self.ast_max_nodes, self.b_ma.stream is not None,
+                      self.b_ma.compact, self.profile_plugins,
+                      self.timings, self.code_lines))
+        try:
+            # files must be sent one at a time: a partial chunk would wait
+            # for slots only freed once its own files are merged
+            scans = pool.imap(_scan_file_in_worker, unique_files(), 1)
+            for fname, digest, sent in iter(pending.get, None):
+                target = self._begin_target(fname)
+                if fname == '-':
+                    self._scan_file(fname, target[1])
+                elif sent:
+                    self._merge_worker_scan(next(scans), digest, target[1])
+                elif digest in self.scans_by_digest:
+                    self._merge_duplicate(digest, fname, target[1])
+                else:
+                    # stdin took the last place in the full index
+                    self._scan_file(fname, target[1])
+                self._end_target(target, targets)
+                self._stream_file_results()
+                slots.release()
+            pool.close()
+        except KeyboardInterrupt:
+            pool.terminate()
+            sys.exit(2)
+        except BaseException:
+            # the workers must be stopped before joining them
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+        if errors:
+            raise errors[0]
+
+    def _run_tests_parallel(self, new_files_list):
+        '''Scan the files in scope with a pool of worker processes
+
+        Each worker builds its own test set and scans one file at a time. The
+        per-file results are merged back in files_list order, so the result
+        store looks the same as it would after a serial run. Files are hashed
+        as they are handed to the pool, while the workers scan the files
+        before them, so that only the first file with a given content is
+        sent to the workers, the others get a copy of its outcome.
+
+        :param new_files_list: files_list copy to remove skipped files from
+        :return: -
+        '''
+        pending = queue.Queue()
+        errors = []
+
+        def unique_files():
+            # consumed by the task handler thread of the pool
+            seen = set()
+            max_seen = self.scans_by_digest.max_size
+            try:
+                for fname in self.files_list:
+                    digest = _get_file_digest(fname)
+                    sent = digest is None or digest not in seen
+                    if sent and digest is not None and len(seen) < max_seen:
+                        seen.add(digest)
+                    pending.put((fname, digest, sent))
+                    if sent:
+                        yield fname
+            except Exception as e:
+                errors.append(e)
+            finally:
+                pending.put(None)
+
+        chunksize = max(1, min(64, len(self.files_list) // (self.jobs * 4)))
+        pool = multiprocessing.Pool(
+            processes=self.jobs, initializer=_init_worker,
+            initargs=(self.b_conf, self.agg_type, self.debug, self.profile,
+                      self.ignore_nosec, self.cache_dir, self.archive_depth,
+                      self.archive_max_size, self.ast_max_depth,
+                      self.ast_max_nodes, self.b_ma.stream is not None,
+                      self.b_ma.compact, self.profile_plugins,
+                      self.timings, self.code_lines))
+        try:
+            scans = pool.imap(_scan_file_in_worker, unique_files(), chunksize)
+            for count, (fname, digest, sent) in enumerate(
+                    iter(pending.get, None)):
+                self._show_progress(count)
+                if sent:
+                    self._merge_worker_scan(next(scans), digest,
+                                            new_files_list)
+                else:
+                    self._merge_duplicate(digest, fname, new_files_list)
+                self._stream_file_results()
+            pool.close()
+        except KeyboardInterrupt:
+            pool.terminate()
+            sys.exit(2)
+        except BaseException:
+            # the workers must be stopped before joining them
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+        if errors:
+            raise errors[0]
+
+    def _get_store_sizes(self):
+        # where the entries of the next file scanned will start
+        return (len(self.results), len(self.skipped), len(self.scores),
+                len(self.metrics))
+
+    def _merge_worker_scan(self, scan, digest, new_files_list):
+        '''Merge the scan of a file by a worker, noting where it went
+
+        :param scan: dict describing the scan of a file by a worker, see
+            _scan_file_in_worker
+        :param digest: The digest of the file contents, or None
+        :param new_files_list: files_list copy to remove skipped files from
+        :return: -
+        '''
+        start = self._get_store_sizes()
+        self._merge_scan(scan, new_files_list)
+        if digest is not None:
+            self.scans_by_digest.add(digest, scan['fname'], start,
+                                     self._get_store_sizes(), scan['files'])
+
+    def _merge_scan(self, scan, new_files_list):
+        '''Merge the outcome of scanning one file into the result store
+
+        :param scan: dict describing the scan of a file by a worker, see
+            _scan_file_in_worker
+        :param new_files_list: files_list copy to remove skipped files from
+        :return: -
+        '''
+        self.results.extend(scan['results'])
+        self.skipped.extend(scan['skipped'])
+        self.scores.extend(scan['scores'])
+        for name, record in scan['metrics'].items():
+            self.metrics.put(name, record)
+        if scan.get('plugins'):
+            self.metrics.plugins.merge(scan['plugins'])
+        if scan.get('timings'):
+            self.metrics.timings.merge(scan['timings'])
+        ast_dump = scan.pop('ast_dump', None)
+        if ast_dump:
+            self.b_ma.stream.write(ast_dump)
+        if scan['files'] != [scan['fname']]:
+            # archives are replaced by the members that were scanned
+            index = new_files_list.index(scan['fname'])
+            new_files_list[index:index + 1] = scan['files']
+        if self.cache is not None:
+            self.cache.hits += scan['cache_hits']
+            self.cache.misses += scan['cache_misses']
+            self.cache.stored += scan['cache_stored']
+
+    def _merge_duplicate(self, digest, fname, new_files_list):
+        '''Merge a copy of the outcome of scanning an identical file
+
+        :param digest: The digest of the contents of both files, see
+            scans_by_digest
+        :param fname: The name of the file with the same contents
+        :param new_files_list: files_list copy to remove skipped files from
+        :return: -
+        '''
+        source, start, end, files = self.scans_by_digest.get(digest)
+        LOG.debug("%s is identical to %s, copying its results", fname,
+                  source)
+
+        def rename(name):
+            # members of an archive keep their path within the archive
+            return fname + name[len(source):]
+
+        results = []
+        for result in self.results[start[0]:end[0]]:
+            result = copy.copy(result)
+            result.fname = rename(result.fname)
+            results.append(result)
+        self.duplicates += 1
+        self._merge_scan({
+            'fname': fname,
+            'results': results,
+            'skipped': [(rename(name), reason)
+                        for name, reason in self.skipped[start[1]:end[1]]],
+            'scores': self.scores[start[2]:end[2]],
+            'metrics': collections.OrderedDict(
+                (rename(name), self.metrics.get(name))
+                for name in self.metrics.files(start[3], end[3])),
+            'files': [rename(name) for name in files],
+            'cache_hits': 0,
+            'cache_misses': 0,
+            'cache_stored': 0,
+        }, new_files_list)
+
+    def _show_progress(self, count):
+        if len(self.files_list) > self.progress:
+            # is it time to update the progress indicator?
+            if count % self.progress == 0:
+                sys.stderr.write("%s.. " % count)
+                sys.stderr.flush()
+
+    def _scan_file(self, fname, new_files_list):
+        '''Open a single file in scope and run the tests against it
+
+        :param fname: The name of the file to scan, '-' for stdin
+        :param new_files_list: files_list copy to remove skipped files from
+        :return: -
+        '''
+        LOG.debug("working on file : %s", fname)
+        try:
+            if fname == '-':
+                sys.stdin = os.fdopen(sys.stdin.fileno(), 'rb', 0)
+                self._parse_file('<stdin>', sys.stdin, new_files_list)
+            elif b_archive.is_archive(fname):
+                with open(fname, 'rb') as fdata:
+                    self._scan_archive(fname, fdata, new_files_list)
+            else:
+                with open(fname, 'rb') as fdata:
+                    self._parse_file(fname, fdata, new_files_list)
+        except IOError as e:
+            self.skipped.append((fname, e.strerror))
+            new_files_list.remove(fname)
+
+    def _scan_archive(self, fname, fdata, new_files_list):
+        '''Scan the members of an archive without extracting it to disk
+
+        The archive is replaced in new_files_list by the names of the
+        members that were scanned, which are the archive name and the path
+        of the member joined by '!'.
+
+        :param fname: The name of the archive
+        :param fdata: The open archive, in binary mode
+        :param new_files_list: files_list copy to remove skipped files from
+        :return: -
+        '''
+        reader = b_archive.ArchiveReader(self.archive_depth,
+                                         self.archive_max_size)
+        members = []
+        for name, data, reason in reader.read(fname, fdata,
+                                              self._is_member_included):
+            if reason is not None:
+                self.skipped.append((name, reason))
+                continue
+            LOG.debug("working on archive member : %s", name)
+            members.append(name)
+            self._parse_file(name, io.BytesIO(data), members)
+
+        index = new_files_list.index(fname)
+        new_files_list[index:index + 1] = members
+
+    def _is_member_included(self, path):
+        included_globs = self.b_conf.get_option('include') or ['*.py']
+        excluded_path_globs = self.b_conf.get_option('exclude_dirs') or []
+        return _is_file_included(path, included_globs, excluded_path_globs)
+
     def _parse_file(self, fname, fdata, new_files_list):
+        '''Scan the contents of a file, unless an identical file was scanned
+
+        :param fname: The name of the file being scanned
+        :param fdata: The open file, in binary mode
+        :param new_files_list: files_list copy to remove skipped files from
+        :return: -
+        '''
+        timings = self.metrics.timings
+        start = timeit.default_timer()
+        data = fdata.read()
+        if timings is not None:
+            timings.begin_file(fname, len(data))
+            timings.add_file('read', timeit.default_timer() - start)
+        digest = hashlib.sha256(data).digest()
+        if digest in self.scans_by_digest:
+            self._merge_duplicate(digest, fname, new_files_list)
+        else:
+            start = self._get_store_sizes()
+            num_files = len(new_files_list)
+            self._scan_data(fname, data, new_files_list)
+            if self.code_lines is not None:
+                self._keep_code(data, self.results[start[0]:])
+            self.scans_by_digest.add(
+                digest, fname, start, self._get_store_sizes(),
+                [fname] if len(new_files_list) == num_files else [])
+
+        if timings is not None:
+            timings.end_file()
+
+    def _keep_code(self, data, results):
+        '''Keep the code shown for each issue, cut from the file contents
+
+        The report then doesn't read the files again, which it can't do
+        for stdin or the members of an archive.
+
+        :param data: The file contents, as bytes
+        :param results: The issues found in the file
+        :return: -
+        '''
+        if not results:
+            return
+        offsets = b_utils.line_offsets(data)
+        encoding = b_utils.source_encoding(data)
+        # Issue.as_dict shows three lines
+        max_lines = max(self.code_lines, 3)
+        for result in results:
+            result.keep_code(data, offsets, encoding, max_lines)
+
+    def _scan_data(self, fname, data, new_files_list):
+        cache_key = None
         try:
-            # parse the current file
-            data = fdata.read()
-            lines = data.splitlines()
+            if self.cache is not None:
+                cache_key = self.cache.get_key(data)
+                if self._load_cached(fname, cache_key, new_files_list):
+                    return
+            num_results = len(self.results)
+            num_skipped = len(self.skipped)
             self.metrics.begin(fname)
-            self.metrics.count_locs(lines)
+            self.metrics.count_locs(data)
             if self.ignore_nosec:
                 nosec_lines = set()
+            elif self.metrics.timings is not None:
+                start = timeit.default_timer()
+                nosec_lines = b_utils.get_nosec_lines(data)
+                self.metrics.timings.add_file('nosec',
+                                              timeit.default_timer() - start)
             else:
-                try:
-                    fdata.seek(0)
-                    if six.PY2:
-                        tokens = tokenize.generate_tokens(fdata.readline)
-                    else:
-                        tokens = tokenize.tokenize(fdata.readline)
-                    nosec_lines = set(
-                        lineno for toktype, tokval, (lineno, _), _, _ in tokens
-                        if toktype == tokenize.COMMENT and
-                        '#nosec' in tokval or '# nosec' in tokval)
-                except tokenize.TokenError:
-                    nosec_lines = set()
+                nosec_lines = b_utils.get_nosec_lines(data)
             score = self._execute_ast_visitor(fname, data, nosec_lines)
             self.scores.append(score)
             self.metrics.count_issues([score, ])
+            # partial results of a file left unscanned in part aren't kept
+            if cache_key is not None and len(self.skipped) == num_skipped:
+                self.cache.store(cache_key, self.results[num_results:], score,
+                                 self.metrics.current)
         except KeyboardInterrupt:
             sys.exit(2)
         except SyntaxError:
-            self.skipped.append((fname,
-                                 "syntax error while parsing AST from file"))
+            reason = "syntax error while parsing AST from file"
+            self.skipped.append((fname, reason))
             new_files_list.remove(fname)
+            if cache_key is not None:
+                self.cache.store(cache_key, [], None, self.metrics.current,
+                                 skipped=reason)
         except Exception as e:
             LOG.error("Exception occurred when executing tests against "
                       "%s. Run \"bandit --debug %s\" to see the full "
@@ -297,6 +948,27 @@ class BanditManager(object):
             LOG.debug("  Exception string: %s", e)
             LOG.debug("  Exception traceback: %s", traceback.format_exc())
 
+    def _load_cached(self, fname, cache_key, new_files_list):
+        '''Take the outcome of scanning a file from the result cache
+
+        :param fname: The name of the file being scanned
+        :param cache_key: The cache key of the file contents
+        :param new_files_list: files_list copy to remove skipped files from
+        :return: True if the cache had an entry for the file, else False
+        '''
+        entry = self.cache.get(cache_key)
+        if entry is None:
+            return False
+
+        self.metrics.load(fname, entry['metrics'])
+        if entry['skipped'] is not None:
+            self.skipped.append((fname, entry['skipped']))
+            new_files_list.remove(fname)
+        else:
+            self.results.extend(self.cache.issues_from_entry(entry, fname))
+            self.scores.append(entry['score'])
+        return True
+
     def _execute_ast_visitor(self, fname, data, nosec_lines):
         '''Execute AST parse on each file
 
@@ -308,32 +980,331 @@ class BanditManager(object):
         score = []
         res = b_node_visitor.BanditNodeVisitor(fname, self.b_ma,
                                                self.b_ts, self.debug,
-                                               nosec_lines, self.metrics)
+                                               nosec_lines, self.metrics,
+                                               self.package_names,
+                                               self.ast_max_depth,
+                                               self.ast_max_nodes)
 
-        score = res.process(data)
+        self.b_ma.begin(fname)
+        try:
+            score = res.process(data)
+        finally:
+            self.b_ma.end()
         self.results.extend(res.tester.results)
+        if res.incomplete:
+            self.skipped.append((fname, res.incomplete))
         return score
 
 
+# BanditManager used by a worker process of a parallel scan, see _init_worker
+_worker_manager = None
+
+
+def _init_worker(config, agg_type, debug, profile, ignore_nosec, cache_dir,
+                 archive_depth, archive_max_size, ast_max_depth,
+                 ast_max_nodes, ast_dump, ast_dump_compact, profile_plugins,
+                 timings, code_lines):
+    '''Set up the BanditManager of a worker process for a parallel scan'''
+    global _worker_manager
+    # the parent process deals with interrupts and terminates the pool
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _worker_manager = BanditManager(config, agg_type, debug=debug,
+                                    quiet=True, profile=profile,
+                                    ignore_nosec=ignore_nosec,
+                                    cache_dir=cache_dir,
+                                    archive_depth=archive_depth,
+                                    archive_max_size=archive_max_size,
+                                    ast_max_depth=ast_max_depth,
+                                    ast_max_nodes=ast_max_nodes,
+                                    ast_dump=io.StringIO() if ast_dump
+                                    else None,
+                                    ast_dump_compact=ast_dump_compact,
+                                    profile_plugins=profile_plugins,
+                                    timings=timings,
+                                    code_lines=code_lines)
+
+
+def _scan_file_in_worker(fname):
+    '''Scan a single file in a worker process
+
+    :param fname: The name of the file to scan
+    :return: dict with the results, skipped entries, scores and metrics of
+        the file, the names of the files that stayed in scope (the members
+        of an archive, or the file itself), the result cache counters, the
+        AST nodes written for the file when they are being dumped, the
+        time spent in each test when it is being profiled and the time spent
+        in each phase when the scan is timed
+    '''
+    b_mgr = _worker_manager
+    b_mgr.results = []
+    b_mgr.skipped = []
+    b_mgr.scores = []
+    b_mgr.metrics = metrics.Metrics(b_mgr.profile_plugins, b_mgr.timings)
+    b_mgr.scans_by_digest.clear()
+    if b_mgr.cache is not None:
+        b_mgr.cache.hits = b_mgr.cache.misses = b_mgr.cache.stored = 0
+    if b_mgr.b_ma.stream is not None:
+        b_mgr.b_ma.stream = io.StringIO()
+    files_list = [fname]
+    b_mgr._scan_file(fname, files_list)
+    return {
+        'fname': fname,
+        'results': b_mgr.results,
+        'skipped': b_mgr.skipped,
+        'scores': b_mgr.scores,
+        'metrics': dict((name, b_mgr.metrics.get(name))
+                        for name in b_mgr.metrics.files()),
+        'files': files_list,
+        'cache_hits': b_mgr.cache.hits if b_mgr.cache else 0,
+        'cache_misses': b_mgr.cache.misses if b_mgr.cache else 0,
+        'cache_stored': b_mgr.cache.stored if b_mgr.cache else 0,
+        'ast_dump': (b_mgr.b_ma.stream.getvalue()
+                     if b_mgr.b_ma.stream is not None else None),
+        'plugins': (b_mgr.metrics.plugins.entries
+                    if b_mgr.metrics.plugins is not None else None),
+        'timings': (b_mgr.metrics.timings.get()
+                    if b_mgr.metrics.timings is not None else None),
+    }
+
+
+def _get_file_digest(fname):
+    '''Get the digest of the contents of a file, or None if unreadable'''
+    try:
+        with open(fname, 'rb') as fdata:
+            return hashlib.sha256(fdata.read()).digest()
+    except (IOError, OSError):
+        return None
+
+
+def _iter_in_background(items, maxsize):
+    '''Iterate over items in a thread, through a queue of bounded size'''
+    items_queue = queue.Queue(maxsize)
+    done = object()
+
+    def produce():
+        try:
+            for item in items:
+                items_queue.put((item, None))
+        except Exception as e:
+            items_queue.put((done, e))
+        else:
+            items_queue.put((done, None))
+
+    thread = threading.Thread(target=produce, name='bandit-discovery')
+    thread.daemon = True
+    thread.start()
+    while True:
+        item, error = items_queue.get()
+        if item is done:
+            if error is not None:
+                raise error
+            return
+        yield item
+
+
 def _get_files_from_dir(files_dir, included_globs=None,
-                        excluded_path_strings=None):
+                        excluded_path_strings=None, listings=None,
+                        excluded_dirs=None):
+    '''Find the files to scan and the files excluded below a directory
+
+    :param files_dir: The directory to walk
+    :param included_globs: Globs of the files to include
+    :param excluded_path_strings: Globs and strings of the paths to exclude
+    :param listings: Optional DirectoryListings to take directory listings
+        from instead of reading the directories again
+    :param excluded_dirs: Optional list to add the directories whose files
+        are all excluded to, instead of listing their files
+    :return: Sets of the files to scan and of the files excluded
+    '''
+    files_list = set()
+    excluded_files = set()
+    for path, included in _iter_files_from_dir(files_dir, included_globs,
+                                               excluded_path_strings,
+                                               listings):
+        if included:
+            files_list.add(path)
+        elif included is None:
+            if excluded_dirs is not None:
+                excluded_dirs.append(path)
+            else:
+                excluded_files.update(_iter_dir_files(path))
+        else:
+            excluded_files.add(path)
+
+    return files_list, excluded_files
+
+
+def _iter_files_from_dir(files_dir, included_globs=None,
+                         excluded_path_strings=None, listings=None):
+    '''Walk a directory, yielding (path, included) pairs as they are found
+
+    Directories whose files would all be excluded are not entered, they are
+    yielded with included set to None instead.
+
+    :param files_dir: The directory to walk
+    :param included_globs: Globs of the files to include
+    :param excluded_path_strings: Globs and strings of the paths to exclude
+    :param listings: Optional DirectoryListings to take directory listings
+        from instead of reading the directories again
+    :return: Generator of (path, included) tuples
+    '''
     if not included_globs:
         included_globs = ['*.py']
     if not excluded_path_strings:
         excluded_path_strings = []
 
-    files_list = set()
-    excluded_files = set()
-
-    for root, _, files in os.walk(files_dir):
-        for filename in files:
+    matcher = _PathMatcher(included_globs, excluded_path_strings)
+
+    # walk the tree like os.walk does, without following symlinks to
+    # directories, but skip directories whose files would all be excluded
+    # and directories that were already visited through another path
+    visited = set()
+    dirs = [files_dir]
+    while dirs:
+        root = dirs.pop()
+        listing = None
+        if listings is not None:
+            listing = listings.pop(root)
+        if listing is None:
+            listing = _list_dir(root)
+        if listing is None:
+            continue
+        key, filenames, dirnames = listing
+        if key in visited:
+            LOG.debug("Skipping directory visited before: %s", root)
+            continue
+        visited.add(key)
+
+        for filename in filenames:
             path = os.path.join(root, filename)
-            if _is_file_included(path, included_globs, excluded_path_strings):
-                files_list.add(path)
+            yield path, matcher.is_included(path)
+        for dirname in dirnames:
+            path = os.path.join(root, dirname)
+            if matcher.is_dir_excluded(path):
+                yield path, None
             else:
-                excluded_files.add(path)
+                dirs.append(path)
+
+
+def _is_below(path, targets):
+    '''Check whether a path is one of the targets or below one of them'''
+    for target in targets:
+        if path == target or path.startswith(os.path.join(target, '')):
+            return True
+    return False
+
+
+def _iter_dir_files(files_dir):
+    '''Yield the paths of all files below a directory, as os.walk finds them
+
+    :param files_dir: The directory
+    :return: Generator of file paths
+    '''
+    for root, _, filenames in os.walk(files_dir):
+        for filename in filenames:
+            yield os.path.join(root, filename)
+
+
+def _list_dir(root):
+    '''Read a directory like os.walk does
+
+    :param root: The directory
+    :return: ((st_dev, st_ino), file names, names of the directories which
+        are not symlinks) or None if the directory can't be read
+    '''
+    try:
+        st = os.stat(root)
+        entries = list(os.scandir(root))
+    except OSError:
+        return None
+
+    filenames = []
+    dirnames = []
+    for entry in entries:
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+
+        if not is_dir:
+            filenames.append(entry.name)
+        elif not entry.is_symlink():
+            dirnames.append(entry.name)
+    return (st.st_dev, st.st_ino), filenames, dirnames
 
-    return files_list, excluded_files
+
+class DirectoryListings(object):
+    """Directory listings recorded by one walk for the next one to use.
+
+    The lookup of .bandit files has to walk the targets before the options
+    needed to discover the files to scan are known. It records the listing
+    of the directories it reads here, up to max_listings of them, and
+    discovery then takes the listings from here instead of reading those
+    directories a second time.
+    """
+
+    def __init__(self, max_listings=b_constants.directory_listings_max):
+        self._listings = {}
+        self.max_listings = max_listings
+
+    def walk(self, top):
+        '''Walk a directory like os.walk, recording what is read
+
+        :param top: The directory to walk
+        :return: Generator of (root, dirnames, filenames) tuples
+        '''
+        visited = set()
+        dirs = [top]
+        while dirs:
+            root = dirs.pop()
+            listing = _list_dir(root)
+            if listing is None or listing[0] in visited:
+                continue
+            visited.add(listing[0])
+            if len(self._listings) < self.max_listings:
+                self._listings[root] = listing
+            yield root, listing[2], listing[1]
+            dirs.extend(os.path.join(root, dirname)
+                        for dirname in reversed(listing[2]))
+
+    def pop(self, root):
+        '''Take the recorded listing of a directory
+
+        :param root: The directory
+        :return: The listing as returned by _list_dir, or None
+        '''
+        return self._listings.pop(root, None)
+
+    def clear(self):
+        self._listings.clear()
+
+
+class _PathMatcher(object):
+    '''Match paths like _is_file_included, with the globs compiled once'''
+
+    def __init__(self, included_globs, excluded_path_strings):
+        self._included = _compile_glob_list(included_globs)
+        self._excluded = _compile_glob_list(excluded_path_strings)
+        # globs ending in '*' match every path below a directory they match
+        self._excluded_dirs = _compile_glob_list(
+            [glob for glob in excluded_path_strings if glob.endswith('*')])
+        self._excluded_strings = None
+        if excluded_path_strings:
+            self._excluded_strings = re.compile('|'.join(
+                re.escape(string) for string in excluded_path_strings))
+
+    def is_included(self, path):
+        return (self._included(path) and not self._excluded(path) and
+                not self._has_excluded_string(path))
+
+    def is_dir_excluded(self, path):
+        '''Check whether all files below a directory would be excluded'''
+        path = os.path.join(path, '')
+        return self._excluded_dirs(path) or self._has_excluded_string(path)
+
+    def _has_excluded_string(self, path):
+        return (self._excluded_strings is not None and
+                self._excluded_strings.search(path) is not None)
 
 
 def _is_file_included(path, included_globs, excluded_path_strings,
@@ -370,6 +1341,174 @@ def _matches_glob_list(filename, glob_list):
     return False
 
 
+def _compile_glob_list(glob_list):
+    '''Compile globs into one function matching like _matches_glob_list'''
+    if not glob_list:
+        return lambda filename: False
+    pattern = re.compile('|'.join(
+        '(?:%s)' % fnmatch.translate(os.path.normcase(glob))
+        for glob in glob_list))
+    return lambda filename: bool(pattern.match(os.path.normcase(filename)))
+
+
+class _ItemCount(object):
+    '''Stands in for a list whose items are only counted
+
+    A pipelined scan keeps how many files were in scope or excluded, and
+    how many scores it got, rather than lists of them, so that its memory
+    use doesn't grow with the number of files. Iterating over it yields
+    nothing.
+    '''
+
+    def __init__(self):
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        return iter(())
+
+    def __getitem__(self, index):
+        # a slice of placeholders, to extend another count with
+        return [None] * len(range(*index.indices(self.count)))
+
+    def append(self, item):
+        self.count += 1
+
+    def extend(self, items):
+        for _ in items:
+            self.count += 1
+
+
+class _ScanIndex(object):
+    '''Where the outcome of scanning each distinct file content is
+
+    Files with the same contents as one scanned before get a copy of its
+    outcome. For each digest only the name of the file scanned and the
+    bounds of its entries in the results, skipped files, scores and metrics
+    of the manager are kept, rather than slices of those, along with the
+    files which stayed in scope when that isn't just the file itself. At
+    most max_size file contents are kept, later ones are not added.
+    '''
+
+    # start and end in results, skipped, scores and metrics
+    _WIDTH = 8
+
+    def __init__(self, max_size=b_constants.scan_index_max_size):
+        self.max_size = max_size
+        self._positions = {}
+        self._fnames = []
+        self._bounds = array.array('l')
+        self._files = {}
+
+    def __contains__(self, digest):
+        return digest in self._positions
+
+    def __len__(self):
+        return len(self._positions)
+
+    def add(self, digest, fname, start, end, files):
+        '''Note where the outcome of scanning a file is
+
+        :param digest: The digest of the file contents
+        :param fname: The name of the file
+        :param start: The sizes of the results, skipped files, scores and
+            metrics before the file was scanned
+        :param end: Their sizes after it was scanned
+        :param files: The files which stayed in scope
+        :return: -
+        '''
+        if len(self._positions) >= self.max_size:
+            return
+        position = len(self._fnames)
+        self._positions[digest] = position
+        self._fnames.append(fname)
+        self._bounds.extend(start)
+        self._bounds.extend(end)
+        if files != [fname]:
+            self._files[position] = list(files)
+
+    def get(self, digest):
+        '''Get where the outcome of scanning a file content is
+
+        :param digest: The digest of the file contents
+        :return: The name of the file scanned, the start and end of its
+            entries as given to add() and the files which stayed in scope
+        '''
+        position = self._positions[digest]
+        fname = self._fnames[position]
+        bounds = self._bounds[position * self._WIDTH:
+                              (position + 1) * self._WIDTH]
+        half = self._WIDTH // 2
+        return (fname, tuple(bounds[:half]), tuple(bounds[half:]),
+                self._files.get(position, [fname]))
+
+    def clear(self):
+        self._positions.clear()
+        del self._fnames[:]
+        del self._bounds[:]
+        self._files.clear()
+
+
+class _ResultViews(object):
+    '''The results filtered by severity and confidence, for a baseline
+
+    The positions of the results are bucketed by their severity and
+    confidence ranks once, and a view is built from the buckets that pass
+    the filters the first time it is asked for.
+    '''
+
+    def __init__(self, results, baseline):
+        self.results = results
+        self.baseline = baseline
+        self.sizes = (len(results), len(baseline))
+        self.views = {}
+        rank = b_constants.RANKING_INDEX
+        self.buckets = [[] for _ in range(len(rank) * len(rank))]
+        for index, result in enumerate(results):
+            self.buckets[rank[result.severity] * len(rank) +
+                         rank[result.confidence]].append(index)
+
+    def is_of(self, results, baseline):
+        '''Whether the views are of these results and this baseline'''
+        return (self.results is results and self.baseline is baseline and
+                self.sizes == (len(results), len(baseline)))
+
+    def get(self, sev_filter, conf_filter):
+        '''Get the view of the results for a pair of filters
+
+        :param sev_filter: severity level filter to apply
+        :param conf_filter: confidence level filter to apply
+        :return: list of results, or a dict of the results not in the
+            baseline and their candidates when there is a baseline
+        '''
+        view = self.views.get((sev_filter, conf_filter))
+        if view is not None:
+            return view
+
+        rank = b_constants.RANKING_INDEX
+        sev_rank = rank[sev_filter]
+        conf_rank = rank[conf_filter]
+        selected = [self.buckets[sev * len(rank) + conf]
+                    for sev in range(sev_rank, len(rank))
+                    for conf in range(conf_rank, len(rank))]
+        # the buckets hold positions in order, merge them to keep it
+        results = [self.results[index]
+                   for index in heapq.merge(*[indexes for indexes in selected
+                                              if indexes])]
+
+        if not self.baseline:
+            view = results
+        else:
+            unmatched = _compare_baseline_results(self.baseline, results)
+            # if it's a baseline we'll return a dictionary of issues and a
+            # list of candidate issues
+            view = _find_candidate_matches(unmatched, results)
+        self.views[(sev_filter, conf_filter)] = view
+        return view
+
+
 def _compare_baseline_results(baseline, results):
     """Compare a baseline list of issues to list of results
 
@@ -380,7 +1519,8 @@ def _compare_baseline_results(baseline, results):
     :param results: Current list of issues
     :return: List of unmatched issues
     """
-    return [a for a in results if a not in baseline]
+    baseline_keys = set(issue.match_key() for issue in baseline)
+    return [a for a in results if a.match_key() not in baseline_keys]
 
 
 def _find_candidate_matches(unmatched_issues, results_list):
@@ -398,8 +1538,16 @@ def _find_candidate_matches(unmatched_issues, results_list):
 
     issue_candidates = collections.OrderedDict()
 
+    # group the results by match key, for the keys of unmatched issues only
+    candidates_by_key = dict((unmatched.match_key(), [])
+                             for unmatched in unmatched_issues)
+    for result in results_list:
+        candidates = candidates_by_key.get(result.match_key())
+        if candidates is not None:
+            candidates.append(result)
+
     for unmatched in unmatched_issues:
-        issue_candidates[unmatched] = ([i for i in results_list if
-                                        unmatched == i])
+        issue_candidates[unmatched] = list(
+            candidates_by_key[unmatched.match_key()])
 
     return issue_candidates
@@ -13,11 +13,39 @@ LOG = logging.getLogger(__name__)
 
 
 class BanditMetaAst(object):
+    """The AST nodes visited in debug mode, one file at a time.
 
-    nodes = collections.OrderedDict()
+    Nodes are captured between begin() and end() for a single file and
+    released at end(). Without a stream they are kept until then and logged
+    at debug level. With a stream, each node is written to it as soon as it
+    is added and nothing is kept but the count.
+    """
 
-    def __init__(self):
-        pass
+    def __init__(self, stream=None, compact=False):
+        '''Set up the capture of the AST nodes
+
+        :param stream: Optional text stream to write the nodes to
+        :param compact: Whether to write one short line per node, indented
+            by its depth, rather than the full listing
+        '''
+        self.stream = stream
+        self.compact = compact
+        self.fname = None
+        self.count = 0
+        self.nodes = collections.OrderedDict()
+
+    def begin(self, fname):
+        '''Start capturing the nodes of a file
+
+        :param fname: The name of the file
+        :return: -
+        '''
+        self.fname = fname
+        self.count = 0
+        self.nodes.clear()
+        if self.stream is not None:
+            self.stream.write("%s: %s\n" % ('#' if self.compact else 'File',
+                                            fname))
 
     def add_node(self, node, parent_id, depth):
         '''Add a node to the AST node collection
@@ -29,9 +57,33 @@ class BanditMetaAst(object):
         '''
         node_id = hex(id(node))
         LOG.debug('adding node : %s [%s]', node_id, depth)
-        self.nodes[node_id] = {
-            'raw': node, 'parent_id': parent_id, 'depth': depth
-        }
+        self.count += 1
+        if self.stream is None:
+            self.nodes[node_id] = {
+                'raw': node, 'parent_id': parent_id, 'depth': depth
+            }
+        elif self.compact:
+            self.stream.write("%s%s %s\n" % (
+                '  ' * depth, node.__class__.__name__,
+                getattr(node, 'lineno', '-')))
+        else:
+            self.stream.write("Node: %s\n\t%s\n" % (node_id, {
+                'raw': node, 'parent_id': parent_id, 'depth': depth
+            }))
+
+    def end(self):
+        '''Finish capturing the nodes of a file and release them
+
+        :return: -
+        '''
+        if self.stream is not None:
+            if not self.compact:
+                self.stream.write("Length: %s\n" % self.count)
+            self.stream.flush()
+        elif self.nodes:
+            LOG.debug("AST nodes of %s:\n%s", self.fname, self)
+        self.fname = None
+        self.nodes.clear()
 
     def __str__(self):
         '''Dumps a listing of all of the nodes
@@ -39,9 +91,9 @@ class BanditMetaAst(object):
         Dumps a listing of all of the nodes for debugging purposes
         :return: -
         '''
-        tmpstr = ""
+        lines = []
         for k, v in self.nodes.items():
-            tmpstr += "Node: %s\n" % k
-            tmpstr += "\t%s\n" % str(v)
-        tmpstr += "Length: %s\n" % len(self.nodes)
-        return tmpstr
+            lines.append("Node: %s\n" % k)
+            lines.append("\t%s\n" % str(v))
+        lines.append("Length: %s\n" % len(self.nodes))
+        return "".join(lines)
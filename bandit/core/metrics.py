@@ -4,11 +4,33 @@
 #
 # SPDX-License-Identifier: Apache-2.0
 
-import collections
+import array
+import heapq
+import re
+import timeit
 
 from bandit.core import constants
 
 
+# labels of the issue counts, which follow the loc and nosec counters of each
+# file
+ISSUE_LABELS = ['{0}.{1}'.format(criteria, rank)
+                for criteria, _ in constants.CRITERIA
+                for rank in constants.RANKING]
+
+_LOC = 0
+_NOSEC = 1
+_ISSUES = 2
+_WIDTH = _ISSUES + len(ISSUE_LABELS)
+
+# the first character of a line that is neither blank nor a comment, lines
+# being split the way bytes.splitlines() splits them
+_CODE_LINE = re.compile(br'(?:\A|(?<=[\r\n]))[ \t\x0b\x0c]*[^\s#]')
+
+# phases of a scan timed by Timings, in the order they happen to a file
+PHASES = ('discovery', 'read', 'nosec', 'parse', 'visit')
+
+
 class Metrics(object):
     """Bandit metric gathering.
 
@@ -17,16 +39,60 @@ class Metrics(object):
     is, an active metric block will be set when requested and all subsequent
     operations will effect that metric block until it is replaced by a setting
     a new one.
+
+    The counters of every file are kept side by side in a single array, and
+    the totals are updated along with them. The dict of dicts formatters
+    read from data is only built when it is asked for.
     """
 
-    def __init__(self):
-        self.data = dict()
-        self.data['_totals'] = {'loc': 0, 'nosec': 0}
+    def __init__(self, profile_plugins=False, slowest_files=None):
+        '''Set up empty metrics
 
-        # initialize 0 totals for criteria and rank; this will be reset later
-        for rank in constants.RANKING:
-            for criteria in constants.CRITERIA:
-                self.data['_totals']['{0}.{1}'.format(criteria[0], rank)] = 0
+        :param profile_plugins: Whether to record the time spent in each test
+            in plugins, reported under '_plugins'
+        :param slowest_files: Number of the slowest files to keep in timings,
+            reported under '_timings', None not to time the scan
+        '''
+        # names of the files in the order they began, and the index of each
+        self._names = []
+        self._index = {}
+        # _WIDTH counters for each file and whether its issues were counted
+        self._counts = array.array('l')
+        self._issues_counted = bytearray()
+        self._totals = array.array('l', [0] * _WIDTH)
+        self._extra_totals = {}
+        self._current = None
+        self._data = None
+        self.plugins = PluginProfile() if profile_plugins else None
+        self.timings = (Timings(slowest_files) if slowest_files is not None
+                        else None)
+
+    @property
+    def data(self):
+        '''The metrics of each file and their totals, under '_totals'
+
+        The time spent in each test is under '_plugins' when it is profiled,
+        and the time spent in each phase of the scan under '_timings' when it
+        is timed.
+
+        :return: dict of the metrics dicts, built from the counters the first
+            time it is asked for after they changed
+        '''
+        if self._data is None:
+            data = {'_totals': self._get_totals()}
+            if self.plugins is not None:
+                data['_plugins'] = self.plugins.rows()
+            if self.timings is not None:
+                data['_timings'] = self.timings.as_dict()
+            for index, fname in enumerate(self._names):
+                data[fname] = self._get_file_metrics(index)
+            self._data = data
+        return self._data
+
+    @property
+    def current(self):
+        '''The metrics of the active file, as a dict'''
+        return self._get_file_metrics(self._current)
 
     def begin(self, fname):
         """Begin a new metric block.
@@ -35,8 +101,20 @@ class Metrics(object):
 
         :param fname: the metrics unique name, normally the file name.
         """
-        self.data[fname] = {'loc': 0, 'nosec': 0}
-        self.current = self.data[fname]
+        index = self._index.get(fname)
+        if index is None:
+            index = self._index[fname] = len(self._names)
+            self._names.append(fname)
+            self._counts.extend([0] * _WIDTH)
+            self._issues_counted.append(0)
+        else:
+            start = index * _WIDTH
+            for i in range(_WIDTH):
+                self._totals[i] -= self._counts[start + i]
+                self._counts[start + i] = 0
+            self._issues_counted[index] = 0
+        self._current = index
+        self._data = None
 
     def note_nosec(self, num=1):
         """Note a "nosec" commnet.
@@ -45,7 +123,7 @@ class Metrics(object):
 
         :param num: number of nosecs seen, defaults to 1
         """
-        self.current['nosec'] += num
+        self._add(_NOSEC, num)
 
     def count_locs(self, lines):
         """Count lines of code.
@@ -53,41 +131,316 @@ class Metrics(object):
         We count lines that are not empty and are not comments. The result is
         added to our currently active metrics loc count (normally this is 0).
 
-        :param lines: lines in the file to process
+        :param lines: the file contents as bytes, or the lines in the file
         """
+        if isinstance(lines, bytes):
+            self._add(_LOC, len(_CODE_LINE.findall(lines)))
+            return
+
         def proc(line):
             tmp = line.strip()
             return bool(tmp and not tmp.startswith(b'#'))
 
-        self.current['loc'] += sum(proc(line) for line in lines)
+        self._add(_LOC, sum(proc(line) for line in lines))
 
     def count_issues(self, scores):
-        self.current.update(self._get_issue_counts(scores))
+        '''Set the issue counts of the active file from its scores
+
+        :param scores: list of scores to aggregate / count
+        '''
+        start = self._current * _WIDTH + _ISSUES
+        for i, count in enumerate(self._get_issue_counts(scores)):
+            self._totals[_ISSUES + i] += count - self._counts[start + i]
+            self._counts[start + i] = count
+        self._issues_counted[self._current] = 1
+        self._data = None
 
     def aggregate(self):
-        """Do final aggregation of metrics."""
-        c = collections.Counter()
-        for fname in self.data:
-            c.update(self.data[fname])
-        self.data['_totals'] = dict(c)
+        """Do final aggregation of metrics.
+
+        The totals are kept up to date as the counters change, so this only
+        makes sure data is built afresh.
+        """
+        self._data = None
+
+    def set_total(self, name, value):
+        '''Add a figure for the whole run to the totals
+
+        :param name: The name of the figure in '_totals'
+        :param value: Its value
+        '''
+        self._extra_totals[name] = value
+        self._data = None
+
+    def __contains__(self, fname):
+        return fname in self._index
+
+    def __len__(self):
+        return len(self._names)
+
+    def files(self, start=0, end=None):
+        '''Get the names of the files with metrics, in the order they began
+
+        :param start: Position of the first file to get
+        :param end: Position past the last file to get, None for the last
+        :return: List of file names
+        '''
+        return self._names[start:end]
+
+    def get(self, fname):
+        '''Get the metrics of a file in a compact form
+
+        :param fname: The name of the file
+        :return: A tuple of the counters of the file, to give to put()
+        '''
+        index = self._index[fname]
+        start = index * _WIDTH
+        return (tuple(self._counts[start:start + _WIDTH]) +
+                (self._issues_counted[index],))
+
+    def put(self, fname, record):
+        '''Set the metrics of a file, making it the active one
+
+        :param fname: The name of the file
+        :param record: The metrics of the file, as returned by get()
+        '''
+        self.begin(fname)
+        start = self._current * _WIDTH
+        for i in range(_WIDTH):
+            self._counts[start + i] = record[i]
+            self._totals[i] += record[i]
+        self._issues_counted[self._current] = record[_WIDTH]
+
+    def load(self, fname, values):
+        '''Set the metrics of a file from a dict, making it the active one
+
+        :param fname: The name of the file
+        :param values: The metrics of the file, as a dict like current
+        '''
+        record = [values.get('loc', 0), values.get('nosec', 0)]
+        record.extend(int(values.get(label, 0)) for label in ISSUE_LABELS)
+        record.append(int(ISSUE_LABELS[0] in values))
+        self.put(fname, record)
+
+    def _add(self, counter, num):
+        self._counts[self._current * _WIDTH + counter] += num
+        self._totals[counter] += num
+        self._data = None
+
+    def _get_file_metrics(self, index):
+        start = index * _WIDTH
+        file_metrics = {'loc': self._counts[start + _LOC],
+                        'nosec': self._counts[start + _NOSEC]}
+        if self._issues_counted[index]:
+            for i, label in enumerate(ISSUE_LABELS):
+                file_metrics[label] = float(self._counts[start + _ISSUES + i])
+        return file_metrics
+
+    def _get_totals(self):
+        totals = {'loc': self._totals[_LOC], 'nosec': self._totals[_NOSEC]}
+        # issue counts are floats once any file had its issues counted
+        counted = any(self._issues_counted)
+        for rank in constants.RANKING:
+            for criteria, _ in constants.CRITERIA:
+                label = '{0}.{1}'.format(criteria, rank)
+                count = self._totals[_ISSUES + ISSUE_LABELS.index(label)]
+                totals[label] = float(count) if counted else count
+        totals.update(self._extra_totals)
+        return totals
 
     @staticmethod
     def _get_issue_counts(scores):
         """Get issue counts aggregated by confidence/severity rankings.
 
         :param scores: list of scores to aggregate / count
-        :return: aggregated total (count) of issues identified
+        :return: list of the total (count) of issues identified for each of
+            ISSUE_LABELS
         """
-        issue_counts = {}
+        issue_counts = [0] * len(ISSUE_LABELS)
         for score in scores:
+            i = 0
             for (criteria, _) in constants.CRITERIA:
-                for i, rank in enumerate(constants.RANKING):
-                    label = '{0}.{1}'.format(criteria, rank)
-                    if label not in issue_counts:
-                        issue_counts[label] = 0
-                        count = (
-                            score[criteria][i] /
-                            constants.RANKING_VALUES[rank]
-                        )
-                        issue_counts[label] += count
+                for j, rank in enumerate(constants.RANKING):
+                    issue_counts[i] += (score[criteria][j] //
+                                        constants.RANKING_VALUES[rank])
+                    i += 1
         return issue_counts
+
+
+class PluginProfile(object):
+    """The time spent in each test, by test ID and node type.
+
+    The entry of a test holds the number of times it ran, the total and the
+    longest time it took in seconds and the number of issues it reported.
+    The time of the blacklist test is put down to the ID of the blacklist
+    entry an issue is found for, and to B001 when none is.
+    """
+
+    def __init__(self):
+        self.entries = {}
+
+    def record(self, test_id, node_type, elapsed, issues):
+        '''Record one run of a test
+
+        :param test_id: The ID of the test
+        :param node_type: The type of the node the test ran on
+        :param elapsed: The time the test took, in seconds
+        :param issues: The number of issues it reported
+        '''
+        entry = self.entries.get((test_id, node_type))
+        if entry is None:
+            self.entries[(test_id, node_type)] = [1, elapsed, elapsed, issues]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed
+            if elapsed > entry[2]:
+                entry[2] = elapsed
+            entry[3] += issues
+
+    def merge(self, entries):
+        '''Add the entries of another profile, from a worker process
+
+        :param entries: The entries of the other profile
+        '''
+        for key, (calls, total, longest, issues) in entries.items():
+            entry = self.entries.get(key)
+            if entry is None:
+                self.entries[key] = [calls, total, longest, issues]
+            else:
+                entry[0] += calls
+                entry[1] += total
+                if longest > entry[2]:
+                    entry[2] = longest
+                entry[3] += issues
+
+    def rows(self):
+        '''Get the entries as dicts, the slowest test first
+
+        :return: list of dicts with the test_id, node_type, calls,
+            total_time, max_time and issues of each entry
+        '''
+        rows = [{'test_id': test_id, 'node_type': node_type, 'calls': calls,
+                 'total_time': total, 'max_time': longest, 'issues': issues}
+                for (test_id, node_type), (calls, total, longest, issues)
+                in self.entries.items()]
+        rows.sort(key=lambda row: (-row['total_time'], row['test_id'],
+                                   row['node_type']))
+        return rows
+
+
+class Timings(object):
+    """The time spent in each phase of a scan, and the slowest files.
+
+    Phase times are in seconds and summed over all files, so with several
+    worker processes they add up to more than the run took. The slowest
+    files are kept with their size in bytes, the number of AST nodes
+    visited and the time of each phase spent on them.
+    """
+
+    def __init__(self, slowest_files):
+        '''Set up empty timings
+
+        :param slowest_files: Number of the slowest files to keep
+        '''
+        self.slowest_files = slowest_files
+        self.phases = dict((phase, 0.0) for phase in PHASES)
+        # heap of the slowest files, as (time, count, entry) where entry is
+        # [time, fname, size, nodes, phases] and count keeps ties apart
+        self._slowest = []
+        self._count = 0
+        self._file = None
+
+    def add(self, phase, elapsed):
+        '''Add time spent in a phase of the whole run
+
+        :param phase: The phase, one of PHASES
+        :param elapsed: The time spent, in seconds
+        '''
+        self.phases[phase] += elapsed
+
+    def timed(self, iterable, phase):
+        '''Iterate over an iterable, adding the time it takes to a phase
+
+        :param iterable: The iterable, such as a generator of file names
+        :param phase: The phase, one of PHASES
+        :return: Generator of the items of the iterable
+        '''
+        iterator = iter(iterable)
+        while True:
+            start = timeit.default_timer()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add(phase, timeit.default_timer() - start)
+                return
+            self.add(phase, timeit.default_timer() - start)
+            yield item
+
+    def begin_file(self, fname, size):
+        '''Start timing a file
+
+        :param fname: The name of the file
+        :param size: The size of the file in bytes
+        '''
+        self._file = [0.0, fname, size, 0, {}]
+
+    def add_file(self, phase, elapsed):
+        '''Add time spent in a phase on the file being timed
+
+        :param phase: The phase, one of PHASES
+        :param elapsed: The time spent, in seconds
+        '''
+        self.add(phase, elapsed)
+        if self._file is not None:
+            self._file[0] += elapsed
+            self._file[4][phase] = self._file[4].get(phase, 0.0) + elapsed
+
+    def note_nodes(self, count):
+        '''Note the number of AST nodes visited in the file being timed'''
+        if self._file is not None:
+            self._file[3] = count
+
+    def end_file(self):
+        '''Finish timing a file, keeping it if it is one of the slowest'''
+        if self._file is not None:
+            self._keep(self._file)
+            self._file = None
+
+    def merge(self, record):
+        '''Add the timings of another process
+
+        :param record: The phases and files of the other timings, as
+            returned by get()
+        '''
+        phases, files = record
+        for phase, elapsed in phases.items():
+            self.add(phase, elapsed)
+        for entry in files:
+            self._keep(list(entry))
+
+    def get(self):
+        '''Get the phases and the slowest files, to give to merge()'''
+        return self.phases, [entry for _, _, entry in self._slowest]
+
+    def as_dict(self):
+        '''Get the timings as a dict, the slowest file first
+
+        :return: dict of the time of each phase under 'phases' and the list
+            of the slowest files under 'slowest_files'
+        '''
+        slowest = []
+        for _, _, entry in sorted(self._slowest, reverse=True):
+            elapsed, fname, size, nodes, phases = entry
+            entry = {'filename': fname, 'time': elapsed, 'size': size,
+                     'nodes': nodes}
+            entry.update(phases)
+            slowest.append(entry)
+        return {'phases': dict(self.phases), 'slowest_files': slowest}
+
+    def _keep(self, entry):
+        self._count += 1
+        item = (entry[0], self._count, entry)
+        if len(self._slowest) < self.slowest_files:
+            heapq.heappush(self._slowest, item)
+        elif self._slowest and item[0] > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, item)
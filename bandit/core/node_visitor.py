@@ -6,19 +6,31 @@
 
 import ast
 import logging
-import operator
+import sys
+import timeit
 
 from bandit.core import constants
+from bandit.core import context as b_context
 from bandit.core import tester as b_tester
 from bandit.core import utils as b_utils
 
 
 LOG = logging.getLogger(__name__)
 
+# Node types whose visit methods keep track of state (namespaces and imports)
+# that later tests rely on, so they are always visited with a context
+STATEFUL_NODE_TYPES = frozenset(['ClassDef', 'FunctionDef', 'Import',
+                                 'ImportFrom'])
+
+# stands in for the parent of a node on the walk stack once its children
+# have been visited, so that post_visit runs for it
+_LEAVE = object()
+
 
 class BanditNodeVisitor(object):
     def __init__(self, fname, metaast, testset,
-                 debug, nosec_lines, metrics):
+                 debug, nosec_lines, metrics, package_names=None,
+                 max_depth=None, max_nodes=None):
         self.debug = debug
         self.nosec_lines = nosec_lines
         self.seen = 0
@@ -27,24 +39,56 @@ class BanditNodeVisitor(object):
             'CONFIDENCE': [0] * len(constants.RANKING)
         }
         self.depth = 0
+        self.max_depth = (constants.ast_max_depth if max_depth is None
+                          else max_depth)
+        self.max_nodes = (constants.ast_max_nodes if max_nodes is None
+                          else max_nodes)
+        self.node_count = 0
+        # why part of the file was not scanned, None if all of it was
+        self.incomplete = None
         self.fname = fname
+        # parents and siblings of the nodes of the file, worked out on demand
+        self.relations = None
         self.metaast = metaast
+        # every node is added to the meta AST when debugging or dumping it
+        self.capture_ast = debug or metaast.stream is not None
         self.testset = testset
-        self.imports = set()
+        self.imports = b_context.ImportSet()
         self.import_aliases = {}
         self.tester = b_tester.BanditTester(
-            self.testset, self.debug, nosec_lines)
+            self.testset, self.debug, nosec_lines, metrics.plugins)
+        self.checked_types = self._get_checked_types(testset)
 
         # in some cases we can't determine a qualified name
         try:
-            self.namespace = b_utils.get_module_qualname_from_path(fname)
+            self.namespace = b_utils.get_module_qualname_from_path(
+                fname, package_names)
         except b_utils.InvalidModulePath:
             LOG.info('Unable to find qualified name for module: %s',
                      self.fname)
             self.namespace = ""
+        # namespaces of the enclosing classes and functions
+        self.namespaces = []
         LOG.debug('Module qualified name: %s', self.namespace)
         self.metrics = metrics
 
+    @staticmethod
+    def _get_checked_types(testset):
+        '''Get the names of the node types that need a context
+
+        Nodes of any other type have no tests targeting them, so they are only
+        walked through on the way to their children.
+
+        :param testset: The active test set
+        :return: A set of AST node class names
+        '''
+        checked_types = set(testset.tests)
+        checked_types.update(STATEFUL_NODE_TYPES)
+        # since Python 3.8 string literals are parsed into Constant nodes
+        if checked_types.intersection(('Str', 'Bytes')):
+            checked_types.add('Constant')
+        return checked_types
+
     def visit_ClassDef(self, node):
         '''Visitor for AST ClassDef node
 
@@ -53,6 +97,7 @@ class BanditNodeVisitor(object):
         :return: -
         '''
         # For all child nodes, add this class name to current namespace
+        self.namespaces.append(self.namespace)
         self.namespace = b_utils.namespace_path_join(self.namespace, node.name)
 
     def visit_FunctionDef(self, node):
@@ -74,6 +119,7 @@ class BanditNodeVisitor(object):
 
         # For all child nodes and any tests run, add this function name to
         # current namespace
+        self.namespaces.append(self.namespace)
         self.namespace = b_utils.namespace_path_join(self.namespace, name)
         self.update_scores(self.tester.run_tests(self.context, 'FunctionDef'))
 
@@ -168,10 +214,12 @@ class BanditNodeVisitor(object):
         :return: -
         '''
         self.context['str'] = node.s
-        if not isinstance(node._bandit_parent, ast.Expr):  # docstring
-            self.context['linerange'] = b_utils.linerange_fix(
-                node._bandit_parent
-            )
+        parent = self.context['parent']
+        if not isinstance(parent, ast.Expr):  # docstring
+            # issues report the line range of the expression the literal is
+            # part of
+            self.context['linerange_node'] = parent
+            self.context['linerange_sibling'] = self.context['parent_sibling']
             self.update_scores(self.tester.run_tests(self.context, 'Str'))
 
     def visit_Bytes(self, node):
@@ -183,19 +231,23 @@ class BanditNodeVisitor(object):
         :return: -
         '''
         self.context['bytes'] = node.s
-        if not isinstance(node._bandit_parent, ast.Expr):  # docstring
-            self.context['linerange'] = b_utils.linerange_fix(
-                node._bandit_parent
-            )
+        parent = self.context['parent']
+        if not isinstance(parent, ast.Expr):  # docstring
+            # issues report the line range of the expression the literal is
+            # part of
+            self.context['linerange_node'] = parent
+            self.context['linerange_sibling'] = self.context['parent_sibling']
             self.update_scores(self.tester.run_tests(self.context, 'Bytes'))
 
     def pre_visit(self, node):
         self.context = {}
         self.context['imports'] = self.imports
         self.context['import_aliases'] = self.import_aliases
+        self.context['relations'] = self.relations
 
         if self.debug:
             LOG.debug(ast.dump(node))
+        if self.capture_ast:
             self.metaast.add_node(node, '', self.depth)
 
         if hasattr(node, 'lineno'):
@@ -207,7 +259,7 @@ class BanditNodeVisitor(object):
                 return False
 
         self.context['node'] = node
-        self.context['linerange'] = b_utils.linerange_fix(node)
+        self.context['linerange_node'] = node
         self.context['filename'] = self.fname
 
         self.seen += 1
@@ -235,33 +287,92 @@ class BanditNodeVisitor(object):
         # HACK(tkelsey): this is needed to clean up post-recursion stuff that
         # gets setup in the visit methods for these node types.
         if isinstance(node, (ast.FunctionDef, ast.ClassDef)):
-            self.namespace = b_utils.namespace_path_split(self.namespace)[0]
+            self.namespace = self.namespaces.pop()
 
     def generic_visit(self, node):
-        """Drive the visitor."""
+        '''Drive the visitor
+
+        Visit the descendants of a node. The tree is walked with an explicit
+        stack instead of recursion, so deeply nested expressions can't run
+        out of interpreter stack. The walk does not go deeper than max_depth
+        levels and stops after max_nodes nodes, recording in incomplete that
+        part of the file was left unscanned.
+
+        Nodes without any tests targeting them skip the context set up and
+        only have the #nosec check applied before their children are visited.
+        The others get their parent, their next sibling and the next sibling
+        of their parent in the context, nothing is stored on the nodes
+        themselves.
+        :param node: The node to visit the descendants of
+        :return: -
+        '''
+        stack = []
+        self._push_children(stack, node, None, self.depth)
+        while stack:
+            node, parent, sibling, parent_sibling, depth = stack.pop()
+            if parent is _LEAVE:
+                self.depth = depth + 1
+                self.post_visit(node)
+                continue
+
+            if self.node_count >= self.max_nodes:
+                self.incomplete = ('partially scanned, more than %i AST '
+                                   'nodes' % self.max_nodes)
+                break
+            self.node_count += 1
+            self.depth = depth
+
+            if (self.capture_ast or
+                    node.__class__.__name__ in self.checked_types):
+                if not self.pre_visit(node):
+                    continue
+                self.context['parent'] = parent
+                self.context['sibling'] = sibling
+                self.context['parent_sibling'] = parent_sibling
+                self.context['linerange_sibling'] = sibling
+                self.visit(node)
+                stack.append((node, _LEAVE, None, None, depth))
+
+            elif (hasattr(node, 'lineno') and
+                    node.lineno in self.nosec_lines):
+                LOG.debug("skipped, nosec")
+                self.metrics.note_nosec()
+                continue
+
+            else:
+                self.seen += 1
+
+            self._push_children(stack, node, sibling, depth + 1)
+
+    def _push_children(self, stack, node, node_sibling, depth):
+        '''Push the children of a node on the walk stack
+
+        Children are pushed last to first, so they are popped in order.
+        :param stack: The walk stack
+        :param node: The node whose children to push
+        :param node_sibling: The next sibling of the node
+        :param depth: The depth of the children
+        :return: -
+        '''
+        children = []
         for _, value in ast.iter_fields(node):
             if isinstance(value, list):
                 max_idx = len(value) - 1
                 for idx, item in enumerate(value):
                     if isinstance(item, ast.AST):
-                        if idx < max_idx:
-                            item._bandit_sibling = value[idx + 1]
-                        else:
-                            item._bandit_sibling = None
-                        item._bandit_parent = node
-
-                        if self.pre_visit(item):
-                            self.visit(item)
-                            self.generic_visit(item)
-                            self.post_visit(item)
+                        sibling = value[idx + 1] if idx < max_idx else None
+                        children.append((item, node, sibling, node_sibling,
+                                         depth))
 
             elif isinstance(value, ast.AST):
-                value._bandit_sibling = None
-                value._bandit_parent = node
-                if self.pre_visit(value):
-                    self.visit(value)
-                    self.generic_visit(value)
-                    self.post_visit(value)
+                children.append((value, node, None, node_sibling, depth))
+
+        if children and depth >= self.max_depth:
+            self.incomplete = ('partially scanned, AST deeper than %i '
+                               'levels' % self.max_depth)
+            return
+        children.reverse()
+        stack.extend(children)
 
     def update_scores(self, scores):
         '''Score updater
@@ -272,10 +383,11 @@ class BanditNodeVisitor(object):
         '''
         # we'll end up with something like:
         # SEVERITY: {0, 0, 0, 10}  where 10 is weighted by finding and level
-        for score_type in self.scores:
-            self.scores[score_type] = list(map(
-                operator.add, self.scores[score_type], scores[score_type]
-            ))
+        for score_type, totals in self.scores.items():
+            values = scores[score_type]
+            if any(values):
+                for i, value in enumerate(values):
+                    totals[i] += value
 
     def process(self, data):
         '''Main process loop
@@ -284,6 +396,26 @@ class BanditNodeVisitor(object):
         :param lines: lines code to process
         :return score: the aggregated score for the current file
         '''
-        f_ast = ast.parse(data)
+        # building the AST recurses once per level of nesting, allow it to go
+        # as deep as the walk does
+        timings = self.metrics.timings
+        start = timeit.default_timer()
+        recursion_limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(max(recursion_limit, self.max_depth + 100))
+        try:
+            f_ast = ast.parse(data)
+        except RuntimeError:  # RecursionError
+            self.incomplete = ('not scanned, AST deeper than %i levels' %
+                               self.max_depth)
+            return self.scores
+        finally:
+            sys.setrecursionlimit(recursion_limit)
+            if timings is not None:
+                timings.add_file('parse', timeit.default_timer() - start)
+        start = timeit.default_timer()
+        self.relations = b_utils.NodeRelations(f_ast)
         self.generic_visit(f_ast)
+        if timings is not None:
+            timings.add_file('visit', timeit.default_timer() - start)
+            timings.note_nodes(self.node_count)
         return self.scores
@@ -58,6 +58,38 @@ def test_id(id_val):
     return _has_id
 
 
+def matches_call(qualname, imported_like=None):
+    '''Test function only applies to some calls
+
+    Use of this decorator before a test function checking "Call" nodes lets
+    the test set skip the test for calls it can't match. The test is only
+    run for calls whose qualified name is qualname, or ends with the rest of
+    qualname when it starts with '*', and, if imported_like is given, in
+    files where a module like imported_like has been imported.
+    '''
+    def wrapper(func):
+        if not hasattr(func, "_call_qualname"):
+            func._call_qualname = qualname
+            func._call_imported_like = imported_like
+        return func
+    return wrapper
+
+
+def uses_node_relations(func):
+    '''Test function reads the parent or sibling attributes of its node
+
+    Parents and siblings are kept in a side table rather than on the nodes.
+    Use of this decorator before a test function that reads the
+    _bandit_parent or _bandit_sibling attributes of context.node has them
+    set on that node and on all of its ancestors while the test runs, so
+    helpers such as utils.concat_string(context.node) can walk up the tree.
+    They are removed again once it has run. Other tests can use
+    context.parent and context.sibling.
+    '''
+    func._uses_node_relations = True
+    return func
+
+
 def accepts_baseline(*args):
     """Decorator to indicate formatter accepts baseline results
 
@@ -73,3 +105,37 @@ def accepts_baseline(*args):
 
         return func
     return wrapper(args[0])
+
+
+def omits_code(*args):
+    """Decorator to indicate formatter does not show the code of the issues
+
+    Use of this decorator before a formatter indicates that it never asks the
+    issues for their code, so the scan does not keep the lines of code found
+    with each issue, see Issue.keep_code.
+    """
+    def wrapper(func):
+        if not hasattr(func, '_omits_code'):
+            func._omits_code = True
+
+        LOG.debug('omits_code() decorator executed on %s', func.__name__)
+
+        return func
+    return wrapper(args[0])
+
+
+def streams_results(stream):
+    '''Formatter can write results while the files are being scanned
+
+    Use of this decorator before a formatter lets the manager start it before
+    the scan, see BanditManager.stream_results. stream is called with the
+    manager, the output file object and the severity and confidence levels,
+    and the object it returns is called with the new results and skipped
+    files each time a file is done. The formatter itself is still called at
+    the end and finishes the output.
+    '''
+    def wrapper(func):
+        if not hasattr(func, '_streams_results'):
+            func._streams_results = stream
+        return func
+    return wrapper
@@ -15,6 +15,9 @@ from bandit.core import extension_loader
 
 LOG = logging.getLogger(__name__)
 
+# maximum number of qualnames to remember the matching "Call" tests for
+CALL_CACHE_SIZE = 10000
+
 
 class BanditTestSet(object):
     def __init__(self, config, profile=None):
@@ -92,6 +95,7 @@ class BanditTestSet(object):
     def _load_tests(self, config, plugins):
         '''Builds a dict mapping tests to node types.'''
         self.tests = {}
+        self._call_tests = None
         for plugin in plugins:
             if hasattr(plugin.plugin, '_takes_config'):
                 # TODO(??): config could come from profile ...
@@ -112,3 +116,60 @@ class BanditTestSet(object):
         :return: A list of tests which are of the specified type
         '''
         return self.tests.get(checktype) or []
+
+    def get_call_tests(self, qualname):
+        '''Returns the "Call" tests which could match a call
+
+        Tests declaring the calls they match with the matches_call decorator
+        are looked up in an index keyed on the last component of their
+        qualname pattern. Tests without a declaration are always returned.
+        Tests keep the order they have in get_tests('Call').
+
+        :param qualname: The qualified name of the call
+        :return: A list of tests
+        '''
+        if self._call_tests is None:
+            self._build_call_index()
+
+        tests = self._call_tests.get(qualname)
+        if tests is None:
+            if len(self._call_tests) > CALL_CACHE_SIZE:
+                self._call_tests.clear()
+            tests = self._call_tests[qualname] = self._match_call_tests(
+                qualname or '')
+        return tests
+
+    def _build_call_index(self):
+        self._call_tests = {}
+        self._call_exact = {}
+        self._call_suffix = {}
+        self._call_always = []
+        for pos, test in enumerate(self.get_tests('Call')):
+            pattern = getattr(test, '_call_qualname', None)
+            if pattern is None:
+                self._call_always.append((pos, test))
+            elif pattern.startswith('*'):
+                suffix = pattern[1:]
+                key = suffix.rsplit('.', 1)[-1]
+                self._call_suffix.setdefault(key, []).append(
+                    (pos, suffix, test))
+            else:
+                self._call_exact.setdefault(pattern, []).append((pos, test))
+        self._call_key_lengths = sorted(set(len(k)
+                                            for k in self._call_suffix))
+
+    def _match_call_tests(self, qualname):
+        matches = list(self._call_always)
+        matches.extend(self._call_exact.get(qualname, []))
+
+        # a suffix pattern can end part way through the last component
+        name = qualname.rsplit('.', 1)[-1]
+        for length in self._call_key_lengths:
+            if length > len(name):
+                break
+            for pos, suffix, test in self._call_suffix.get(name[-length:],
+                                                           []):
+                if qualname.endswith(suffix):
+                    matches.append((pos, test))
+
+        return [test for _, test in sorted(matches, key=lambda m: m[0])]
@@ -4,8 +4,8 @@
 #
 # SPDX-License-Identifier: Apache-2.0
 
-import copy
 import logging
+import timeit
 import warnings
 
 from bandit.core import constants
@@ -17,12 +17,14 @@ LOG = logging.getLogger(__name__)
 
 
 class BanditTester(object):
-    def __init__(self, testset, debug, nosec_lines):
+    def __init__(self, testset, debug, nosec_lines, profile=None):
         self.results = []
         self.testset = testset
         self.last_result = None
         self.debug = debug
         self.nosec_lines = nosec_lines
+        # metrics.PluginProfile to record the time spent in each test to
+        self.profile = profile
 
     def run_tests(self, raw_context, checktype):
         '''Runs all tests for a certain type of check, for example
@@ -41,12 +43,27 @@ class BanditTester(object):
             'CONFIDENCE': [0] * len(constants.RANKING)
         }
 
-        tests = self.testset.get_tests(checktype)
+        if checktype == 'Call':
+            tests = self.testset.get_call_tests(raw_context.get('qualname'))
+        else:
+            tests = self.testset.get_tests(checktype)
+        # all tests share one context, which caches the values derived from
+        # the node
+        context = b_context.Context(raw_context)
+        profile = self.profile
         for test in tests:
             name = test.__name__
-            # execute test with the an instance of the context class
-            temp_context = copy.copy(raw_context)
-            context = b_context.Context(temp_context)
+            imported_like = getattr(test, '_call_imported_like', None)
+            if (imported_like is not None and
+                    not context.is_module_imported_like(imported_like)):
+                continue
+            related = None
+            if getattr(test, '_uses_node_relations', False):
+                related = self._set_node_relations(raw_context)
+            if profile is not None:
+                start = timeit.default_timer()
+            result = None
+            issues = 0
             try:
                 if hasattr(test, '_config'):
                     result = test(context, test._config)
@@ -56,21 +73,22 @@ class BanditTester(object):
                 # if we have a result, record it and update scores
                 if (result is not None and
                         result.lineno not in self.nosec_lines and
-                        temp_context['lineno'] not in self.nosec_lines):
+                        raw_context['lineno'] not in self.nosec_lines):
 
-                    if isinstance(temp_context['filename'], bytes):
-                        result.fname = temp_context['filename'].decode('utf-8')
+                    if isinstance(raw_context['filename'], bytes):
+                        result.fname = raw_context['filename'].decode('utf-8')
                     else:
-                        result.fname = temp_context['filename']
+                        result.fname = raw_context['filename']
 
                     if result.lineno is None:
-                        result.lineno = temp_context['lineno']
-                    result.linerange = temp_context['linerange']
+                        result.lineno = raw_context['lineno']
+                    result.linerange = self._get_linerange(raw_context)
                     result.test = name
                     if result.test_id == "":
                         result.test_id = test._test_id
 
                     self.results.append(result)
+                    issues = 1
 
                     LOG.debug("Issue identified by %s: %s", name, result)
                     sev = constants.RANKING.index(result.severity)
@@ -84,9 +102,75 @@ class BanditTester(object):
                 self.report_error(name, context, e)
                 if self.debug:
                     raise
+            finally:
+                if related is not None:
+                    self._clear_node_relations(related)
+            if profile is not None:
+                profile.record(
+                    result.test_id if result is not None and result.test_id
+                    else getattr(test, '_test_id', name), checktype,
+                    timeit.default_timer() - start, issues)
         LOG.debug("Returning scores: %s", scores)
         return scores
 
+    @staticmethod
+    def _set_node_relations(context):
+        '''Set the relation attributes of a node and of its ancestors
+
+        Sets _bandit_parent and _bandit_sibling on the node of a context and
+        on each of its ancestors, taken from the relations of the file, so
+        that helpers walking up the tree from the node find them. They are
+        only set for the duration of a test, see _clear_node_relations.
+
+        :param context: Raw context dictionary
+        :return: The list of nodes the attributes were set on
+        '''
+        node = context['node']
+        node._bandit_parent = context.get('parent')
+        node._bandit_sibling = context.get('sibling')
+        related = [node]
+        relations = context.get('relations')
+        if relations is None:
+            return related
+        node = node._bandit_parent
+        while node is not None:
+            node._bandit_parent = relations.parent(node)
+            node._bandit_sibling = relations.sibling(node)
+            related.append(node)
+            node = node._bandit_parent
+        return related
+
+    @staticmethod
+    def _clear_node_relations(related):
+        '''Remove the relation attributes set by _set_node_relations
+
+        The attributes would otherwise leave the tree cyclic once the test
+        has run.
+
+        :param related: The list of nodes the attributes were set on
+        '''
+        for node in related:
+            del node._bandit_parent
+            del node._bandit_sibling
+
+    @staticmethod
+    def _get_linerange(context):
+        '''Get the line range to report for an issue found in a context
+
+        The line range is only worked out once a test reports an issue, from
+        the node stored as 'linerange_node' and its next sibling stored as
+        'linerange_sibling' by the walk, unless the context already carries a
+        'linerange'.
+
+        :param context: Raw context dictionary
+        :return: A list of line numbers
+        '''
+        if 'linerange' not in context:
+            context['linerange'] = utils.linerange_fix(
+                context['linerange_node'],
+                sibling=context.get('linerange_sibling'))
+        return context['linerange']
+
     @staticmethod
     def report_error(test, context, error):
         what = "Bandit internal error running: "
@@ -5,9 +5,14 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import ast
+import io
 import logging
 import os.path
+import re
 import sys
+import tokenize
+
+import six
 
 try:
     import configparser
@@ -35,17 +40,21 @@ def _get_attr_qual_name(node, aliases):
     :param aliases: Import aliases dictionary
     :returns: Qualified name referred to by the attribute or name.
     '''
+    # walk down the chain of attributes rather than recursing, the chain
+    # can be arbitrarily long
+    attrs = []
+    while isinstance(node, ast.Attribute):
+        attrs.append(node.attr)
+        node = node.value
+
     if isinstance(node, ast.Name):
-        if node.id in aliases:
-            return aliases[node.id]
-        return node.id
-    elif isinstance(node, ast.Attribute):
-        name = '%s.%s' % (_get_attr_qual_name(node.value, aliases), node.attr)
-        if name in aliases:
-            return aliases[name]
-        return name
+        name = aliases.get(node.id, node.id)
     else:
-        return ""
+        name = ""
+    for attr in reversed(attrs):
+        name = '%s.%s' % (name, attr)
+        name = aliases.get(name, name)
+    return name
 
 
 def get_call_name(node, aliases):
@@ -117,7 +126,7 @@ def warnings_formatter(message, category=UserWarning, filename='', lineno=-1,
     return "{0}\n".format(message)
 
 
-def get_module_qualname_from_path(path):
+def get_module_qualname_from_path(path, package_names=None):
     '''Get the module's qualified name by analysis of the path.
 
     Resolve the absolute pathname and eliminate symlinks. This could result in
@@ -131,6 +140,10 @@ def get_module_qualname_from_path(path):
 
     :param: Path to module file. Relative paths will be resolved relative to
             current working directory.
+    :param package_names: Optional dict to cache the package name of each
+            directory in, shared by the calls made during a run so that
+            files in the same package don't look for the same __init__.py
+            files again
     :return: fully qualified module name
     '''
 
@@ -139,16 +152,113 @@ def get_module_qualname_from_path(path):
         raise InvalidModulePath('Invalid python file path: "%s"'
                                 ' Missing path or file name' % (path))
 
-    qname = [os.path.splitext(tail)[0]]
-    while head not in ['/', '.', '']:
-        if os.path.isfile(os.path.join(head, '__init__.py')):
-            (head, tail) = os.path.split(head)
-            qname.insert(0, tail)
-        else:
+    if package_names is None:
+        package_names = {}
+    package = _get_package_name(head, package_names)
+    module = os.path.splitext(tail)[0]
+    return package + '.' + module if package else module
+
+
+def _get_package_name(head, package_names):
+    '''Get the qualified name of the package in a directory, '' if none'''
+    # find the directories up to the first one already known or which
+    # isn't a package, then name them from the outermost one in
+    missing = []
+    while head not in package_names:
+        if (head in ['/', '.', ''] or
+                not os.path.isfile(os.path.join(head, '__init__.py'))):
+            package_names[head] = ''
             break
+        missing.append(head)
+        head = os.path.split(head)[0]
+
+    package = package_names[head]
+    for head in reversed(missing):
+        tail = os.path.split(head)[1]
+        package = package + '.' + tail if package else tail
+        package_names[head] = package
+    return package
+
+
+# a comment has to contain one of these to be a #nosec comment
+NOSEC_MARKERS = ('#nosec', '# nosec')
+
+# Comments and string literals are the only tokens that can contain a '#' or
+# a quote, so matching them from left to right never takes a '#' inside a
+# string for the start of a comment. The string patterns are the ones
+# tokenize uses.
+_COMMENT_OR_STRING = re.compile('|'.join([
+    r'(#[^\r\n]*)',
+    r"'''[^'\\]*(?:(?:\\.|'(?!''))[^'\\]*)*'''",
+    r'"""[^"\\]*(?:(?:\\.|"(?!""))[^"\\]*)*"""',
+    r"'[^\n'\\]*(?:\\.[^\n'\\]*)*'",
+    r'"[^\n"\\]*(?:\\.[^\n"\\]*)*"',
+]), re.S)
+
+
+def get_nosec_lines(data):
+    '''Find the lines with a #nosec comment
+
+    Files that do not contain a marker anywhere are not looked at any
+    further. Otherwise the comments are located with one regular expression
+    over the decoded source rather than by running the tokenizer, which
+    gives the same lines as tokenize for valid Python source.
+
+    :param data: The file contents, as bytes
+    :return: Set of the numbers of the lines with a #nosec comment
+    '''
+    if not any(marker.encode('ascii') in data for marker in NOSEC_MARKERS):
+        return set()
+
+    if six.PY2:
+        source = data
+    else:
+        encoding, _ = tokenize.detect_encoding(io.BytesIO(data).readline)
+        source = data.decode(encoding)
+
+    nosec_lines = set()
+    lineno = 1
+    pos = 0
+    for match in _COMMENT_OR_STRING.finditer(source):
+        comment = match.group(1)
+        if comment and any(marker in comment for marker in NOSEC_MARKERS):
+            lineno += source.count('\n', pos, match.start())
+            pos = match.start()
+            nosec_lines.add(lineno)
+    return nosec_lines
+
+
+_LINE_END = re.compile(b'\r\n|\r|\n')
+
+
+def line_offsets(data):
+    '''Index where the lines of the contents of a file start
+
+    Lines end with any of '\\n', '\\r\\n' or '\\r', as they do for the parser.
+
+    :param data: The file contents, as bytes
+    :return: List of offsets, line n of the file is
+        data[offsets[n - 1]:offsets[n]] and there are len(offsets) - 1 lines
+    '''
+    offsets = [0]
+    offsets.extend(match.end() for match in _LINE_END.finditer(data))
+    if offsets[-1] != len(data):
+        offsets.append(len(data))
+    return offsets
+
 
-    qualname = '.'.join(qname)
-    return qualname
+def source_encoding(data):
+    '''Get the encoding of the contents of a Python file
+
+    :param data: The file contents, as bytes
+    :return: The encoding declared by the file, utf-8 if it has none or an
+        invalid one
+    '''
+    try:
+        encoding, _ = tokenize.detect_encoding(io.BytesIO(data).readline)
+    except SyntaxError:
+        encoding = 'utf-8'
+    return encoding
 
 
 def namespace_path_join(base, name):
@@ -193,46 +303,141 @@ def escaped_bytes_representation(b):
     return b.decode('unicode_escape').encode('unicode_escape')
 
 
+def _get_line_bounds(node):
+    '''Get the lowest and highest line number found in a node's subtree.
+
+    The bounds are memoized on every node of the subtree that gets visited,
+    so asking again for the node or any of its descendants is free. Nodes
+    which fit on a single line answer from their own lineno/end_lineno
+    without looking at their children.
+
+    :param node: The AST node
+    :returns: (Tuple) the min and max line numbers, (9999999999, -1) if no
+              node in the subtree has a line number
+    '''
+    stack = [(node, False)]
+    while stack:
+        n, children_done = stack.pop()
+        if hasattr(n, '_bandit_line_bounds'):
+            continue
+
+        lineno = getattr(n, 'lineno', None)
+        if not children_done:
+            # decorators start on lines before the node itself
+            if (lineno is not None and
+                    getattr(n, 'end_lineno', None) == lineno and
+                    not getattr(n, 'decorator_list', None)):
+                n._bandit_line_bounds = (lineno, lineno)
+            else:
+                stack.append((n, True))
+                stack.extend((child, False)
+                             for child in ast.iter_child_nodes(n))
+            continue
+
+        lines_min = 9999999999
+        lines_max = -1
+        if lineno is not None:
+            lines_min = lines_max = lineno
+        for child in ast.iter_child_nodes(n):
+            child_min, child_max = child._bandit_line_bounds
+            lines_min = min(lines_min, child_min)
+            lines_max = max(lines_max, child_max)
+        n._bandit_line_bounds = (lines_min, lines_max)
+
+    return node._bandit_line_bounds
+
+
 def linerange(node):
     """Get line number range from a node."""
-    strip = {"body": None, "orelse": None,
-             "handlers": None, "finalbody": None}
-    for key in strip.keys():
-        if hasattr(node, key):
-            strip[key] = getattr(node, key)
-            node.key = []
-
-    lines_min = 9999999999
-    lines_max = -1
-    for n in ast.walk(node):
-        if hasattr(n, 'lineno'):
-            lines_min = min(lines_min, n.lineno)
-            lines_max = max(lines_max, n.lineno)
-
-    for key in strip.keys():
-        if strip[key] is not None:
-            node.key = strip[key]
-
+    lines_min, lines_max = _get_line_bounds(node)
     if lines_max > -1:
         return list(range(lines_min, lines_max + 1))
     return [0, 1]
 
 
-def linerange_fix(node):
-    """Try and work around a known Python bug with multi-line strings."""
+class NodeRelations(object):
+    '''Parent and next sibling of the nodes of an AST
+
+    The relations of a file are kept in a side table rather than as
+    attributes on every node, which would make the whole tree cyclic. The
+    table is only built the first time a relation is asked for.
+    '''
+
+    def __init__(self, tree):
+        '''Set up the relations of a tree, without working them out yet
+
+        :param tree: The root node of the AST
+        '''
+        self.tree = tree
+        self._relations = None
+
+    def _build(self):
+        # id of every node, to its (parent, next sibling) tuple
+        relations = {}
+        stack = [self.tree]
+        while stack:
+            node = stack.pop()
+            for _, value in ast.iter_fields(node):
+                if isinstance(value, list):
+                    max_idx = len(value) - 1
+                    for idx, item in enumerate(value):
+                        if isinstance(item, ast.AST):
+                            sibling = value[idx + 1] if idx < max_idx else None
+                            relations[id(item)] = (node, sibling)
+                            stack.append(item)
+
+                elif isinstance(value, ast.AST):
+                    relations[id(value)] = (node, None)
+                    stack.append(value)
+        self._relations = relations
+
+    def parent(self, node):
+        '''Get the parent of a node, None for the root of the tree'''
+        if self._relations is None:
+            self._build()
+        return self._relations.get(id(node), (None, None))[0]
+
+    def sibling(self, node):
+        '''Get the next node in the list holding a node, else None'''
+        if self._relations is None:
+            self._build()
+        return self._relations.get(id(node), (None, None))[1]
+
+
+def _get_sibling(node, relations):
+    if relations is not None:
+        return relations.sibling(node)
+    return getattr(node, '_bandit_sibling', None)
+
+
+def _get_parent(node, relations):
+    if relations is not None:
+        return relations.parent(node)
+    return getattr(node, '_bandit_parent', None)
+
+
+def linerange_fix(node, relations=None, sibling=None):
+    """Try and work around a known Python bug with multi-line strings.
+
+    :param node: The node to get the line range of
+    :param relations: Optional NodeRelations of the tree of the node, the
+        node's own _bandit_sibling attribute is used without it
+    :param sibling: Optional next sibling of the node when it is already
+        known, the relations are not looked up then
+    """
     # deal with multiline strings lineno behavior (Python issue #16806)
     lines = linerange(node)
-    if hasattr(node, '_bandit_sibling') and hasattr(
-            node._bandit_sibling, 'lineno'
-    ):
+    if sibling is None:
+        sibling = _get_sibling(node, relations)
+    if hasattr(sibling, 'lineno'):
         start = min(lines)
-        delta = node._bandit_sibling.lineno - start
+        delta = sibling.lineno - start
         if delta > 1:
-            return list(range(start, node._bandit_sibling.lineno))
+            return list(range(start, sibling.lineno))
     return lines
 
 
-def concat_string(node, stop=None):
+def concat_string(node, stop=None, relations=None):
     '''Builds a string from a ast.BinOp chain.
 
     This will build a string from a series of ast.Str nodes wrapped in
@@ -241,6 +446,8 @@ def concat_string(node, stop=None):
 
     :param node: (ast.Str or ast.BinOp) The node to process
     :param stop: (ast.Str or ast.BinOp) Optional base node to stop at
+    :param relations: Optional NodeRelations of the tree of the node, the
+        _bandit_parent attributes of the nodes are used without it
     :returns: (Tuple) the root node of the expression, the string value
     '''
     def _get(node, bits, stop=None):
@@ -255,8 +462,8 @@ def concat_string(node, stop=None):
                 else node.right)
 
     bits = [node]
-    while isinstance(node._bandit_parent, ast.BinOp):
-        node = node._bandit_parent
+    while isinstance(_get_parent(node, relations), ast.BinOp):
+        node = _get_parent(node, relations)
     if isinstance(node, ast.BinOp):
         _get(node, bits, stop)
     return (node, " ".join([x.s for x in bits if isinstance(x, ast.Str)]))
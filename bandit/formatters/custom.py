@@ -45,6 +45,7 @@ class SafeMapper(dict):
 
 
 @test_properties.accepts_baseline
+@test_properties.omits_code
 def report(manager, fileobj, sev_level, conf_level, template=None):
     """Prints issues in custom format
 
@@ -0,0 +1,143 @@
+# -*- coding:utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+
+r"""
+=====================
+JSON Lines formatter
+=====================
+
+This formatter outputs one JSON object per line: one for each issue and for
+each skipped file, then a trailer with the totals of the run. Without a
+baseline, the issues and skipped files of each file are written as soon as
+the file is scanned, in the order the files are done, so the output can be
+consumed while the scan is still going.
+
+:Example:
+
+.. code-block:: javascript
+
+    {"code":"4     ystr = yaml.dump({'a' : 1, 'b' : 2, 'c' : 3})\n5     y = y
+    aml.load(ystr)\n6     yaml.dump(y)\n","filename":"examples/yaml_load.py","i
+    ssue_confidence":"HIGH","issue_severity":"MEDIUM","issue_text":"Use of unsa
+    fe yaml load. Allows instantiation of arbitrary objects. Consider yaml.safe
+    _load().\n","line_number":5,"line_range":[5],"more_info":"https://bandit.r
+    eadthedocs.io/en/latest/","test_id":"B301","test_name":"blacklist_calls","t
+    ype":"issue"}
+    {"filename":"examples/broken.py","reason":"syntax error while parsing AST f
+    rom file","type":"error"}
+    {"errors":1,"generated_at":"2015-12-16T22:27:34Z","metrics":{"CONFIDENCE.H
+    IGH":1.0,"CONFIDENCE.LOW":0.0,"CONFIDENCE.MEDIUM":0.0,"CONFIDENCE.UNDEFINED
+    ":0.0,"SEVERITY.HIGH":0.0,"SEVERITY.LOW":0.0,"SEVERITY.MEDIUM":1.0,"SEVERIT
+    Y.UNDEFINED":0.0,"loc":5,"nosec":0},"results":1,"type":"totals"}
+
+Each record is a single line in the output, they are wrapped above.
+
+"""
+# Necessary so we can import the standard library json module
+from __future__ import absolute_import
+
+import datetime
+import json
+import logging
+import sys
+
+from bandit.core import docs_utils
+from bandit.core import test_properties
+
+LOG = logging.getLogger(__name__)
+
+
+def _write_record(fileobj, record):
+    fileobj.write(json.dumps(record, sort_keys=True, separators=(',', ':')))
+    fileobj.write('\n')
+
+
+def _issue_record(issue, candidates=None):
+    record = issue.as_dict()
+    record['type'] = 'issue'
+    record['more_info'] = docs_utils.get_url(record['test_id'])
+    if candidates is not None and len(candidates) > 1:
+        record['candidates'] = [c.as_dict() for c in candidates]
+    return record
+
+
+def _error_record(fname, reason):
+    if isinstance(fname, bytes):
+        fname = fname.decode('utf-8')
+    return {'type': 'error', 'filename': fname, 'reason': reason}
+
+
+class JsonLinesStream(object):
+    '''Writes the issues and skipped files of each file as it is done'''
+
+    def __init__(self, manager, fileobj, sev_level, conf_level):
+        self.fileobj = fileobj
+        self.sev_level = sev_level
+        self.conf_level = conf_level
+        self.results = 0
+        self.errors = 0
+
+    def __call__(self, results, skipped):
+        '''Write the records of a file that was just scanned
+
+        :param results: The issues found in the file
+        :param skipped: The (file name, reason) of the files skipped
+        '''
+        for issue in results:
+            if issue.filter(self.sev_level, self.conf_level):
+                _write_record(self.fileobj, _issue_record(issue))
+                self.results += 1
+        for fname, reason in skipped:
+            _write_record(self.fileobj, _error_record(fname, reason))
+            self.errors += 1
+        self.fileobj.flush()
+
+
+@test_properties.accepts_baseline
+@test_properties.streams_results(JsonLinesStream)
+def report(manager, fileobj, sev_level, conf_level, lines=-1):
+    '''Prints issues in JSON Lines format
+
+    The issue and error records are only written here if they were not
+    streamed while scanning, see BanditManager.stream_results.
+
+    :param manager: the bandit manager object
+    :param fileobj: The output file object, which may be sys.stdout
+    :param sev_level: Filtering severity level
+    :param conf_level: Filtering confidence level
+    :param lines: Number of lines to report, -1 for all
+    '''
+    stream = None
+    for result_stream in manager.result_streams:
+        if (isinstance(result_stream, JsonLinesStream) and
+                result_stream.fileobj is fileobj):
+            stream = result_stream
+
+    with fileobj:
+        if stream is None:
+            stream = JsonLinesStream(manager, fileobj, sev_level, conf_level)
+            results = manager.get_issue_list(sev_level=sev_level,
+                                             conf_level=conf_level)
+            if isinstance(results, list):
+                stream(results, manager.get_skipped())
+            else:
+                # a baseline, with the candidates of each new issue
+                for issue, candidates in results.items():
+                    _write_record(fileobj, _issue_record(issue, candidates))
+                    stream.results += 1
+                stream([], manager.get_skipped())
+
+        # timezone agnostic format
+        TS_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+        _write_record(fileobj, {
+            'type': 'totals',
+            'results': stream.results,
+            'errors': stream.errors,
+            'metrics': manager.metrics.data['_totals'],
+            'generated_at': datetime.datetime.utcnow().strftime(TS_FORMAT),
+        })
+
+    if fileobj.name != sys.stdout.name:
+        LOG.info("JSON Lines output written to file: %s", fileobj.name)
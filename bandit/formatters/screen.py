@@ -36,6 +36,7 @@ import sys
 
 from bandit.core import constants
 from bandit.core import docs_utils
+from bandit.core import metrics
 from bandit.core import test_properties
 
 IS_WIN_PLATFORM = sys.platform.startswith('win32')
@@ -92,6 +93,32 @@ def get_metrics(manager):
     return '\n'.join([str(bit) for bit in bits])
 
 
+def get_plugin_profile(manager):
+    bits = []
+    bits.append(header("\nPlugin profile (slowest first):"))
+    bits.append("\t%-8s %-14s %9s %12s %10s %7s" % (
+        'Test', 'Node type', 'Calls', 'Total (s)', 'Max (ms)', 'Issues'))
+    for row in manager.metrics.data['_plugins']:
+        bits.append("\t%-8s %-14s %9i %12.4f %10.3f %7i" % (
+            row['test_id'], row['node_type'], row['calls'],
+            row['total_time'], row['max_time'] * 1000, row['issues']))
+    return '\n'.join([str(bit) for bit in bits])
+
+
+def get_timings(manager):
+    bits = []
+    timings = manager.metrics.data['_timings']
+    bits.append(header("\nTimings (seconds):"))
+    for phase in metrics.PHASES:
+        bits.append("\t%s: %.4f" % (phase.capitalize(),
+                                    timings['phases'][phase]))
+    bits.append(header("Slowest files (%i):", len(timings['slowest_files'])))
+    for entry in timings['slowest_files']:
+        bits.append("\t%.4f (size: %i, nodes: %i)\t%s" % (
+            entry['time'], entry['size'], entry['nodes'], entry['filename']))
+    return '\n'.join([str(bit) for bit in bits])
+
+
 def _output_issue_str(issue, indent, show_lineno=True, show_code=True,
                       lines=-1):
     # returns a list of lines that should be added to the existing lines list
@@ -184,7 +211,20 @@ def report(manager, fileobj, sev_level, conf_level, lines=-1):
         bits.append('\tTotal lines skipped (#nosec): %i' %
                     (manager.metrics.data['_totals']['nosec']))
 
+        if 'cache_hits' in manager.metrics.data['_totals']:
+            bits.append('\tResult cache hits: %i, misses: %i' % (
+                manager.metrics.data['_totals']['cache_hits'],
+                manager.metrics.data['_totals']['cache_misses']))
+
+        if manager.duplicates:
+            bits.append('\tFiles identical to another scanned file: %i' %
+                        manager.duplicates)
+
         bits.append(get_metrics(manager))
+        if '_plugins' in manager.metrics.data:
+            bits.append(get_plugin_profile(manager))
+        if '_timings' in manager.metrics.data:
+            bits.append(get_timings(manager))
         skipped = manager.get_skipped()
         bits.append(header("Files skipped (%i):", len(skipped)))
         bits.extend(["\t%s (%s)" % skip for skip in skipped])
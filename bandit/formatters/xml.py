@@ -38,10 +38,12 @@ from xml.etree import cElementTree as ET
 import six
 
 from bandit.core import docs_utils
+from bandit.core import test_properties
 
 LOG = logging.getLogger(__name__)
 
 
+@test_properties.omits_code
 def report(manager, fileobj, sev_level, conf_level, lines=-1):
     '''Prints issues in XML format
 
@@ -11,6 +11,7 @@ from bandit.core import test_properties as test
 
 @test.test_id("B301")
 @test.checks("Call")
+@test.matches_call("*b64encode", imported_like="base64")
 def base64_b64encode(context):
     if context.is_module_imported_like("base64"):
         if context.call_function_name_qual.endswith("b64encode"):
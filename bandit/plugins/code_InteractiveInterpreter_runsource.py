@@ -11,6 +11,7 @@ from bandit.core import test_properties as test
 
 @test.test_id("B345")
 @test.checks("Call")
+@test.matches_call("*runsource", imported_like="code")
 def code_InteractiveInterpreter_runsource(context):
     if context.is_module_imported_like("code"):
         if context.call_function_name_qual.endswith("runsource"):
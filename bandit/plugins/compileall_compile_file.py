@@ -11,6 +11,7 @@ from bandit.core import test_properties as test
 
 @test.test_id("B346")
 @test.checks("Call")
+@test.matches_call("*compile_file", imported_like="compileall")
 def compileall_compile_file(context):
     if context.is_module_imported_like("compileall"):
         if context.call_function_name_qual.endswith("compile_file"):
@@ -11,6 +11,7 @@ from bandit.core import test_properties as test
 
 @test.test_id("B343")
 @test.checks("Call")
+@test.matches_call("*Executor", imported_like="concurrent")
 def concurrent_futures_Executor(context):
     if context.is_module_imported_like("concurrent"):
         if context.call_function_name_qual.endswith("Executor"):
@@ -11,6 +11,7 @@ from bandit.core import test_properties as test
 
 @test.test_id("B344")
 @test.checks("Call")
+@test.matches_call("*CDLL", imported_like="ctypes")
 def ctypes_CDLL(context):
     if context.is_module_imported_like("ctypes"):
         if context.call_function_name_qual.endswith("CDLL"):
@@ -11,6 +11,7 @@ def eval_issue():
 
 @test.test_id("B347")
 @test.checks("Call")
+@test.matches_call("eval")
 def eval_used(context):
     if context.call_function_name_qual == "eval":
         return eval_issue()
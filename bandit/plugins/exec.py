@@ -53,6 +53,7 @@ if six.PY2:
 else:
 
     @test.checks("Call")
+    @test.matches_call("exec")
     @test.test_id("B321")
     def exec_used(context):
         if context.call_function_name_qual == "exec":
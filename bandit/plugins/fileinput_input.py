@@ -11,6 +11,7 @@ from bandit.core import test_properties as test
 
 @test.test_id("B333")
 @test.checks("Call")
+@test.matches_call("*input", imported_like="fileinput")
 def fileinput_input(context):
     if context.is_module_imported_like("fileinput"):
         if context.call_function_name_qual.endswith("input"):
@@ -11,6 +11,7 @@ from bandit.core import test_properties as test
 
 @test.test_id("B314")
 @test.checks("Call")
+@test.matches_call("*getuser", imported_like="getpass")
 def getpass_getuser(context):
     if context.is_module_imported_like("getpass"):
         if context.call_function_name_qual.endswith("getuser"):
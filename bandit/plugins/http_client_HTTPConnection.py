@@ -11,6 +11,7 @@ from bandit.core import test_properties as test
 
 @test.test_id("B324")
 @test.checks("Call")
+@test.matches_call("*HTTPConnection", imported_like="http")
 def http_client_HTTPConnection(context):
     if context.is_module_imported_like("http"):
         if context.call_function_name_qual.endswith("HTTPConnection"):
@@ -11,6 +11,7 @@ from bandit.core import test_properties as test
 
 @test.test_id("B325")
 @test.checks("Call")
+@test.matches_call("*request", imported_like="http")
 def http_client_HTTPConnection_request(context):
     if context.is_module_imported_like("http"):
         if context.call_function_name_qual.endswith("request"):
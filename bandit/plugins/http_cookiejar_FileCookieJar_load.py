@@ -11,6 +11,7 @@ from bandit.core import test_properties as test
 
 @test.test_id("B335")
 @test.checks("Call")
+@test.matches_call("*load", imported_like="http")
 def http_cookiejar_FileCookieJar_load(context):
     if context.is_module_imported_like("http"):
         if context.call_function_name_qual.endswith("load"):
@@ -11,6 +11,7 @@ from bandit.core import test_properties as test
 
 @test.test_id("B331")
 @test.checks("Call")
+@test.matches_call("*HTTPServer", imported_like="http")
 def http_server_HTTPServer(context):
     if context.is_module_imported_like("http"):
         if context.call_function_name_qual.endswith("HTTPServer"):
@@ -11,6 +11,7 @@ from bandit.core import test_properties as test
 
 @test.test_id("B342")
 @test.checks("Call")
+@test.matches_call("*Process", imported_like="multiprocessing")
 def multiprocessing_Process(context):
     if context.is_module_imported_like("multiprocessing"):
         if context.call_function_name_qual.endswith("Process"):
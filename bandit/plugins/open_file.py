@@ -11,6 +11,7 @@ from bandit.core import test_properties as test
 
 @test.test_id("B322")
 @test.checks("Call")
+@test.matches_call("open")
 def open_file(context):
     if context.call_function_name_qual == "open":
         return bandit.Issue(
@@ -11,6 +11,7 @@ from bandit.core import test_properties as test
 
 @test.test_id("B309")
 @test.checks("Call")
+@test.matches_call("*chmod", imported_like="os")
 def os_chmod(context):
     if context.is_module_imported_like("os"):
         if context.call_function_name_qual.endswith("chmod"):
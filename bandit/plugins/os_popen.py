@@ -11,6 +11,7 @@ from bandit.core import test_properties as test
 
 @test.test_id("B340")
 @test.checks("Call")
+@test.matches_call("*popen", imported_like="os")
 def os_popen(context):
     if context.is_module_imported_like("os"):
         if context.call_function_name_qual.endswith("popen"):
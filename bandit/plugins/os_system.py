@@ -11,6 +11,7 @@ from bandit.core import test_properties as test
 
 @test.test_id("B310")
 @test.checks("Call")
+@test.matches_call("*system", imported_like="os")
 def os_system(context):
     if context.is_module_imported_like("os"):
         if context.call_function_name_qual.endswith("system"):
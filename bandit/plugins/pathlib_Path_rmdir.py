@@ -11,6 +11,7 @@ from bandit.core import test_properties as test
 
 @test.test_id("B339")
 @test.checks("Call")
+@test.matches_call("*rmdir", imported_like="pathlib")
 def pathlib_Path_rmdir(context):
     if context.is_module_imported_like("pathlib"):
         if context.call_function_name_qual.endswith("rmdir"):
@@ -11,6 +11,7 @@ from bandit.core import test_properties as test
 
 @test.test_id("B308")
 @test.checks("Call")
+@test.matches_call("*system", imported_like="platform")
 def platform_system(context):
     if context.is_module_imported_like("platform"):
         if context.call_function_name_qual.endswith("system"):
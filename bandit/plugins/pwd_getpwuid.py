@@ -11,6 +11,7 @@ from bandit.core import test_properties as test
 
 @test.test_id("B303")
 @test.checks("Call")
+@test.matches_call("*getpwuid", imported_like="pwd")
 def pwd_getpwuid(context):
     if context.is_module_imported_like("pwd"):
         if context.call_function_name_qual.endswith("getpwuid"):
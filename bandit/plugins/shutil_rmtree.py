@@ -11,6 +11,7 @@ from bandit.core import test_properties as test
 
 @test.test_id("B337")
 @test.checks("Call")
+@test.matches_call("*rmtree", imported_like="shutil")
 def shutil_rmtree(context):
     if context.is_module_imported_like("shutil"):
         if context.call_function_name_qual.endswith("rmtree"):
@@ -11,6 +11,7 @@ from bandit.core import test_properties as test
 
 @test.test_id("B313")
 @test.checks("Call")
+@test.matches_call("*signal", imported_like="signal")
 def signal_signal(context):
     if context.is_module_imported_like("signal"):
         if context.call_function_name_qual.endswith("signal"):
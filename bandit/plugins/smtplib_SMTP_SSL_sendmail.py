@@ -11,6 +11,7 @@ from bandit.core import test_properties as test
 
 @test.test_id("B330")
 @test.checks("Call")
+@test.matches_call("*sendmail", imported_like="smtplib")
 def smtplib_SMTP_SSL_sendmail(context):
     if context.is_module_imported_like("smtplib"):
         if context.call_function_name_qual.endswith("sendmail"):
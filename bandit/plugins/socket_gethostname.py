@@ -11,6 +11,7 @@ from bandit.core import test_properties as test
 
 @test.test_id("B302")
 @test.checks("Call")
+@test.matches_call("*gethostname", imported_like="socket")
 def socket_gethostname(context):
     if context.is_module_imported_like("socket"):
         if context.call_function_name_qual.endswith("gethostname"):
@@ -11,6 +11,7 @@ from bandit.core import test_properties as test
 
 @test.test_id("B328")
 @test.checks("Call")
+@test.matches_call("*read", imported_like="ssl")
 def ssl_SSLSocket_read(context):
     if context.is_module_imported_like("ssl"):
         if context.call_function_name_qual.endswith("read"):
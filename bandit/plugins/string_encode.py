@@ -7,8 +7,8 @@ from bandit.core import test_properties as test
 @test.test_id('B503')
 def string_encode(context):
     #import pdb; pdb.set_trace()
-    if isinstance(context.node._bandit_parent, ast.Attribute):
-        if context.node._bandit_parent.attr == 'encode':
+    if isinstance(context.parent, ast.Attribute):
+        if context.parent.attr == 'encode':
             return bandit.Issue(
             severity=bandit.MEDIUM,
             confidence=bandit.MEDIUM,
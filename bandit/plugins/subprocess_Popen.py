@@ -11,6 +11,7 @@ from bandit.core import test_properties as test
 
 @test.test_id("B341")
 @test.checks("Call")
+@test.matches_call("*Popen", imported_like="subprocess")
 def subprocess_Popen(context):
     if context.is_module_imported_like("subprocess"):
         if context.call_function_name_qual.endswith("Popen"):
@@ -11,6 +11,7 @@ from bandit.core import test_properties as test
 
 @test.test_id("B334")
 @test.checks("Call")
+@test.matches_call("*open", imported_like="tarfile")
 def tarfile_open(context):
     if context.is_module_imported_like("tarfile"):
         if context.call_function_name_qual.endswith("open"):
@@ -11,6 +11,7 @@ from bandit.core import test_properties as test
 
 @test.test_id("B338")
 @test.checks("Call")
+@test.matches_call("*write", imported_like="tempfile")
 def tempfile_NamedTemporaryFile_write(context):
     if context.is_module_imported_like("tempfile"):
         if context.call_function_name_qual.endswith("write"):
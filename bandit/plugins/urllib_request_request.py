@@ -11,6 +11,7 @@ from bandit.core import test_properties as test
 
 @test.test_id("B307")
 @test.checks("Call")
+@test.matches_call("*Request", imported_like="urllib")
 def urllib_request_request(context):
     if context.is_module_imported_like("urllib"):
         if context.call_function_name_qual.endswith("Request"):
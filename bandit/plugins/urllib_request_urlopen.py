@@ -11,6 +11,7 @@ from bandit.core import test_properties as test
 
 @test.test_id("B323")
 @test.checks("Call")
+@test.matches_call("*urlopen", imported_like="urllib")
 def urllib_request_urlopen(context):
     if context.is_module_imported_like("urllib"):
         if context.call_function_name_qual.endswith("urlopen"):
@@ -11,6 +11,7 @@ from bandit.core import test_properties as test
 
 @test.test_id("B327")
 @test.checks("Call")
+@test.matches_call("*urlretrieve", imported_like="urllib")
 def urllib_urlretrieve(context):
     if context.is_module_imported_like("urllib"):
         if context.call_function_name_qual.endswith("urlretrieve"):
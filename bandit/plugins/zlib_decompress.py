@@ -11,6 +11,7 @@ from bandit.core import test_properties as test
 
 @test.test_id("B306")
 @test.checks("Call")
+@test.matches_call("*decompress", imported_like="zlib")
 def zlib_decompress(context):
     if context.is_module_imported_like("zlib"):
         if context.call_function_name_qual.endswith("decompress"):
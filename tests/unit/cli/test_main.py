@@ -10,7 +10,9 @@ import mock
 import testtools
 
 from bandit.cli import main as bandit
+from bandit.core import config as b_config
 from bandit.core import extension_loader as ext_loader
+from bandit.core import manager as b_manager
 from bandit.core import utils
 
 bandit_config_content = """
@@ -120,6 +122,61 @@ class BanditCLIMainTests(testtools.TestCase):
         self.assertRaisesRegex(SystemExit, '2', bandit._get_options_from_ini,
                                None, [target_directory])
 
+    def test_get_options_from_ini_not_recursive(self):
+        # Test that only the targets are looked in when not recursive
+        target_directory = self.useFixture(fixtures.TempDir()).path
+        os.mkdir(os.path.join(target_directory, 'a'))
+        with open(os.path.join(target_directory, 'a', '.bandit'), 'wt') as fd:
+            fd.write('[bandit]\n')
+        with mock.patch('os.walk') as walk:
+            self.assertIsNone(bandit._get_options_from_ini(
+                None, [target_directory], recursive=False))
+        self.assertFalse(walk.called)
+        self.assertEqual({}, bandit._get_options_from_ini(
+            None, [os.path.join(target_directory, 'a')], recursive=False))
+
+    def test_get_options_from_ini_shared_walk(self):
+        # Test that file discovery reuses the directory listings of the walk
+        # looking for .bandit files instead of reading each directory again
+        target_directory = self.useFixture(fixtures.TempDir()).path
+        for path in ('a', 'a/b', 'c', '.git'):
+            os.mkdir(os.path.join(target_directory, path))
+        for path in ('a/x.py', 'a/b/y.py', 'c/.bandit', '.git/z.py'):
+            with open(os.path.join(target_directory, path), 'wt') as fd:
+                fd.write('[bandit]\n')
+
+        def discover(listings):
+            with mock.patch('os.scandir', wraps=os.scandir) as scandir:
+                with mock.patch('os.stat', wraps=os.stat) as stat:
+                    ini_options = bandit._get_options_from_ini(
+                        None, [target_directory], listings)
+                    ini_calls = scandir.call_count + stat.call_count
+                    b_mgr = b_manager.BanditManager(b_config.BanditConfig(),
+                                                    'file')
+                    b_mgr.discover_files(
+                        [target_directory], True,
+                        os.path.join(target_directory, '.git'), listings)
+            calls = scandir.call_count + stat.call_count - ini_calls
+            return (ini_options, b_mgr.files_list, b_mgr.excluded_files,
+                    calls)
+
+        separate = discover(None)
+        shared = discover(b_manager.DirectoryListings())
+        self.assertEqual({}, shared[0])
+        self.assertEqual(separate[:3], shared[:3])
+        self.assertEqual(2, len(shared[1]))
+        # discover_files checks that the target and the excluded path are
+        # directories, then reads the four directories which are not
+        # excluded with os.stat and os.scandir unless the first walk
+        # recorded their listings
+        self.assertEqual(2 + 8, separate[3])
+        self.assertEqual(2, shared[3])
+        # past its cap, the directories not recorded are read again: only
+        # the target and .git are recorded, so the other three are read
+        capped = discover(b_manager.DirectoryListings(max_listings=2))
+        self.assertEqual(separate[:3], capped[:3])
+        self.assertEqual(2 + 6, capped[3])
+
     def test_init_extensions(self):
         # Test that an extension loader manager is returned
         self.assertEqual(ext_loader.MANAGER, bandit._init_extensions())
@@ -183,6 +240,37 @@ class BanditCLIMainTests(testtools.TestCase):
                 self.assertEqual(str(err_mock.call_args[0][0]),
                                  'Unknown test found in profile: some_test')
 
+    @mock.patch('sys.argv', ['bandit', '-c', 'bandit.yaml', '-j', '0',
+                             'test'])
+    def test_main_jobs_with_ini_options(self):
+        # Test that -j 0 is kept when a .bandit file is found
+        temp_directory = self.useFixture(fixtures.TempDir()).path
+        os.chdir(temp_directory)
+        with open('bandit.yaml', 'wt') as fd:
+            fd.write(bandit_config_content)
+        with mock.patch('bandit.cli.main._get_options_from_ini'
+                        ) as mock_get_opts:
+            mock_get_opts.return_value = {"jobs": "2"}
+            with mock.patch('bandit.core.manager.BanditManager'
+                            ) as mock_manager:
+                mock_manager.side_effect = RuntimeError
+                self.assertRaises(RuntimeError, bandit.main)
+                self.assertEqual(0, mock_manager.call_args[1]['jobs'])
+
+    @mock.patch('sys.argv', ['bandit', '-c', 'bandit.yaml', '-r',
+                             '--pipeline', 'test'])
+    def test_main_pipeline_nested_ini(self):
+        # Test that a pipelined scan stops at a .bandit file below the
+        # targets, whose options it could not use
+        temp_directory = self.useFixture(fixtures.TempDir()).path
+        os.chdir(temp_directory)
+        with open('bandit.yaml', 'wt') as fd:
+            fd.write(bandit_config_content)
+        os.makedirs(os.path.join('test', 'sub'))
+        with open(os.path.join('test', 'sub', '.bandit'), 'wt') as fd:
+            fd.write('[bandit]\n')
+        self.assertRaisesRegex(SystemExit, '2', bandit.main)
+
     @mock.patch('sys.argv', ['bandit', '-c', 'bandit.yaml', '-t', 'badID',
                              'test'])
     def test_main_unknown_tests(self):
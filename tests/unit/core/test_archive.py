@@ -0,0 +1,118 @@
+# -*- coding:utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+
+import io
+import tarfile
+import zipfile
+
+import testtools
+
+from bandit.core import archive
+
+
+def _make_zip(members):
+    data = io.BytesIO()
+    with zipfile.ZipFile(data, 'w') as zf:
+        for name, content in members:
+            zf.writestr(name, content)
+    return data.getvalue()
+
+
+def _make_tar(members):
+    data = io.BytesIO()
+    with tarfile.open(fileobj=data, mode='w:gz') as tar:
+        for name, content in members:
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            tar.addfile(info, io.BytesIO(content))
+    return data.getvalue()
+
+
+def _include(path):
+    return path.endswith('.py')
+
+
+class ArchiveTests(testtools.TestCase):
+
+    def test_is_archive(self):
+        self.assertTrue(archive.is_archive('pkg-1.0.tar.gz'))
+        self.assertTrue(archive.is_archive('pkg-1.0-py3-none-any.WHL'))
+        self.assertTrue(archive.is_archive('pkg.zip'))
+        self.assertFalse(archive.is_archive('pkg.py'))
+
+    def test_read_zip(self):
+        data = _make_zip([('pkg/__init__.py', b'import os\n'),
+                          ('pkg/data.txt', b'text')])
+        reader = archive.ArchiveReader()
+        self.assertEqual(
+            [('pkg.whl!pkg/__init__.py', b'import os\n', None)],
+            list(reader.read('pkg.whl', io.BytesIO(data), _include)))
+
+    def test_read_nested(self):
+        wheel = _make_zip([('pkg/__init__.py', b'import os\n')])
+        data = _make_tar([('pkg-1.0/setup.py', b'exec("x")\n'),
+                          ('pkg-1.0/dist/pkg.whl', wheel)])
+
+        reader = archive.ArchiveReader(max_depth=2)
+        self.assertEqual(
+            [('pkg.tar.gz!pkg-1.0/setup.py', b'exec("x")\n', None),
+             ('pkg.tar.gz!pkg-1.0/dist/pkg.whl!pkg/__init__.py',
+              b'import os\n', None)],
+            list(reader.read('pkg.tar.gz', io.BytesIO(data), _include)))
+
+        reader = archive.ArchiveReader(max_depth=1)
+        members = list(reader.read('pkg.tar.gz', io.BytesIO(data), _include))
+        self.assertEqual(('pkg.tar.gz!pkg-1.0/dist/pkg.whl', None),
+                         members[1][:2])
+        self.assertIn('nested archive', members[1][2])
+
+    def test_read_size_limit(self):
+        # the decompressed tar holds a 512 byte header and a 512 byte block
+        # of data for each member, b.py's header is past the limit
+        data = _make_tar([('a.py', b'x = 1\n'), ('b.py', b'y = 2\n' * 10)])
+        reader = archive.ArchiveReader(max_size=1100)
+        members = list(reader.read('pkg.tar.gz', io.BytesIO(data), _include))
+        self.assertEqual(2, len(members))
+        self.assertEqual(('pkg.tar.gz!a.py', b'x = 1\n', None), members[0])
+        self.assertEqual(('pkg.tar.gz', None), members[1][:2])
+        self.assertIn('1100 bytes', members[1][2])
+
+        data = _make_zip([('a.py', b'x = 1\n'), ('b.py', b'y = 2\n' * 10)])
+        reader = archive.ArchiveReader(max_size=20)
+        members = list(reader.read('pkg.zip', io.BytesIO(data), _include))
+        self.assertEqual(('pkg.zip!a.py', b'x = 1\n', None), members[0])
+        self.assertIn('20 bytes', members[1][2])
+
+    def test_read_size_limit_skipped(self):
+        # members which are not scanned are decompressed all the same
+        data = _make_tar([('blob.bin', b'\0' * 1024 * 1024),
+                          ('a.py', b'x = 1\n')])
+        self.assertLess(len(data), 64 * 1024)
+        reader = archive.ArchiveReader(max_size=64 * 1024)
+        members = list(reader.read('pkg.tar.gz', io.BytesIO(data), _include))
+        self.assertEqual([('pkg.tar.gz', None)], [m[:2] for m in members])
+        self.assertLessEqual(reader.size, 64 * 1024)
+
+        reader = archive.ArchiveReader()
+        self.assertEqual(
+            [('pkg.tar.gz!a.py', b'x = 1\n', None)],
+            list(reader.read('pkg.tar.gz', io.BytesIO(data), _include)))
+
+    def test_read_error(self):
+        reader = archive.ArchiveReader()
+        self.assertEqual(
+            [('pkg.zip', None, 'error while reading archive')],
+            list(reader.read('pkg.zip', io.BytesIO(b'garbage'), _include)))
+
+    def test_read_error_raised(self):
+        # errors which are not about the archive are not hidden
+        data = _make_zip([('a.py', b'x = 1\n')])
+
+        def include(path):
+            raise RuntimeError('include')
+
+        reader = archive.ArchiveReader()
+        self.assertRaisesRegex(
+            RuntimeError, 'include', list,
+            reader.read('pkg.zip', io.BytesIO(data), include))
@@ -0,0 +1,114 @@
+# -*- coding:utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+
+import fixtures
+import mock
+import testtools
+
+from bandit.core import cache
+from bandit.core import config
+from bandit.core import constants
+from bandit.core import issue
+from bandit.core import test_set
+
+
+class ResultCacheTests(testtools.TestCase):
+
+    def setUp(self):
+        super(ResultCacheTests, self).setUp()
+        self.cache_dir = self.useFixture(fixtures.TempDir()).path
+        self.b_conf = config.BanditConfig()
+        self.b_ts = test_set.BanditTestSet(self.b_conf)
+        self.cache = cache.ResultCache(self.cache_dir, self.b_ts,
+                                       self.b_conf)
+
+    def _get_issue_instance(self):
+        new_issue = issue.Issue(constants.HIGH, constants.MEDIUM, 'Test issue',
+                                lineno=2, test_id='B999')
+        new_issue.fname = 'code.py'
+        new_issue.test = 'bandit_plugin'
+        new_issue.linerange = [2, 3]
+        return new_issue
+
+    def test_store_get(self):
+        key = self.cache.get_key(b'eval("1")\n')
+        self.assertIsNone(self.cache.get(key))
+
+        score = {'SEVERITY': [0, 0, 0, 10], 'CONFIDENCE': [0, 0, 5, 0]}
+        self.cache.store(key, [self._get_issue_instance()], score,
+                         {'loc': 1, 'nosec': 0})
+        entry = self.cache.get(key)
+        self.assertEqual(score, entry['score'])
+        self.assertEqual({'loc': 1, 'nosec': 0}, entry['metrics'])
+        self.assertIsNone(entry['skipped'])
+        self.assertEqual(1, self.cache.hits)
+        self.assertEqual(1, self.cache.misses)
+
+        issues = cache.ResultCache.issues_from_entry(entry, 'other.py')
+        expected = self._get_issue_instance()
+        expected.fname = 'other.py'
+        self.assertEqual([expected.as_dict(with_code=False)],
+                         [i.as_dict(with_code=False) for i in issues])
+
+    def test_key_fingerprint(self):
+        data = b'eval("1")\n'
+        other = cache.ResultCache(self.cache_dir, self.b_ts, self.b_conf)
+        self.assertEqual(self.cache.get_key(data), other.get_key(data))
+
+        other = cache.ResultCache(self.cache_dir, self.b_ts, self.b_conf,
+                                  ignore_nosec=True)
+        self.assertNotEqual(self.cache.get_key(data), other.get_key(data))
+
+        profile = {'exclude': ['B347']}
+        other = cache.ResultCache(self.cache_dir,
+                                  test_set.BanditTestSet(self.b_conf, profile),
+                                  self.b_conf)
+        self.assertNotEqual(self.cache.get_key(data), other.get_key(data))
+
+    def test_prune(self):
+        keys = [self.cache.get_key(str(i).encode()) for i in range(3)]
+        for key in keys:
+            self.cache.store(key, [], None, {'loc': 0, 'nosec': 0})
+        paths = [self.cache._get_path(key) for key in keys]
+        for age, path in enumerate(paths):
+            os.utime(path, (1000 - age * 10, 1000 - age * 10))
+        # reading an entry makes it the most recently used one
+        self.cache.get(keys[2])
+
+        self.cache.max_size = os.path.getsize(paths[0]) * 2
+        self.cache.prune()
+        self.assertEqual([True, False, True],
+                         [os.path.exists(path) for path in paths])
+
+    def test_prune_size(self):
+        self.cache.max_size = 1000
+        key = self.cache.get_key(b'1')
+        self.cache.store(key, [], None, {'loc': 0, 'nosec': 0})
+        size = os.path.getsize(self.cache._get_path(key))
+        self.assertEqual(size, self.cache.stored)
+        # the first prune works out the size of the cache
+        self.cache.prune()
+        self.assertEqual(0, self.cache.stored)
+        self.assertEqual(size, self.cache._read_size())
+
+        # the entries are left alone while under max_size
+        self.cache.store(self.cache.get_key(b'2'), [], None,
+                         {'loc': 0, 'nosec': 0})
+        with mock.patch('os.walk') as walk:
+            self.cache.prune()
+        self.assertFalse(walk.called)
+        self.assertEqual(size * 2, self.cache._read_size())
+
+        self.cache.max_size = size
+        self.cache.store(self.cache.get_key(b'3'), [], None,
+                         {'loc': 0, 'nosec': 0})
+        self.cache.prune()
+        self.assertEqual(size, self.cache._read_size())
+
+    def test_store_error(self):
+        with mock.patch('tempfile.mkstemp', side_effect=OSError):
+            self.cache.store(self.cache.get_key(b''), [], None, {})
+        self.assertIsNone(self.cache.get(self.cache.get_key(b'')))
@@ -5,12 +5,16 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import ast
+import copy
 
 import mock
 import six
 import testtools
 
+from bandit.core import config
 from bandit.core import context
+from bandit.core import test_set
+from bandit.core import utils as b_utils
 
 
 class ContextTests(testtools.TestCase):
@@ -254,3 +258,85 @@ class ContextTests(testtools.TestCase):
 
         new_context = context.Context()
         self.assertFalse(new_context.is_module_imported_like('spam'))
+
+    def test_cached_properties(self):
+        ref_call = ast.parse('f(a.b, [1, 2], x=3)').body[0].value
+        new_context = context.Context(context_object=dict(call=ref_call))
+        with mock.patch.object(new_context, '_convert_literal',
+                               wraps=new_context._convert_literal) as convert:
+            self.assertEqual(['b', [1, 2]], new_context.call_args)
+            self.assertEqual(['b', [1, 2]], new_context.call_args)
+            self.assertEqual({'x': 3}, new_context.call_keywords)
+            self.assertEqual({'x': 3}, new_context.call_keywords)
+            self.assertEqual([1, 2], new_context.get_call_arg_at_position(1))
+        # the list and its two items, then the keyword value, are only
+        # converted once
+        self.assertEqual(4, convert.call_count)
+
+    def test_shared_context_results(self):
+        # tests sharing one context report the same issues as tests which
+        # each get their own copy of the raw context
+        b_ts = test_set.BanditTestSet(config.BanditConfig())
+        tree = ast.parse(
+            'import os, socket, base64\n'
+            'os.system("ls -l " + "/tmp")\n'
+            's = socket.socket(socket.AF_INET, socket.SOCK_STREAM)\n'
+            's.connect(("10.0.0.1", 80), timeout=3)\n'
+            'base64.b64decode(b"aGk=").decode("utf-8")\n'
+            '__import__("importlib").import_module("pickle")\n'
+            'eval("1")\n')
+
+        def run(test, ctx):
+            if hasattr(test, '_config'):
+                issue = test(ctx, test._config)
+            else:
+                issue = test(ctx)
+            return issue and (issue.test_id, issue.text, issue.severity)
+
+        for node in ast.walk(tree):
+            if not isinstance(node, ast.Call):
+                continue
+            raw_context = {'call': node, 'node': node, 'lineno': node.lineno,
+                           'imports': {'os', 'socket', 'base64'},
+                           'import_aliases': {},
+                           'qualname': b_utils.get_call_name(node, {}),
+                           'filename': 'code.py'}
+            shared = context.Context(raw_context)
+            for test in b_ts.get_tests('Call'):
+                own = context.Context(copy.copy(raw_context))
+                self.assertEqual(run(test, own), run(test, shared))
+
+    def test_import_set_imported_like(self):
+        imports = context.ImportSet(['os.path'])
+        new_context = context.Context(context_object=dict(imports=imports))
+        self.assertTrue(new_context.is_module_imported_like('os'))
+        self.assertTrue(new_context.is_module_imported_like('s.pa'))
+        self.assertFalse(new_context.is_module_imported_like('socket'))
+        self.assertTrue(new_context.is_module_imported_exact('os.path'))
+        self.assertFalse(new_context.is_module_imported_exact('os'))
+
+        # answers follow imports added later on
+        imports.add('base_sockets')
+        self.assertTrue(new_context.is_module_imported_like('socket'))
+        imports.discard('base_sockets')
+        self.assertFalse(new_context.is_module_imported_like('socket'))
+        imports.update(['socket'])
+        self.assertTrue(new_context.is_module_imported_like('socket'))
+
+    def test_import_set_mutators(self):
+        imports = context.ImportSet(['os.path', 'socket'])
+        self.assertTrue(imports.is_imported_like('sock'))
+        self.assertFalse(imports.is_imported_like('ssl'))
+
+        imports -= {'socket'}
+        self.assertFalse(imports.is_imported_like('sock'))
+        imports |= {'ssl'}
+        self.assertTrue(imports.is_imported_like('ssl'))
+        imports &= {'os.path'}
+        self.assertFalse(imports.is_imported_like('ssl'))
+        imports ^= {'os.path', 'socket'}
+        self.assertTrue(imports.is_imported_like('sock'))
+        self.assertFalse(imports.is_imported_like('os'))
+        self.assertEqual('socket', imports.pop())
+        self.assertFalse(imports.is_imported_like('sock'))
+        self.assertEqual(set(), imports)
@@ -105,6 +105,44 @@ class IssueTests(testtools.TestCase):
         # line number doesn't match but should pass because we don't test that
         self.assertEqual(issue_a, issue_h)
 
+    def test_match_key(self):
+        issue_a = _get_issue_instance()
+        issue_b = _get_issue_instance()
+        issue_b.lineno = 12345
+        issue_c = _get_issue_instance()
+        issue_c.test_id = 'B998'
+
+        self.assertEqual(issue_a.match_key(), issue_b.match_key())
+        self.assertNotEqual(issue_a.match_key(), issue_c.match_key())
+        self.assertEqual(1, len({issue_a.match_key(), issue_b.match_key()}))
+        # equal issues are still told apart in sets
+        self.assertEqual(2, len({issue_a, issue_b}))
+
+    def test_linerange(self):
+        new_issue = _get_issue_instance()
+        self.assertEqual([], new_issue.linerange)
+        new_issue.linerange = [3, 4, 5]
+        self.assertEqual([3, 4, 5], new_issue.linerange)
+        self.assertEqual(range(3, 6), new_issue._linerange)
+        new_issue.linerange = [3, 5]
+        self.assertEqual([3, 5], new_issue.linerange)
+        self.assertEqual([3, 5], new_issue.as_dict(False)['line_range'])
+
+    def test_compact(self):
+        new_issue = _get_issue_instance()
+        self.assertFalse(hasattr(new_issue, '__dict__'))
+        data = new_issue.as_dict(False)
+        data['code'] = ''
+        # issues loaded from a report share their strings
+        first, second = [issue.issue_from_dict(
+            dict((key, ''.join(list(value)) if isinstance(value, str)
+                  else value) for key, value in data.items()))
+            for _ in range(2)]
+        self.assertEqual(new_issue, first)
+        self.assertIs(first.severity, second.severity)
+        self.assertIs(first.test_id, second.test_id)
+        self.assertIs(first.fname, second.fname)
+
     @mock.patch('linecache.getline')
     def test_get_code(self, getline):
         getline.return_value = b'\x08\x30'
@@ -116,6 +154,32 @@ class IssueTests(testtools.TestCase):
             self.fail('Bytes not properly decoded in issue.get_code()')
 
 
+    @mock.patch('linecache.getline')
+    def test_keep_code(self, getline):
+        getline.return_value = ''
+        data = b'# -*- coding: latin-1 -*-\r\nx = 1\r\ny = "\xe9"\r\nz = 3'
+        offsets = [0, 27, 34, 43, 48]
+        new_issue = _get_issue_instance()
+        new_issue.lineno = 3
+        new_issue.linerange = [3]
+        new_issue.keep_code(data, offsets, 'latin-1', 5)
+        self.assertEqual('2 x = 1\n3 y = "\xe9"\n4 z = 3\n',
+                         new_issue.get_code())
+        self.assertEqual('1\t# -*- coding: latin-1 -*-\n2\tx = 1\n'
+                         '3\ty = "\xe9"\n4\tz = 3\n',
+                         new_issue.get_code(5, True))
+        self.assertEqual('3 y = "\xe9"\n', new_issue.get_code(1))
+        self.assertFalse(getline.called)
+
+        # more lines than were kept are read from the file
+        self.assertEqual('', new_issue.get_code(7))
+        getline.assert_called_with('code.py', 1)
+
+        new_issue.lineno = 9
+        new_issue.keep_code(data, offsets, 'latin-1')
+        self.assertEqual('', new_issue.get_code())
+
+
 def _get_issue_instance(severity=bandit.MEDIUM, confidence=bandit.MEDIUM):
     new_issue = issue.Issue(severity, confidence, 'Test issue')
     new_issue.fname = 'code.py'
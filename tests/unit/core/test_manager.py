@@ -5,15 +5,20 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import os
+import threading
+import zipfile
 
 import fixtures
 import mock
+import six
 import testtools
 
 from bandit.core import config
 from bandit.core import constants
 from bandit.core import issue
 from bandit.core import manager
+from bandit.core import metrics
+from bandit.core import utils
 
 
 class ManagerTests(testtools.TestCase):
@@ -89,19 +94,99 @@ class ManagerTests(testtools.TestCase):
         self.assertFalse(e)
         self.assertTrue(f)
 
-    @mock.patch('os.walk')
-    def test_get_files_from_dir(self, os_walk):
-        os_walk.return_value = [
-            ('/', ('a'), ()),
-            ('/a', (), ('a.py', 'b.py', 'c.ww'))
-        ]
+    def _make_tree(self, paths):
+        temp_directory = self.useFixture(fixtures.TempDir()).path
+        for path in paths:
+            source = ''
+            if isinstance(path, tuple):
+                path, source = path
+            path = os.path.join(temp_directory, path)
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            with open(path, 'wt') as fd:
+                fd.write(source)
+        return temp_directory
+
+    def test_get_files_from_dir(self):
+        top = self._make_tree(['a/a.py', 'a/b.py', 'a/c.ww'])
+
+        inc, exc = manager._get_files_from_dir(files_dir=top,
+                                               included_globs=['*.py'],
+                                               excluded_path_strings=None)
 
-        inc, exc = manager._get_files_from_dir(files_dir='',
+        self.assertEqual(set([os.path.join(top, 'a', 'c.ww')]), exc)
+        self.assertEqual(set([os.path.join(top, 'a', 'a.py'),
+                              os.path.join(top, 'a', 'b.py')]), inc)
+
+    def test_get_files_from_dir_excluded_dirs(self):
+        top = self._make_tree(['a.py', '.git/hooks/b.py', 'x/c.py',
+                               'x/y/d.py', 'z/.github/e.py', 'z/f.py'])
+
+        excluded = ['.git', os.path.join(top, 'x', '*')]
+        excluded_dirs = []
+        with mock.patch('os.scandir', wraps=os.scandir) as scandir:
+            inc, exc = manager._get_files_from_dir(
+                files_dir=top, included_globs=['*.py'],
+                excluded_path_strings=excluded, excluded_dirs=excluded_dirs)
+
+        self.assertEqual(set([os.path.join(top, 'a.py'),
+                              os.path.join(top, 'z', 'f.py')]), inc)
+        # excluded directories are noted without being entered
+        self.assertEqual(set(), exc)
+        self.assertEqual(set([os.path.join(top, '.git'),
+                              os.path.join(top, 'x'),
+                              os.path.join(top, 'z', '.github')]),
+                         set(excluded_dirs))
+        self.assertEqual([top, os.path.join(top, 'z')],
+                         [c[0][0] for c in scandir.call_args_list])
+
+        # without a list to note them in, their files are listed
+        inc, exc = manager._get_files_from_dir(
+            files_dir=top, included_globs=['*.py'],
+            excluded_path_strings=excluded)
+        self.assertEqual(set([os.path.join(top, '.git', 'hooks', 'b.py'),
+                              os.path.join(top, 'x', 'c.py'),
+                              os.path.join(top, 'x', 'y', 'd.py'),
+                              os.path.join(top, 'z', '.github', 'e.py')]),
+                         exc)
+
+    def test_discover_files_excluded_dirs(self):
+        # Test that the files in excluded directories are reported, but
+        # only listed once they are asked for
+        top = self._make_tree(['a.py', 'node_modules/b.py',
+                               'node_modules/c/d.js', 'e.txt'])
+        with mock.patch('os.walk', wraps=os.walk) as walk:
+            self.manager.discover_files(
+                [top], True, os.path.join(top, 'node_modules'))
+            self.assertFalse(walk.called)
+            self.assertEqual(
+                [os.path.join(top, 'e.txt'),
+                 os.path.join(top, 'node_modules', 'b.py'),
+                 os.path.join(top, 'node_modules', 'c', 'd.js')],
+                self.manager.excluded_files)
+            self.assertEqual(1, walk.call_count)
+
+        self.assertEqual([os.path.join(top, 'a.py')],
+                         self.manager.files_list)
+        files = self.manager.iter_files(
+            [top], True, os.path.join(top, 'node_modules'))
+        self.assertEqual([os.path.join(top, 'a.py')], list(files))
+        self.assertEqual(3, len(self.manager.excluded_files))
+
+    def test_get_files_from_dir_symlinks(self):
+        top = self._make_tree(['a/a.py'])
+        os.symlink(os.path.join(top, 'a'), os.path.join(top, 'a', 'loop'))
+        os.symlink(os.path.join(top, 'a', 'a.py'), os.path.join(top, 'b.py'))
+
+        inc, exc = manager._get_files_from_dir(files_dir=top,
                                                included_globs=['*.py'],
                                                excluded_path_strings=None)
 
-        self.assertEqual(set(['/a/c.ww']), exc)
-        self.assertEqual(set(['/a/a.py', '/a/b.py']), inc)
+        # like os.walk, symlinks to files are included and symlinks to
+        # directories are not followed
+        self.assertEqual(set([os.path.join(top, 'a', 'a.py'),
+                              os.path.join(top, 'b.py')]), inc)
+        self.assertEqual(set(), exc)
 
     def test_populate_baseline_success(self):
         # Test populate_baseline with valid JSON
@@ -150,6 +235,34 @@ class ManagerTests(testtools.TestCase):
 
         self.assertEqual([3, 2, 1], r)
 
+    def test_filter_results(self):
+        levels = constants.RANKING
+        self.manager.results = [
+            self._get_issue_instance(sev=levels[i % 4], conf=levels[i // 4])
+            for i in range(16)]
+        for sev in levels:
+            for conf in levels:
+                self.assertEqual(
+                    [i for i in self.manager.results if i.filter(sev, conf)],
+                    self.manager.filter_results(sev, conf))
+
+        # views are kept until the results change
+        view = self.manager.filter_results(constants.LOW, constants.LOW)
+        self.assertIs(view, self.manager.get_issue_list())
+        self.manager.results.append(
+            self._get_issue_instance(sev=constants.HIGH))
+        self.assertEqual(view + self.manager.results[-1:],
+                         self.manager.get_issue_list())
+        self.manager.results = self.manager.results[:1]
+        self.assertEqual([], self.manager.get_issue_list())
+
+        # and the baseline
+        self.manager.results = [self._get_issue_instance(),
+                                self._get_issue_instance(sev=constants.HIGH)]
+        self.manager.baseline = self.manager.results[:1]
+        self.assertEqual([self.manager.results[1]],
+                         list(self.manager.get_issue_list()))
+
     def test_output_results_invalid_format(self):
         # Test that output_results succeeds given an invalid format
         temp_directory = self.useFixture(fixtures.TempDir()).path
@@ -279,6 +392,227 @@ class ManagerTests(testtools.TestCase):
         # since IOError is not constant
         self.assertIn(no_such_file, str(self.manager.skipped))
 
+    def test_run_tests_parallel(self):
+        # Test that a parallel scan produces the same results as a serial one
+        temp_directory = self.useFixture(fixtures.TempDir()).path
+        sources = {
+            'a.py': 'import os\nos.system("ls")\n',
+            'b.py': 'eval("1")\nexec("2")\n',
+            'c.py': 'def broken(:\n',
+            'd.py': 'x = 1  # nosec\n',
+        }
+        for name, source in sources.items():
+            with open(os.path.join(temp_directory, name), 'wt') as fd:
+                fd.write(source)
+        files_list = sorted(os.path.join(temp_directory, name)
+                            for name in sources)
+
+        serial = manager.BanditManager(self.config, 'file')
+        serial.files_list = list(files_list)
+        serial.run_tests()
+
+        parallel = manager.BanditManager(self.config, 'file', jobs=2)
+        parallel.files_list = list(files_list)
+        parallel.run_tests()
+
+        self.assertEqual([r.as_dict() for r in serial.results],
+                         [r.as_dict() for r in parallel.results])
+        self.assertEqual(serial.skipped, parallel.skipped)
+        self.assertEqual(serial.scores, parallel.scores)
+        self.assertEqual(serial.files_list, parallel.files_list)
+        self.assertEqual(serial.metrics.data, parallel.metrics.data)
+
+    def test_run_tests_parallel_error(self):
+        # Test that an error while merging stops the workers and is raised
+        top = self._make_tree(['a.py', 'b.py'])
+        files_list = [os.path.join(top, 'a.py'), os.path.join(top, 'b.py')]
+        for pipelined in (False, True):
+            m = manager.BanditManager(self.config, 'file', jobs=2)
+            m.files_list = list(files_list)
+            with mock.patch.object(m, '_merge_scan',
+                                   side_effect=RuntimeError('merge')):
+                self.assertRaisesRegex(
+                    RuntimeError, 'merge', m.run_tests,
+                    iter(files_list) if pipelined else None)
+
+    def test_run_tests_profile_plugins(self):
+        # Test that the plugin profile of workers adds up to a serial one
+        temp_directory = self.useFixture(fixtures.TempDir()).path
+        files_list = []
+        for name, source in (('a.py', 'eval("1")\nimport pickle\n'),
+                             ('b.py', 'exec("1")\neval("2")  # nosec\n')):
+            files_list.append(os.path.join(temp_directory, name))
+            with open(files_list[-1], 'wt') as fd:
+                fd.write(source)
+
+        profiles = []
+        for jobs in (1, 2):
+            m = manager.BanditManager(self.config, 'file', jobs=jobs,
+                                      profile_plugins=True)
+            m.files_list = list(files_list)
+            m.run_tests()
+            profiles.append(dict(
+                ((row['test_id'], row['node_type']),
+                 (row['calls'], row['issues']))
+                for row in m.metrics.data['_plugins']))
+
+        self.assertEqual(profiles[0], profiles[1])
+        self.assertEqual((2, 0), profiles[0][('B001', 'Call')])
+        self.assertEqual((1, 1), profiles[0][('B347', 'Call')])
+        self.assertEqual((1, 0), profiles[0][('B001', 'Import')])
+
+    def test_run_tests_timings(self):
+        # Test that the slowest files are reported with each phase timed
+        temp_directory = self.useFixture(fixtures.TempDir()).path
+        files_list = []
+        for name, source in (('a.py', 'eval("1")\n'),
+                             ('b.py', 'x = [%s]\n' % ', '.join(['1'] * 2000)),
+                             ('c.py', 'exec("1")  # nosec\n')):
+            files_list.append(os.path.join(temp_directory, name))
+            with open(files_list[-1], 'wt') as fd:
+                fd.write(source)
+
+        m = manager.BanditManager(self.config, 'file', timings=2)
+        m.discover_files(files_list)
+        m.run_tests()
+        timings = m.metrics.data['_timings']
+        self.assertEqual(set(metrics.PHASES), set(timings['phases']))
+        self.assertGreater(timings['phases']['discovery'], 0)
+        self.assertGreater(timings['phases']['visit'], 0)
+        self.assertEqual(2, len(timings['slowest_files']))
+        slowest = timings['slowest_files'][0]
+        self.assertEqual(files_list[1], slowest['filename'])
+        self.assertEqual(os.path.getsize(files_list[1]), slowest['size'])
+        self.assertGreater(slowest['nodes'], 2000)
+        self.assertEqual({'read', 'nosec', 'parse', 'visit'},
+                         set(slowest) - {'filename', 'time', 'size', 'nodes'})
+
+        # the phases timed by workers are added to those of the run
+        m = manager.BanditManager(self.config, 'file', jobs=2, timings=2)
+        m.files_list = list(files_list)
+        m.run_tests()
+        timings = m.metrics.data['_timings']
+        self.assertGreater(timings['phases']['visit'], 0)
+        self.assertEqual(files_list[1],
+                         timings['slowest_files'][0]['filename'])
+
+    def test_run_tests_cache(self):
+        # Test that a rescan is served from the cache for unchanged files
+        temp_directory = self.useFixture(fixtures.TempDir()).path
+        cache_dir = os.path.join(temp_directory, 'cache')
+        files_list = []
+        for name, source in (('a.py', 'eval("1")\n'),
+                             ('b.py', 'def broken(:\n'),
+                             ('c.py', 'exec("1")\n')):
+            files_list.append(os.path.join(temp_directory, name))
+            with open(files_list[-1], 'wt') as fd:
+                fd.write(source)
+
+        def scan():
+            m = manager.BanditManager(self.config, 'file',
+                                      cache_dir=cache_dir)
+            m.files_list = list(files_list)
+            with mock.patch.object(m, '_execute_ast_visitor',
+                                   wraps=m._execute_ast_visitor) as visitor:
+                m.run_tests()
+            return m, [c[0][0] for c in visitor.call_args_list]
+
+        first, visited = scan()
+        self.assertEqual(files_list, visited)
+        self.assertEqual(3, first.metrics.data['_totals']['cache_misses'])
+
+        # unchanged files are not parsed again
+        second, visited = scan()
+        self.assertEqual([], visited)
+        self.assertEqual(3, second.metrics.data['_totals']['cache_hits'])
+        self.assertEqual([r.as_dict() for r in first.results],
+                         [r.as_dict() for r in second.results])
+        self.assertEqual(first.skipped, second.skipped)
+        self.assertEqual(first.metrics.data[files_list[0]],
+                         second.metrics.data[files_list[0]])
+
+        # an edited file is scanned again, the others still come from cache
+        with open(files_list[2], 'wt') as fd:
+            fd.write('exec("1")\nexec("2")\n')
+        third, visited = scan()
+        self.assertEqual([files_list[2]], visited)
+        self.assertEqual(2, third.metrics.data['_totals']['cache_hits'])
+        self.assertEqual(1, third.metrics.data['_totals']['cache_misses'])
+        self.assertEqual([1, 1, 2], [r.lineno for r in third.results])
+
+    def test_run_tests_partial(self):
+        # Test that a file scanned in part keeps its results and is reported
+        temp_directory = self.useFixture(fixtures.TempDir()).path
+        cache_dir = os.path.join(temp_directory, 'cache')
+        fname = os.path.join(temp_directory, 'a.py')
+        with open(fname, 'wt') as fd:
+            fd.write('eval("1")\neval("2")\n')
+
+        for _ in range(2):
+            m = manager.BanditManager(self.config, 'file',
+                                      cache_dir=cache_dir, ast_max_nodes=5)
+            m.files_list = [fname]
+            m.run_tests()
+            self.assertEqual([1], [r.lineno for r in m.results])
+            self.assertEqual([(fname, mock.ANY)], m.skipped)
+            self.assertIn('partially scanned', m.skipped[0][1])
+            self.assertEqual([fname], m.files_list)
+            self.assertEqual(0, m.metrics.data['_totals']['cache_hits'])
+
+    def test_run_tests_ast_dump(self):
+        # Test that the AST of each file is dumped and then released
+        temp_directory = self.useFixture(fixtures.TempDir()).path
+        files_list = []
+        for name, source in (('a.py', 'eval("1")\n'),
+                             ('b.py', 'x = 1\n')):
+            files_list.append(os.path.join(temp_directory, name))
+            with open(files_list[-1], 'wt') as fd:
+                fd.write(source)
+
+        m = manager.BanditManager(self.config, 'file', debug=True)
+        m.files_list = list(files_list)
+        sizes = []
+        begin = m.b_ma.begin
+
+        def begin_file(fname):
+            sizes.append(len(m.b_ma.nodes))
+            begin(fname)
+
+        with mock.patch.object(m.b_ma, 'begin', side_effect=begin_file):
+            m.run_tests()
+        # the nodes of a file are gone before the next file is visited
+        self.assertEqual([0, 0], sizes)
+        self.assertEqual(0, len(m.b_ma.nodes))
+
+        # the dump of a file is written as soon as it is visited
+        ast_dump = six.StringIO()
+        m = manager.BanditManager(self.config, 'file', ast_dump=ast_dump,
+                                  ast_dump_compact=True)
+        m.files_list = list(files_list)
+        dumps = []
+        parse_file = m._parse_file
+
+        def parse(*args):
+            dumps.append(ast_dump.getvalue())
+            parse_file(*args)
+
+        with mock.patch.object(m, '_parse_file', side_effect=parse):
+            m.run_tests()
+        self.assertEqual('', dumps[0])
+        self.assertEqual('#: %s\nExpr 1\n' % files_list[0],
+                         dumps[1][:len(files_list[0]) + 11])
+        self.assertIn('#: %s\nAssign 1\n' % files_list[1],
+                      ast_dump.getvalue())
+
+        # workers send their dumps back with the scan of each file
+        ast_dump = six.StringIO()
+        m = manager.BanditManager(self.config, 'file', jobs=2,
+                                  ast_dump=ast_dump, ast_dump_compact=True)
+        m.files_list = list(files_list)
+        m.run_tests()
+        self.assertLess(ast_dump.getvalue().index(files_list[0]),
+                        ast_dump.getvalue().index(files_list[1]))
+
     def test_compare_baseline(self):
         issue_a = self._get_issue_instance()
         issue_a.fname = 'file1.py'
@@ -333,3 +667,213 @@ class ManagerTests(testtools.TestCase):
             {issue_a: [issue_a, issue_b], issue_b: [issue_a, issue_b]},
             manager._find_candidate_matches([issue_a, issue_b],
                                             [issue_a, issue_b, issue_c]))
+
+    def test_baseline_matching_pairwise(self):
+        # Test that matching by key agrees with comparing every pair
+        results = []
+        for i in range(60):
+            result = self._get_issue_instance(
+                sev=constants.RANKING[i % 3 + 1])
+            result.fname = 'file%i.py' % (i % 7)
+            result.lineno = i
+            results.append(result)
+        baseline = results[::4]
+
+        unmatched = manager._compare_baseline_results(baseline, results)
+        self.assertEqual([a for a in results if a not in baseline], unmatched)
+        self.assertNotEqual([], unmatched)
+
+        candidates = manager._find_candidate_matches(unmatched, results)
+        self.assertEqual(unmatched, list(candidates))
+        for unmatched_issue, issue_candidates in candidates.items():
+            self.assertEqual([i for i in results if unmatched_issue == i],
+                             issue_candidates)
+
+    def test_run_tests_duplicates(self):
+        # Test that identical files are scanned once with per-file results
+        temp_directory = self.useFixture(fixtures.TempDir()).path
+        files_list = []
+        for name, source in (('a.py', 'eval("1")\n'),
+                             ('b.py', 'def broken(:\n'),
+                             ('c.py', 'eval("1")\n'),
+                             ('d.py', 'def broken(:\n')):
+            files_list.append(os.path.join(temp_directory, name))
+            with open(files_list[-1], 'wt') as fd:
+                fd.write(source)
+
+        m = manager.BanditManager(self.config, 'file')
+        m.files_list = list(files_list)
+        with mock.patch.object(m, '_execute_ast_visitor',
+                               wraps=m._execute_ast_visitor) as visitor:
+            m.run_tests()
+        self.assertEqual(files_list[:2],
+                         [c[0][0] for c in visitor.call_args_list])
+
+        self.assertEqual(2, m.duplicates)
+        self.assertNotIn('duplicates', m.metrics.data['_totals'])
+        # the run releases the index of the files scanned
+        self.assertEqual(0, len(m.scans_by_digest))
+        self.assertEqual([files_list[0], files_list[2]],
+                         [r.fname for r in m.results])
+        first, second = [r.as_dict() for r in m.results]
+        second['filename'] = first['filename']
+        self.assertEqual(first, second)
+        self.assertEqual([(files_list[1], mock.ANY),
+                          (files_list[3], mock.ANY)], m.skipped)
+        self.assertEqual([files_list[0], files_list[2]], m.files_list)
+        self.assertEqual(m.metrics.data[files_list[0]],
+                         m.metrics.data[files_list[2]])
+        self.assertIsNot(m.metrics.data[files_list[0]],
+                         m.metrics.data[files_list[2]])
+        self.assertEqual(2, len(m.scores))
+
+        # only the first file with each content is sent to the workers
+        m = manager.BanditManager(self.config, 'file', jobs=2)
+        m.files_list = list(files_list)
+        with mock.patch.object(m, '_merge_worker_scan',
+                               wraps=m._merge_worker_scan) as merged:
+            m.run_tests()
+        self.assertEqual(files_list[:2],
+                         [c[0][0]['fname'] for c in merged.call_args_list])
+        self.assertEqual(2, m.duplicates)
+        self.assertEqual([files_list[0], files_list[2]],
+                         [r.fname for r in m.results])
+
+    def test_run_tests_archive(self):
+        # Test that the members of an archive are scanned from memory
+        temp_directory = self.useFixture(fixtures.TempDir()).path
+        fname = os.path.join(temp_directory, 'pkg-1.0-py3-none-any.whl')
+        with zipfile.ZipFile(fname, 'w') as zf:
+            zf.writestr('pkg/__init__.py', 'import os\neval("1")\n')
+            zf.writestr('pkg/broken.py', 'def broken(:\n')
+            zf.writestr('pkg/data.txt', 'eval("1")\n')
+
+        m = manager.BanditManager(self.config, 'file')
+        m.discover_files([fname])
+        self.assertEqual([fname], m.files_list)
+        m.run_tests()
+
+        member = fname + '!pkg/__init__.py'
+        broken = fname + '!pkg/broken.py'
+        self.assertEqual([member], m.files_list)
+        self.assertEqual([(broken, mock.ANY)], m.skipped)
+        self.assertEqual({member}, set(r.fname for r in m.results))
+        self.assertIn(member, m.metrics.data)
+        eval_issue = [r for r in m.results if r.test_id == 'B347'][0]
+        self.assertEqual('1 import os\n2 eval("1")\n', eval_issue.get_code())
+
+    def test_run_tests_code(self):
+        # Test that the code of the issues is kept from the scan
+        temp_directory = self.useFixture(fixtures.TempDir()).path
+        fname = os.path.join(temp_directory, 'a.py')
+        with open(fname, 'wb') as fd:
+            fd.write(b'import os\r\neval("1")\r\n')
+
+        managers = [manager.BanditManager(self.config, 'file', jobs=jobs,
+                                          code_lines=code_lines)
+                    for jobs, code_lines in ((1, 3), (2, 3), (1, None))]
+        for m in managers:
+            m.files_list = [fname]
+            m.run_tests()
+        os.remove(fname)
+
+        for m in managers[:2]:
+            eval_issue = [r for r in m.results if r.test_id == 'B347'][0]
+            self.assertEqual('1 import os\n2 eval("1")\n',
+                             eval_issue.get_code())
+        self.assertEqual('', managers[2].results[0].get_code())
+
+    def test_iter_files(self):
+        top = self._make_tree(['a.py', 'b.txt', 'x/c.py'])
+        files = self.manager.iter_files([top, os.path.join(top, 'x')], True)
+        self.assertEqual([], self.manager.excluded_files)
+        self.assertEqual(sorted([os.path.join(top, 'a.py'),
+                                 os.path.join(top, 'x', 'c.py')]),
+                         sorted(files))
+        self.assertEqual([os.path.join(top, 'b.txt')],
+                         self.manager.excluded_files)
+
+    def test_run_tests_pipelined(self):
+        # Test that a pipelined scan starts on the files found while the walk
+        # goes on, and reports them as a scan of discovered files would
+        top = self._make_tree([('d.py', 'import os\nos.system("ls")\n'),
+                               ('b.py', 'eval("1")\nexec("2")\n'),
+                               ('a/c.py', 'def broken(:\n'),
+                               'f.txt'])
+        m = manager.BanditManager(self.config, 'file')
+        scanned = threading.Event()
+        waits = []
+
+        def walk():
+            for fname in m.iter_files([top], True):
+                yield fname
+                waits.append(scanned.wait(5))
+                scanned.clear()
+
+        scan_file = m._scan_file
+
+        def scan(*args):
+            scan_file(*args)
+            scanned.set()
+
+        with mock.patch.object(m, '_scan_file', side_effect=scan):
+            m.run_tests(walk())
+        self.assertEqual([True, True, True], waits)
+
+        discovered = manager.BanditManager(self.config, 'file')
+        discovered.discover_files([top], True)
+        discovered.run_tests()
+        self.assertEqual([r.as_dict() for r in discovered.results],
+                         [r.as_dict() for r in m.results])
+        self.assertEqual(discovered.skipped, m.skipped)
+        # the files are counted rather than listed
+        self.assertEqual(2, len(m.files_list))
+        self.assertEqual(2, len(m.scores))
+        self.assertEqual(1, len(m.excluded_files))
+        self.assertEqual([], list(m.files_list))
+
+    def test_iter_files_overlapping(self):
+        # Test that files below a target walked before are not found again
+        top = self._make_tree(['a.py', 'x/b.py', 'x/c.txt'])
+        files = self.manager.iter_files(
+            [os.path.join(top, 'x', 'b.py'), top, os.path.join(top, 'x'),
+             top], True)
+        self.assertEqual([os.path.join(top, 'a.py'),
+                          os.path.join(top, 'x', 'b.py')], sorted(files))
+        self.assertEqual([os.path.join(top, 'x', 'c.txt')],
+                         self.manager.excluded_files)
+
+    def test_iter_files_nested_ini(self):
+        # Test that a .bandit file below a target is an error if asked for
+        top = self._make_tree(['.bandit', 'a.py', 'x/.bandit'])
+        self.assertEqual(1, len(list(self.manager.iter_files([top], True))))
+        files = self.manager.iter_files([top], True, nested_ini=False)
+        self.assertRaisesRegex(utils.ConfigError, 'x/.bandit', list, files)
+
+        files = self.manager.iter_files([os.path.join(top, 'x'), top], True,
+                                        nested_ini=False)
+        self.assertEqual([os.path.join(top, 'a.py')], list(files))
+
+    def test_run_tests_index_max_size(self):
+        # Test that identical files past the size of the index are scanned
+        sources = [('a.py', 'eval("1")\n'), ('b.py', 'exec("1")\n'),
+                   ('c.py', 'eval("1")\n'), ('d.py', 'exec("1")\n')]
+        top = self._make_tree(sources)
+        files_list = [os.path.join(top, name) for name, _ in sources]
+        m = manager.BanditManager(self.config, 'file')
+        m.scans_by_digest.max_size = 1
+        m.files_list = list(files_list)
+        with mock.patch.object(m, '_execute_ast_visitor',
+                               wraps=m._execute_ast_visitor) as visitor:
+            m.run_tests()
+        self.assertEqual(files_list[:2] + files_list[3:],
+                         [c[0][0] for c in visitor.call_args_list])
+        self.assertEqual(1, m.duplicates)
+        self.assertEqual(files_list, [r.fname for r in m.results])
+
+        # the digests of the files sent to the workers are capped as well
+        m = manager.BanditManager(self.config, 'file', jobs=2)
+        m.scans_by_digest.max_size = 1
+        m.files_list = list(files_list)
+        m.run_tests()
+        self.assertEqual(1, m.duplicates)
@@ -2,6 +2,8 @@
 #
 # SPDX-License-Identifier: Apache-2.0
 
+import ast
+
 import six
 import testtools
 
@@ -29,3 +31,34 @@ class BanditMetaAstTests(testtools.TestCase):
         node = self.b_meta_ast.nodes[self.node_id]
         expected = 'Node: %s\n\t%s\nLength: 1\n' % (self.node_id, node)
         self.assertEqual(expected, six.text_type(self.b_meta_ast))
+
+    def test_end_releases_nodes(self):
+        self.b_meta_ast.begin('code.py')
+        self.b_meta_ast.add_node(self.node, self.parent_id, self.depth)
+        self.assertEqual(1, len(self.b_meta_ast.nodes))
+        self.b_meta_ast.end()
+        self.assertEqual(0, len(self.b_meta_ast.nodes))
+        self.assertEqual(0, len(meta_ast.BanditMetaAst().nodes))
+
+    def test_stream(self):
+        stream = six.StringIO()
+        b_meta_ast = meta_ast.BanditMetaAst(stream)
+        b_meta_ast.begin('code.py')
+        b_meta_ast.add_node(self.node, self.parent_id, self.depth)
+        b_meta_ast.end()
+        node = {'raw': self.node, 'parent_id': self.parent_id,
+                'depth': self.depth}
+        self.assertEqual('File: code.py\nNode: %s\n\t%s\nLength: 1\n' %
+                         (self.node_id, node), stream.getvalue())
+        self.assertEqual(0, len(b_meta_ast.nodes))
+
+    def test_stream_compact(self):
+        stream = six.StringIO()
+        b_meta_ast = meta_ast.BanditMetaAst(stream, compact=True)
+        tree = ast.parse('x = 1\n')
+        b_meta_ast.begin('code.py')
+        b_meta_ast.add_node(tree.body[0], '', 0)
+        b_meta_ast.add_node(tree.body[0].targets[0].ctx, '', 1)
+        b_meta_ast.end()
+        self.assertEqual('#: code.py\nAssign 1\n  Store -\n',
+                         stream.getvalue())
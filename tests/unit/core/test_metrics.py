@@ -0,0 +1,141 @@
+# SPDX-License-Identifier: Apache-2.0
+
+import testtools
+
+from bandit.core import metrics
+
+
+def _score(severity, confidence):
+    return {'SEVERITY': severity, 'CONFIDENCE': confidence}
+
+
+class MetricsTests(testtools.TestCase):
+
+    def setUp(self):
+        super(MetricsTests, self).setUp()
+        self.metrics = metrics.Metrics()
+
+    def test_count_locs(self):
+        data = b'import os\n\n  # comment\n\tos.getcwd()\r\nx = 1\ry = 2'
+        self.metrics.begin('a.py')
+        self.metrics.count_locs(data)
+        self.metrics.begin('b.py')
+        self.metrics.count_locs(data.splitlines())
+        self.assertEqual(4, self.metrics.data['a.py']['loc'])
+        self.assertEqual(4, self.metrics.data['b.py']['loc'])
+        self.assertEqual(8, self.metrics.data['_totals']['loc'])
+
+    def test_data(self):
+        self.metrics.begin('a.py')
+        self.metrics.count_locs(b'x = 1\n')
+        self.metrics.note_nosec(2)
+        self.assertEqual({'loc': 1, 'nosec': 2}, self.metrics.data['a.py'])
+        self.assertEqual(0, self.metrics.data['_totals']['SEVERITY.HIGH'])
+
+        self.metrics.count_issues([_score([0, 0, 5, 20], [0, 3, 0, 10])])
+        file_metrics = self.metrics.data['a.py']
+        self.assertEqual(2.0, file_metrics['SEVERITY.HIGH'])
+        self.assertEqual(1.0, file_metrics['SEVERITY.MEDIUM'])
+        self.assertEqual(1.0, file_metrics['CONFIDENCE.LOW'])
+        self.assertEqual(1.0, file_metrics['CONFIDENCE.HIGH'])
+        self.assertEqual(0.0, file_metrics['CONFIDENCE.UNDEFINED'])
+        self.assertEqual(10, len(file_metrics))
+        self.assertEqual(2.0, self.metrics.data['_totals']['SEVERITY.HIGH'])
+
+    def test_running_totals(self):
+        self.metrics.begin('a.py')
+        self.metrics.count_locs(b'x = 1\ny = 2\n')
+        self.metrics.count_issues([_score([0, 0, 0, 10], [0, 0, 0, 10])])
+        self.metrics.begin('b.py')
+        self.metrics.count_locs(b'z = 3\n')
+        self.metrics.note_nosec()
+        totals = self.metrics.data['_totals']
+        self.assertEqual(3, totals['loc'])
+        self.assertEqual(1, totals['nosec'])
+        self.assertEqual(1.0, totals['SEVERITY.HIGH'])
+
+        # beginning a file again starts its counters over
+        self.metrics.begin('a.py')
+        totals = self.metrics.data['_totals']
+        self.assertEqual(1, totals['loc'])
+        self.assertEqual(0.0, totals['SEVERITY.HIGH'])
+
+    def test_set_total(self):
+        self.metrics.set_total('cache_hits', 3)
+        self.metrics.aggregate()
+        self.assertEqual(3, self.metrics.data['_totals']['cache_hits'])
+
+    def test_get_put(self):
+        self.metrics.begin('a.py')
+        self.metrics.count_locs(b'x = 1\n')
+        self.metrics.count_issues([_score([0, 3, 0, 0], [0, 0, 5, 0])])
+        record = self.metrics.get('a.py')
+
+        other = metrics.Metrics()
+        other.put('b.py', record)
+        other.put('c.py', record)
+        self.assertIn('b.py', other)
+        self.assertEqual(['b.py', 'c.py'], other.files())
+        self.assertEqual(self.metrics.data['a.py'], other.data['b.py'])
+        self.assertEqual(2, other.data['_totals']['loc'])
+        self.assertEqual(2.0, other.data['_totals']['SEVERITY.LOW'])
+
+    def test_load(self):
+        self.metrics.begin('a.py')
+        self.metrics.count_locs(b'x = 1\n')
+        self.metrics.count_issues([_score([0, 0, 0, 10], [0, 0, 0, 10])])
+        values = self.metrics.current
+
+        other = metrics.Metrics()
+        other.load('b.py', values)
+        other.load('c.py', {'loc': 3, 'nosec': 1})
+        self.assertEqual(values, other.data['b.py'])
+        self.assertEqual({'loc': 3, 'nosec': 1}, other.data['c.py'])
+        self.assertEqual(4, other.data['_totals']['loc'])
+
+    def test_plugin_profile(self):
+        self.assertNotIn('_plugins', self.metrics.data)
+        profiled = metrics.Metrics(profile_plugins=True)
+        profiled.plugins.record('B102', 'Call', 0.5, 1)
+        profiled.plugins.record('B102', 'Call', 0.25, 0)
+        profiled.plugins.record('B101', 'Assert', 0.125, 0)
+        profiled.plugins.merge({('B102', 'Call'): [2, 1.0, 0.75, 1],
+                                ('B001', 'Call'): [1, 0.0625, 0.0625, 0]})
+        self.assertEqual([
+            {'test_id': 'B102', 'node_type': 'Call', 'calls': 4,
+             'total_time': 1.75, 'max_time': 0.75, 'issues': 2},
+            {'test_id': 'B101', 'node_type': 'Assert', 'calls': 1,
+             'total_time': 0.125, 'max_time': 0.125, 'issues': 0},
+            {'test_id': 'B001', 'node_type': 'Call', 'calls': 1,
+             'total_time': 0.0625, 'max_time': 0.0625, 'issues': 0},
+        ], profiled.data['_plugins'])
+
+    def test_timings(self):
+        self.assertNotIn('_timings', self.metrics.data)
+        timed = metrics.Metrics(slowest_files=2)
+        timings = timed.timings
+        self.assertEqual(['a', 'b'], list(timings.timed(['a', 'b'],
+                                                        'discovery')))
+        for fname, elapsed in (('a.py', 0.5), ('b.py', 0.25),
+                               ('c.py', 1.0)):
+            timings.begin_file(fname, 100)
+            timings.add_file('read', elapsed)
+            timings.add_file('parse', elapsed)
+            timings.note_nodes(10)
+            timings.end_file()
+        other = metrics.Timings(2)
+        other.begin_file('d.py', 200)
+        other.add_file('visit', 0.75)
+        other.end_file()
+        timings.merge(other.get())
+
+        data = timed.data['_timings']
+        self.assertEqual(1.75, data['phases']['read'])
+        self.assertEqual(0.75, data['phases']['visit'])
+        self.assertEqual(0.0, data['phases']['nosec'])
+        self.assertEqual([
+            {'filename': 'c.py', 'time': 2.0, 'size': 100, 'nodes': 10,
+             'read': 1.0, 'parse': 1.0},
+            {'filename': 'a.py', 'time': 1.0, 'size': 100, 'nodes': 10,
+             'read': 0.5, 'parse': 0.5},
+        ], data['slowest_files'])
@@ -0,0 +1,164 @@
+# -*- coding:utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+
+import mock
+import testtools
+
+from bandit.core import config
+from bandit.core import constants
+from bandit.core import issue
+from bandit.core import meta_ast
+from bandit.core import metrics
+from bandit.core import node_visitor
+from bandit.core import test_properties
+from bandit.core import test_set
+from bandit.core import utils as b_utils
+
+
+class BanditNodeVisitorTests(testtools.TestCase):
+
+    def setUp(self):
+        super(BanditNodeVisitorTests, self).setUp()
+        self.b_conf = config.BanditConfig()
+        self.b_ts = test_set.BanditTestSet(self.b_conf)
+        self.metrics = metrics.Metrics()
+        self.metrics.begin('code.py')
+
+    def _get_visitor(self, nosec_lines=None, testset=None):
+        return node_visitor.BanditNodeVisitor(
+            'code.py', meta_ast.BanditMetaAst(), testset or self.b_ts,
+            False, nosec_lines or set(), self.metrics)
+
+    def test_checked_types(self):
+        testset = mock.Mock(tests={'Str': [], 'Call': []})
+        visitor = self._get_visitor(testset=testset)
+        self.assertEqual({'Str', 'Constant', 'Call', 'ClassDef',
+                          'FunctionDef', 'Import', 'ImportFrom'},
+                         visitor.checked_types)
+
+    def test_unchecked_nodes_skip_context(self):
+        visitor = self._get_visitor()
+        with mock.patch.object(visitor, 'pre_visit',
+                               wraps=visitor.pre_visit) as pre_visit:
+            visitor.process('x = a + b\n')
+        self.assertFalse(pre_visit.called)
+        self.assertEqual(9, visitor.seen)
+
+    def test_unchecked_nodes_nosec(self):
+        visitor = self._get_visitor(nosec_lines={1})
+        visitor.process('x = a + b\ny = eval("1")\n')
+        self.assertEqual(1, self.metrics.current['nosec'])
+        self.assertEqual(1, len(visitor.tester.results))
+        self.assertEqual(2, visitor.tester.results[0].lineno)
+
+    def test_call_tests_imported_like(self):
+        visitor = self._get_visitor()
+        visitor.process('s.connect(("10.0.0.1", 80))\n')
+        self.assertNotIn('B315', [r.test_id for r in visitor.tester.results])
+
+        visitor = self._get_visitor()
+        visitor.process('import socket\ns.connect(("10.0.0.1", 80))\n')
+        self.assertIn('B315', [r.test_id for r in visitor.tester.results])
+
+    def test_deep_nesting(self):
+        visitor = self._get_visitor()
+        visitor.process('x = ' + ' + '.join(['a'] * 5000) + '\neval(x)\n')
+        self.assertIsNone(visitor.incomplete)
+        self.assertEqual([2], [r.lineno for r in visitor.tester.results])
+
+    def test_max_depth(self):
+        visitor = node_visitor.BanditNodeVisitor(
+            'code.py', meta_ast.BanditMetaAst(), self.b_ts, False, set(),
+            self.metrics, max_depth=3)
+        visitor.process('x = [[[eval("1")]]]\neval("2")\n')
+        self.assertIn('deeper than 3 levels', visitor.incomplete)
+        self.assertEqual([2], [r.lineno for r in visitor.tester.results])
+
+    def test_max_nodes(self):
+        visitor = node_visitor.BanditNodeVisitor(
+            'code.py', meta_ast.BanditMetaAst(), self.b_ts, False, set(),
+            self.metrics, max_nodes=5)
+        visitor.process('eval("1")\neval("2")\n')
+        self.assertIn('more than 5 AST nodes', visitor.incomplete)
+        self.assertEqual(5, visitor.node_count)
+        self.assertEqual([1], [r.lineno for r in visitor.tester.results])
+
+    def test_namespace(self):
+        visitor = self._get_visitor()
+        with mock.patch.object(visitor.tester, 'run_tests',
+                               wraps=visitor.tester.run_tests) as run_tests:
+            visitor.process('class A(object):\n'
+                            '    def f(self):\n'
+                            '        def g():\n'
+                            '            pass\n'
+                            '    def h(self):\n'
+                            '        pass\n')
+        self.assertEqual(['.A.f', '.A.f.g', '.A.h'],
+                         [c[0][0]['qualname'] for c in run_tests.call_args_list
+                          if c[0][1] == 'FunctionDef'])
+        self.assertEqual('', visitor.namespace)
+        self.assertEqual([], visitor.namespaces)
+
+    def test_node_relations(self):
+        seen = []
+
+        @test_properties.checks('Str')
+        def parent_test(context):
+            seen.append((context.parent, context.sibling))
+
+        @test_properties.checks('Str')
+        @test_properties.uses_node_relations
+        def legacy_test(context):
+            seen.append((context.node._bandit_parent,
+                         context.node._bandit_sibling))
+
+        for plugin in (parent_test, legacy_test):
+            del seen[:]
+            testset = mock.Mock(tests={'Str': [plugin]})
+            testset.get_tests.return_value = [plugin]
+            visitor = self._get_visitor(testset=testset)
+            visitor.process('f("a", "b")\n')
+            call = visitor.relations.tree.body[0].value
+            self.assertEqual([(call, call.args[1]), (call, None)], seen)
+            # the attributes are only there while a decorated test runs, and
+            # only decorated tests build the relations of the whole tree
+            self.assertFalse(hasattr(call.args[0], '_bandit_parent'))
+            self.assertFalse(hasattr(call, '_bandit_parent'))
+            self.assertEqual(plugin is legacy_test,
+                             visitor.relations._relations is not None)
+
+    def test_linerange_sibling(self):
+        # Test that issues get the line range of a multi-line string from
+        # the walk, without building the relations of the whole tree
+        @test_properties.checks('Str')
+        def str_test(context):
+            return issue.Issue(constants.LOW, constants.LOW, 'str',
+                               test_id='B999')
+
+        testset = mock.Mock(tests={'Str': [str_test]})
+        testset.get_tests.return_value = [str_test]
+        visitor = self._get_visitor(testset=testset)
+        # the line range of g(...) stops before the line of its sibling
+        visitor.process('f(g("""a\nb\n"""), 2)\n')
+        self.assertEqual([[1, 2]],
+                         [r.linerange for r in visitor.tester.results])
+        self.assertIsNone(visitor.relations._relations)
+
+    def test_node_relations_parents(self):
+        # helpers walking up the tree from the node of a decorated test find
+        # the relations of its ancestors too
+        seen = []
+
+        @test_properties.checks('Str')
+        @test_properties.uses_node_relations
+        def legacy_test(context):
+            seen.append(b_utils.concat_string(context.node))
+
+        testset = mock.Mock(tests={'Str': [legacy_test]})
+        testset.get_tests.return_value = [legacy_test]
+        visitor = self._get_visitor(testset=testset)
+        visitor.process('x = "a" + "b" + "c"\n')
+        binop = visitor.relations.tree.body[0].value
+        self.assertEqual([(binop, 'a a b c'), (binop, 'b a b c'),
+                          (binop, 'c a b c')], seen)
@@ -33,6 +33,23 @@ def test_plugin():
     return {'Import': sets, 'ImportFrom': sets, 'Call': sets}
 
 
+@test.checks('Call')
+@test.matches_call('*connect', imported_like='socket')
+def connect_plugin(context):
+    pass
+
+
+@test.checks('Call')
+@test.matches_call('open')
+def open_plugin(context):
+    pass
+
+
+@test.checks('Call')
+def any_call_plugin(context):
+    pass
+
+
 class BanditTestSetTests(testtools.TestCase):
     def _make_test_manager(self, plugin):
         return extension.ExtensionManager.make_test_instance(
@@ -148,3 +165,24 @@ class BanditTestSetTests(testtools.TestCase):
         self.assertNotIn('Import', blacklist._config)
         self.assertNotIn('ImportFrom', blacklist._config)
         self.assertEqual(1, len(blacklist._config['Call']))
+
+    def test_get_call_tests(self):
+        ts = test_set.BanditTestSet(self.config)
+        blacklist = ts.get_tests('Call')[0]
+        ts.tests['Call'] = [connect_plugin, blacklist, open_plugin,
+                            any_call_plugin]
+
+        self.assertEqual([connect_plugin, blacklist, any_call_plugin],
+                         ts.get_call_tests('s.connect'))
+        self.assertEqual([connect_plugin, blacklist, any_call_plugin],
+                         ts.get_call_tests('sock.reconnect'))
+        self.assertEqual([blacklist, open_plugin, any_call_plugin],
+                         ts.get_call_tests('open'))
+        self.assertEqual([blacklist, any_call_plugin],
+                         ts.get_call_tests('io.open'))
+        self.assertEqual([blacklist, any_call_plugin],
+                         ts.get_call_tests('connection'))
+        self.assertEqual([blacklist, any_call_plugin],
+                         ts.get_call_tests(''))
+        self.assertEqual([blacklist, any_call_plugin],
+                         ts.get_call_tests(None))
@@ -6,16 +6,28 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import ast
+import io
 import os
 import shutil
 import sys
 import tempfile
+import tokenize
 
+import mock
 import testtools
 
 from bandit.core import utils as b_utils
 
 
+def _tokenize_nosec_lines(data):
+    '''Find the #nosec lines by running the tokenizer over ``data``.'''
+    tokens = tokenize.tokenize(io.BytesIO(data).readline)
+    return set(
+        lineno for toktype, tokval, (lineno, _), _, _ in tokens
+        if toktype == tokenize.COMMENT and
+        ('#nosec' in tokval or '# nosec' in tokval))
+
+
 def _touch(path):
     '''Create an empty file at ``path``.'''
     open(path, 'w').close()
@@ -177,6 +189,32 @@ class UtilTests(testtools.TestCase):
         self.assertRaises(b_utils.InvalidModulePath,
                           b_utils.get_module_qualname_from_path, '/tmp/')
 
+    def test_get_module_qualname_from_path_package_names(self):
+        '''Test get_module_qualname_from_path with a shared cache.'''
+
+        paths = [os.path.join(self.tempdir, *parts) for parts in (
+            ('good', 'a', 'b', 'c', 'test_typical.py'),
+            ('good', 'a', 'b', 'c', 'other.py'),
+            ('good', 'a', 'b', 'sibling.py'),
+            ('missingmid', 'a', 'b', 'c', 'test_missingmid.py'),
+            ('missingend', 'a', 'b', 'c', 'test_missingend.py'))]
+        expected = [b_utils.get_module_qualname_from_path(path)
+                    for path in paths]
+
+        package_names = {}
+        with mock.patch('os.path.isfile', wraps=os.path.isfile) as isfile:
+            names = [b_utils.get_module_qualname_from_path(path,
+                                                           package_names)
+                     for path in paths]
+        self.assertEqual(expected, names)
+        self.assertEqual(['good.a.b.c.test_typical', 'good.a.b.c.other',
+                          'good.a.b.sibling', 'b.c.test_missingmid',
+                          'test_missingend'], names)
+        # each directory is only checked for __init__.py once: five from
+        # good/a/b/c up to tempdir, then missingmid/a/b/c up to missingmid/a
+        # and missingend/a/b/c
+        self.assertEqual(9, isfile.call_count)
+
     def test_namespace_path_join(self):
         p = b_utils.namespace_path_join('base1.base2', 'name')
         self.assertEqual('base1.base2.name', p)
@@ -226,6 +264,47 @@ class UtilTests(testtools.TestCase):
         # the range should be the correct line numbers
         self.assertEqual([11, 12, 13], list(lrange))
 
+    def test_linerange_decorated(self):
+        tree = ast.parse('@decorator\ndef f(): pass\n')
+        self.assertEqual([1, 2], b_utils.linerange(tree.body[0]))
+
+    def test_linerange_multiline_string(self):
+        tree = ast.parse('f("""a\nb\n""",\n  c)\nx = 1\n')
+        call = tree.body[0].value
+        # the range ends on the line the last child node starts on
+        self.assertEqual([1, 2, 3, 4], b_utils.linerange(call))
+        self.assertEqual([1], b_utils.linerange(call.args[0]))
+        self.assertEqual((1, 4), call._bandit_line_bounds)
+        self.assertEqual((1, 1), call.func._bandit_line_bounds)
+
+    def test_node_relations(self):
+        tree = ast.parse('x = 1\ny = "a" + "b" + "c"\n')
+        relations = b_utils.NodeRelations(tree)
+        self.assertIsNone(relations._relations)
+
+        first, second = tree.body
+        self.assertIs(tree, relations.parent(first))
+        self.assertIs(second, relations.sibling(first))
+        self.assertIsNone(relations.sibling(second))
+        self.assertIsNone(relations.parent(tree))
+        self.assertIs(second.value, relations.parent(second.value.right))
+        self.assertFalse(hasattr(first, '_bandit_parent'))
+
+    def test_linerange_fix_multiline_string(self):
+        tree = ast.parse('x = """a\nb\n"""\ny = 1\n')
+        relations = b_utils.NodeRelations(tree)
+        self.assertEqual([1, 2, 3],
+                         b_utils.linerange_fix(tree.body[0], relations))
+        self.assertEqual([1], b_utils.linerange_fix(tree.body[0]))
+
+    def test_concat_string(self):
+        tree = ast.parse('y = "a" + "b" + "c"\n')
+        binop = tree.body[0].value
+        relations = b_utils.NodeRelations(tree)
+        self.assertEqual((binop, 'a b c'),
+                         b_utils.concat_string(binop.left,
+                                               relations=relations))
+
     def test_path_for_function(self):
         path = b_utils.get_path_for_function(b_utils.get_path_for_function)
         self.assertEqual(path, b_utils.__file__)
@@ -291,3 +370,55 @@ class UtilTests(testtools.TestCase):
 
     def test_check_ast_node_bad_type(self):
         self.assertRaises(TypeError, b_utils.check_ast_node, 'walk')
+
+    def test_get_nosec_lines(self):
+        sources = [
+            b'import os\nos.system("ls")\n',
+            b'os.system("ls")  # nosec\nos.system("ls") #nosec\n',
+            b'x = "# nosec"\ny = \'#nosec\'  # nosec\n',
+            b'x = """\n# nosec\n"""  # nosec\n\'\'\'#nosec\'\'\'\n',
+            b'x = "\\"# nosec"\ny = r\'\\\'# nosec\'\n',
+            b'x = f"{y!r}# nosec"  # a comment\n# nosec\n',
+            b'x = (1,  # nosec\n     2)\r\ny = "\\\n# nosec"\n',
+            b'# -*- coding: latin-1 -*-\nx = "\xe9"  # nosec\n',
+        ]
+        for data in sources:
+            self.assertEqual(_tokenize_nosec_lines(data),
+                             b_utils.get_nosec_lines(data))
+
+    def test_get_nosec_lines_examples(self):
+        examples = os.path.join(os.path.dirname(__file__), '..', '..', '..',
+                                'examples')
+        for name in sorted(os.listdir(examples)):
+            if not name.endswith('.py'):
+                continue
+            with open(os.path.join(examples, name), 'rb') as f:
+                data = f.read()
+            try:
+                expected = _tokenize_nosec_lines(data)
+            except (tokenize.TokenError, SyntaxError):
+                continue
+            self.assertEqual(expected, b_utils.get_nosec_lines(data), name)
+
+    def test_line_offsets(self):
+        self.assertEqual([0], b_utils.line_offsets(b''))
+        data = b'a\nbc\r\n\rd'
+        offsets = b_utils.line_offsets(data)
+        self.assertEqual([0, 2, 6, 7, 8], offsets)
+        self.assertEqual(data.splitlines(True),
+                         [data[offsets[n - 1]:offsets[n]]
+                          for n in range(1, len(offsets))])
+        self.assertEqual([0, 2], b_utils.line_offsets(b'a\n'))
+
+    def test_source_encoding(self):
+        self.assertEqual('utf-8', b_utils.source_encoding(b'x = 1\n'))
+        self.assertEqual('iso-8859-1', b_utils.source_encoding(
+            b'# -*- coding: latin-1 -*-\nx = "\xe9"\n'))
+        self.assertEqual('utf-8', b_utils.source_encoding(
+            b'# -*- coding: unknown -*-\n'))
+
+    def test_get_nosec_lines_no_marker(self):
+        with mock.patch('tokenize.detect_encoding') as detect_encoding:
+            self.assertEqual(set(), b_utils.get_nosec_lines(
+                b'x = "nosec"  # no security issue here\n'))
+        self.assertFalse(detect_encoding.called)
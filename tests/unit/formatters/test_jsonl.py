@@ -0,0 +1,112 @@
+# SPDX-License-Identifier: Apache-2.0
+
+import collections
+import json
+import tempfile
+
+import mock
+import testtools
+
+import bandit
+from bandit.core import config
+from bandit.core import issue
+from bandit.core import manager
+from bandit.formatters import jsonl as b_jsonl
+
+
+class JsonLinesFormatterTests(testtools.TestCase):
+
+    def setUp(self):
+        super(JsonLinesFormatterTests, self).setUp()
+        conf = config.BanditConfig()
+        self.manager = manager.BanditManager(conf, 'file')
+        (tmp_fd, self.tmp_fname) = tempfile.mkstemp()
+        self.check_name = 'hardcoded_bind_all_interfaces'
+        self.issue = issue.Issue(bandit.MEDIUM, bandit.MEDIUM,
+                                 'Possible binding to all interfaces.')
+        self.issue.fname = self.tmp_fname
+        self.issue.lineno = 4
+        self.issue.linerange = [4]
+        self.issue.test = self.check_name
+        self.low_issue = issue.Issue(bandit.LOW, bandit.LOW, 'Low issue',
+                                     lineno=1)
+        self.low_issue.fname = self.tmp_fname
+
+        self.candidates = [issue.Issue(bandit.LOW, bandit.LOW, 'Candidate A',
+                                       lineno=1),
+                           issue.Issue(bandit.HIGH, bandit.HIGH, 'Candiate B',
+                                       lineno=2)]
+
+        self.manager.results.extend([self.issue, self.low_issue])
+        self.manager.skipped.append(('broken.py', 'syntax error'))
+
+    def _read_records(self):
+        with open(self.tmp_fname) as f:
+            return [json.loads(line) for line in f]
+
+    def test_report(self):
+        with open(self.tmp_fname, 'w') as tmp_file:
+            b_jsonl.report(self.manager, tmp_file, bandit.MEDIUM,
+                           bandit.MEDIUM)
+
+        records = self._read_records()
+        self.assertEqual(['issue', 'error', 'totals'],
+                         [r['type'] for r in records])
+        self.assertEqual(self.tmp_fname, records[0]['filename'])
+        self.assertEqual(self.issue.text, records[0]['issue_text'])
+        self.assertEqual(4, records[0]['line_number'])
+        self.assertEqual(self.check_name, records[0]['test_name'])
+        self.assertIn('more_info', records[0])
+        self.assertNotIn('candidates', records[0])
+        self.assertEqual({'type': 'error', 'filename': 'broken.py',
+                          'reason': 'syntax error'}, records[1])
+        self.assertEqual(1, records[2]['results'])
+        self.assertEqual(1, records[2]['errors'])
+        self.assertIn('loc', records[2]['metrics'])
+        self.assertIsNotNone(records[2]['generated_at'])
+
+    @mock.patch('bandit.core.manager.BanditManager.get_issue_list')
+    def test_report_baseline(self, get_issue_list):
+        get_issue_list.return_value = collections.OrderedDict(
+            [(self.issue, self.candidates)])
+
+        with open(self.tmp_fname, 'w') as tmp_file:
+            b_jsonl.report(self.manager, tmp_file, bandit.LOW, bandit.LOW)
+
+        records = self._read_records()
+        self.assertEqual(['issue', 'error', 'totals'],
+                         [r['type'] for r in records])
+        self.assertEqual(['Candidate A', 'Candiate B'],
+                         [c['issue_text'] for c in records[0]['candidates']])
+        self.assertEqual(1, records[2]['results'])
+
+    def test_stream(self):
+        with open(self.tmp_fname, 'w') as tmp_file:
+            self.assertTrue(self.manager.stream_results(
+                tmp_file, 'jsonl', bandit.MEDIUM, bandit.MEDIUM))
+            tmp_file.flush()
+            # what was there before the scan is written straight away
+            self.assertEqual(['issue', 'error'],
+                             [r['type'] for r in self._read_records()])
+
+            self.manager.results.append(self.low_issue)
+            self.manager.results.append(self.issue)
+            self.manager._stream_file_results()
+            self.assertEqual(3, len(self._read_records()))
+
+            self.manager.output_results(-1, bandit.MEDIUM, bandit.MEDIUM,
+                                        tmp_file, 'jsonl')
+
+        records = self._read_records()
+        self.assertEqual(['issue', 'error', 'issue', 'totals'],
+                         [r['type'] for r in records])
+        self.assertEqual(2, records[3]['results'])
+        self.assertEqual(1, records[3]['errors'])
+
+    def test_stream_not_supported(self):
+        self.assertFalse(self.manager.stream_results(
+            None, 'json', bandit.LOW, bandit.LOW))
+        self.manager.baseline = [self.issue]
+        self.assertFalse(self.manager.stream_results(
+            None, 'jsonl', bandit.LOW, bandit.LOW))
+        self.assertEqual([], self.manager.result_streams)
@@ -75,6 +75,66 @@ class TextFormatterTests(testtools.TestCase):
             data = f.read()
             self.assertIn('No issues identified.', data)
 
+    @mock.patch('bandit.core.manager.BanditManager.get_issue_list')
+    def test_report_plugin_profile(self, get_issue_list):
+        conf = config.BanditConfig()
+        self.manager = manager.BanditManager(conf, 'file',
+                                             profile_plugins=True)
+        self.manager.metrics.plugins.record('B102', 'Call', 0.0025, 1)
+
+        (tmp_fd, self.tmp_fname) = tempfile.mkstemp()
+        get_issue_list.return_value = collections.OrderedDict()
+        with open(self.tmp_fname, 'w') as tmp_file:
+            b_text.report(self.manager, tmp_file, bandit.LOW, bandit.LOW,
+                          lines=5)
+
+        with open(self.tmp_fname) as f:
+            data = f.read()
+            self.assertIn('Plugin profile (slowest first):', data)
+            self.assertIn('\tB102     Call                   1       0.0025'
+                          '      2.500       1', data)
+
+    @mock.patch('bandit.core.manager.BanditManager.get_issue_list')
+    def test_report_duplicates(self, get_issue_list):
+        conf = config.BanditConfig()
+        self.manager = manager.BanditManager(conf, 'file')
+        self.manager.duplicates = 2
+
+        (tmp_fd, self.tmp_fname) = tempfile.mkstemp()
+        get_issue_list.return_value = collections.OrderedDict()
+        with open(self.tmp_fname, 'w') as tmp_file:
+            b_text.report(self.manager, tmp_file, bandit.LOW, bandit.LOW,
+                          lines=5)
+
+        with open(self.tmp_fname) as f:
+            data = f.read()
+            self.assertIn('\tFiles identical to another scanned file: 2\n',
+                          data)
+
+    @mock.patch('bandit.core.manager.BanditManager.get_issue_list')
+    def test_report_timings(self, get_issue_list):
+        conf = config.BanditConfig()
+        self.manager = manager.BanditManager(conf, 'file', timings=5)
+        timings = self.manager.metrics.timings
+        timings.begin_file('binding.py', 120)
+        timings.add_file('parse', 0.5)
+        timings.note_nodes(30)
+        timings.end_file()
+
+        (tmp_fd, self.tmp_fname) = tempfile.mkstemp()
+        get_issue_list.return_value = collections.OrderedDict()
+        with open(self.tmp_fname, 'w') as tmp_file:
+            b_text.report(self.manager, tmp_file, bandit.LOW, bandit.LOW,
+                          lines=5)
+
+        with open(self.tmp_fname) as f:
+            data = f.read()
+            self.assertIn('Timings (seconds):\n\tDiscovery: 0.0000\n', data)
+            self.assertIn('\tParse: 0.5000\n', data)
+            self.assertIn('Slowest files (1):\n'
+                          '\t0.5000 (size: 120, nodes: 30)\tbinding.py\n',
+                          data)
+
     @mock.patch('bandit.core.manager.BanditManager.get_issue_list')
     def test_report_nobaseline(self, get_issue_list):
         conf = config.BanditConfig()
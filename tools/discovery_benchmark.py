@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""Benchmark for file discovery over a large synthetic tree.
+
+Builds a tree of source files in a temporary directory, including the kind
+of directories excluded by default (.git, .tox, __pycache__) and a
+node_modules directory excluded with -x, then times the os.walk based
+discovery bandit used before against the current one. Both must find the
+same files.
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import timeit
+
+from bandit.core import constants
+from bandit.core import manager
+
+
+def walk_files_from_dir(files_dir, included_globs, excluded_path_strings):
+    '''The os.walk based discovery, filtering every file afterwards'''
+    files_list = set()
+    excluded_files = set()
+    for root, _, files in os.walk(files_dir):
+        for filename in files:
+            path = os.path.join(root, filename)
+            if manager._is_file_included(path, included_globs,
+                                         excluded_path_strings):
+                files_list.add(path)
+            else:
+                excluded_files.add(path)
+    return files_list, excluded_files
+
+
+def make_tree(top, num_files, files_per_dir=100):
+    '''Create num_files empty files, a fifth of them in excluded dirs'''
+    kinds = ['src', 'src', 'src', 'src', '.git', '.tox', '__pycache__',
+             'node_modules']
+    for i in range(num_files // files_per_dir):
+        kind = kinds[i % len(kinds)]
+        path = os.path.join(top, kind, 'pkg%d' % (i // 10), 'mod%d' % i)
+        os.makedirs(path)
+        for j in range(files_per_dir):
+            suffix = '.py' if j % 4 else '.txt'
+            open(os.path.join(path, 'f%d%s' % (j, suffix)), 'w').close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--files', type=int, default=500000,
+                        help='number of files in the tree')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='number of timed runs of each discovery')
+    args = parser.parse_args()
+
+    top = tempfile.mkdtemp()
+    try:
+        make_tree(top, args.files)
+        included = ['*.py', '*.pyw']
+        excluded = list(constants.EXCLUDE) + ['node_modules']
+
+        old = walk_files_from_dir(top, included, excluded)
+        new = manager._get_files_from_dir(top, included, excluded)
+        assert old[0] == new[0], 'discovered files differ'
+
+        for name, func in (('os.walk', walk_files_from_dir),
+                           ('scandir', manager._get_files_from_dir)):
+            best = min(timeit.repeat(
+                lambda: func(top, included, excluded),
+                number=1, repeat=args.repeat))
+            print('%-8s %8.3fs  %d files' % (name, best, len(old[0])))
+    finally:
+        shutil.rmtree(top)
+
+
+if __name__ == '__main__':
+    main()